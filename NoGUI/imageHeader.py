@@ -0,0 +1,217 @@
+#--------------------------------------------------------------------------
+# ScriptName: imageHeader
+# Author: Naruse
+# Contents   : テクスチャ画像（PNG / JPEG / TIFF / EXR / TGA）のヘッダーから解像度・チャンネル数・ビット数を読む共有モジュール
+#              ヘッダーはファイルをシークしながら読むため、大きな EXIF や EXR の属性があっても先頭の固定長に依存しない
+#              WithGUI の tx_auto-reload.py と Material_obj_Export.py から使う
+# CreatedDate: 2026年10月19日
+# LastUpdate: 2026年10月19日
+# Version: 0.1
+#
+# 《使い方》
+# このフォルダ（NoGUI）を PYTHONPATH に追加するか、WithGUI のスクリプトを同じリポジトリから実行する。
+#
+# 《License》
+# Copyright (c) 2025 Naruse
+# Released under the MIT license
+# https://opensource.org/licenses/mit-license.php
+#--------------------------------------------------------------------------
+
+import os
+import struct
+
+
+# -----------------------------------------------------
+# 画像ヘッダーの解析（サイズ・形式・タイル情報）
+# check_complete=True のときは書き出し途中のファイルを検出するため、末尾マーカーやオフセットも確認する
+# -----------------------------------------------------
+class TextureNotReady(Exception):
+    pass
+
+
+def _parse_png(f, head, size, check_complete):
+    if len(head) < 26 or head[12:16] != b"IHDR":
+        raise TextureNotReady("PNG ヘッダーが不完全です")
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", head[16:26])
+    if check_complete:
+        f.seek(max(0, size - 12))
+        if f.read(12)[4:8] != b"IEND":
+            raise TextureNotReady("PNG の IEND がありません（書き出し中）")
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}.get(color_type, 4)
+    return {"format": "png", "width": width, "height": height, "channels": channels, "bits": bit_depth, "tiled": False}
+
+
+def _parse_jpeg(f, head, size, check_complete):
+    # 先頭の固定長ではなく、マーカーを順にシークして SOF を探す（大きな APP/EXIF セグメントがあっても読める）
+    f.seek(2)
+    info = None
+    while info is None:
+        byte = f.read(1)
+        if not byte:
+            raise TextureNotReady("JPEG の SOF が見つかりません")
+        if byte != b"\xff":
+            raise TextureNotReady("JPEG マーカーが不正です")
+        marker = f.read(1)
+        while marker == b"\xff":  # 詰め物の 0xFF を読み飛ばす
+            marker = f.read(1)
+        if not marker:
+            raise TextureNotReady("JPEG の SOF が見つかりません")
+        marker = marker[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            continue  # 長さを持たないマーカー
+        if marker in (0xD9, 0xDA):
+            raise TextureNotReady("JPEG の SOF が見つかりません")
+        length_data = f.read(2)
+        if len(length_data) < 2:
+            raise TextureNotReady("JPEG のセグメントが不完全です（書き出し中）")
+        length = struct.unpack(">H", length_data)[0]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            data = f.read(6)
+            if len(data) < 6:
+                raise TextureNotReady("JPEG の SOF が不完全です（書き出し中）")
+            bits, height, width, channels = struct.unpack(">BHHB", data)
+            info = {"format": "jpeg", "width": width, "height": height, "channels": channels, "bits": bits, "tiled": False}
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+    if check_complete:
+        f.seek(max(0, size - 16))
+        if b"\xff\xd9" not in f.read(16):
+            raise TextureNotReady("JPEG の EOI がありません（書き出し中）")
+    return info
+
+
+def _parse_tiff(f, head, size, check_complete):
+    endian = "<" if head[:2] == b"II" else ">"
+    ifd_offset = struct.unpack(endian + "I", head[4:8])[0]
+    f.seek(ifd_offset)
+    count_data = f.read(2)
+    if len(count_data) < 2:
+        raise TextureNotReady("TIFF の IFD がありません（書き出し中）")
+    count = struct.unpack(endian + "H", count_data)[0]
+    entries = f.read(count * 12)
+    if len(entries) < count * 12:
+        raise TextureNotReady("TIFF の IFD が不完全です（書き出し中）")
+
+    tags = {}
+    for i in range(count):
+        tag, field_type, value_count = struct.unpack(endian + "HHI", entries[i * 12:i * 12 + 8])
+        value = entries[i * 12 + 8:i * 12 + 12]
+        # 値がエントリ内に収まる SHORT / LONG のみ読む（先頭の値を使用）
+        if field_type == 3 and value_count <= 2:
+            tags[tag] = struct.unpack(endian + "H", value[:2])[0]
+        elif field_type == 4 and value_count == 1:
+            tags[tag] = struct.unpack(endian + "I", value)[0]
+
+    return {
+        "format": "tiff", "width": tags.get(256, 0), "height": tags.get(257, 0),
+        "channels": tags.get(277, 1), "bits": tags.get(258, 8), "tiled": 322 in tags,
+    }
+
+
+EXR_LINES_PER_CHUNK = {0: 1, 1: 1, 2: 1, 3: 16, 4: 32, 5: 16, 6: 32, 7: 32, 8: 32, 9: 256}
+
+
+EXR_HEADER_VALUE_LIMIT = 1024 * 1024  # これより大きい属性値（プレビュー画像など）は読み飛ばす
+
+
+def _read_cstring(f, limit=1024):
+    data = bytearray()
+    while len(data) < limit:
+        byte = f.read(1)
+        if not byte:
+            raise TextureNotReady("EXR ヘッダーが不完全です")
+        if byte == b"\0":
+            return bytes(data)
+        data += byte
+    raise TextureNotReady("EXR ヘッダーの属性名が不正です")
+
+
+def _parse_exr(f, head, size, check_complete):
+    # 属性を 1 つずつファイルから読み進める（ヘッダーが大きくても読める）
+    version = struct.unpack("<I", head[4:8])[0]
+    f.seek(8)
+    attrs = {}
+    while True:
+        name = _read_cstring(f)
+        if not name:
+            break
+        attr_type = _read_cstring(f)
+        size_data = f.read(4)
+        if len(size_data) < 4:
+            raise TextureNotReady("EXR ヘッダーが不完全です")
+        attr_size = struct.unpack("<i", size_data)[0]
+        if attr_size < 0:
+            raise TextureNotReady("EXR ヘッダーが不正です")
+        if attr_size > EXR_HEADER_VALUE_LIMIT:
+            f.seek(attr_size, os.SEEK_CUR)
+            continue
+        value = f.read(attr_size)
+        if len(value) < attr_size:
+            raise TextureNotReady("EXR ヘッダーが不完全です")
+        attrs[name.decode("ascii", "replace")] = (attr_type.decode("ascii", "replace"), value)
+    offset = f.tell()
+
+    if "dataWindow" not in attrs:
+        raise TextureNotReady("EXR に dataWindow がありません")
+    xmin, ymin, xmax, ymax = struct.unpack("<iiii", attrs["dataWindow"][1][:16])
+    width, height = xmax - xmin + 1, ymax - ymin + 1
+    # chlist: 「名前\0 + ピクセル型（0: UINT, 1: HALF, 2: FLOAT）+ 12 バイト」の繰り返しで、空の名前で終わる
+    chlist = attrs.get("channels", ("", b"\0"))[1]
+    channel_bits = []
+    position = 0
+    while position < len(chlist) and chlist[position] != 0:
+        end_name = chlist.find(b"\0", position)
+        if end_name < 0 or end_name + 5 > len(chlist):
+            break
+        pixel_type = struct.unpack("<i", chlist[end_name + 1:end_name + 5])[0]
+        channel_bits.append(16 if pixel_type == 1 else 32)
+        position = end_name + 17
+    tiled = bool(version & 0x200) or "tiles" in attrs
+
+    info = {"format": "exr", "width": width, "height": height, "channels": max(len(channel_bits), 1),
+            "bits": max(channel_bits, default=16), "tiled": tiled}
+    if not check_complete:
+        return info
+
+    # オフセットテーブルを確認（スキャンラインは全チャンク、タイルは先頭のみ）
+    if tiled:
+        chunk_count = 1
+    else:
+        compression = attrs.get("compression", ("", b"\0"))[1][0]
+        lines = EXR_LINES_PER_CHUNK.get(compression, 1)
+        chunk_count = (height + lines - 1) // lines
+    f.seek(offset)
+    table = f.read(chunk_count * 8)
+    if len(table) < chunk_count * 8:
+        raise TextureNotReady("EXR のオフセットテーブルが不完全です（書き出し中）")
+    offsets = struct.unpack(f"<{chunk_count}Q", table)
+    if not offsets or max(offsets) >= size or min(offsets) == 0:
+        raise TextureNotReady("EXR のデータが不完全です（書き出し中）")
+    return info
+
+
+def _parse_tga(f, head, size, check_complete):
+    if len(head) < 18:
+        raise TextureNotReady("TGA ヘッダーが不完全です")
+    width, height, bits = struct.unpack("<HHB", head[12:17])
+    return {"format": "tga", "width": width, "height": height, "channels": max(1, bits // 8), "bits": 8, "tiled": False}
+
+
+def read_image_header(path, check_complete=True):
+    """ 画像ヘッダーから形式・幅・高さ・チャンネル数・ビット数・タイルの有無を返す
+    check_complete=True のときは書き出し途中のファイルで TextureNotReady を送出する """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        # 形式の判定に必要な先頭だけを読み、以降は各パーサーがシークして読む
+        head = f.read(32)
+        if head.startswith(b"\x89PNG\r\n\x1a\n"):
+            return _parse_png(f, head, size, check_complete)
+        if head.startswith(b"\xff\xd8"):
+            return _parse_jpeg(f, head, size, check_complete)
+        if head[:4] in (b"II*\0", b"MM\0*"):
+            return _parse_tiff(f, head, size, check_complete)
+        if head.startswith(b"\x76\x2f\x31\x01"):
+            return _parse_exr(f, head, size, check_complete)
+        if path.lower().endswith(".tga"):
+            return _parse_tga(f, head, size, check_complete)
+    return {"format": os.path.splitext(path)[1].lstrip(".").lower(), "width": 0, "height": 0, "channels": 0, "bits": 0, "tiled": False}
@@ -2,9 +2,13 @@
 # ScriptName: Material obj Export
 # Author: Naruse,GPT-4o
 # Contents: 選択したオブジェクトのマテリアルを球に適用し、球または板をエクスポート、インポートできるスクリプト
+#           エクスポートはバックグラウンドの mayapy ワーカーで並列に行い、変更の無いマテリアルは書き出さない
+#           シェーディングネットワークのみを JSON / バイナリで書き出し・読み込みすることも可能
+#           マテリアルの割り当てはシーン全体のインデックスから参照し、まとめて割り当てる
+#           未使用・重複マテリアルの分析（テクスチャメモリの推定）と一括整理
 # CreatedDate: 2025年3月4日
-# LastUpdate: 2025年3月4日
-# Version:0.1
+# LastUpdate: 2026年10月19日
+# Version:0.6
 #
 # 《License》
 # Copyright (c) 2025 Naruse
@@ -13,8 +17,29 @@
 # --------------------------------------------------------------------------
 
 import maya.cmds as cmds
+import maya.mel as mel
+import maya.api.OpenMaya as om
+import glob
+import hashlib
+import json
 import os
+import shutil
+import struct
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+# 画像ヘッダーの解析は NoGUI/imageHeader.py と共有する（同じリポジトリから実行する場合は自動で探す）
+if "__file__" in globals():
+    SHARED_MODULE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NoGUI")
+    if SHARED_MODULE_DIR not in sys.path:
+        sys.path.append(SHARED_MODULE_DIR)
+from imageHeader import TextureNotReady, read_image_header
 
 # 現在のシーンのパスを取得
 scene_path = cmds.file(q=True, sceneName=True)
@@ -34,39 +59,222 @@ if not os.path.exists(export_folder):
 
 # グローバル変数
 created_objects = []  # 生成したオブジェクト（球または板）を管理するリスト
+created_materials = {}  # 生成したオブジェクト -> 適用したマテリアル
+export_pool = None  # 実行中のエクスポート（ExportPool）
+
+# 並列エクスポートの設定
+EXPORT_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))  # ワーカープロセス数
+
+# ---------------------------------------------------------------------------
+# シェーディング割り当てのインデックス
+# シェイプ・フェースセット → シェーディンググループ → マテリアル の対応と、
+# マテリアルの上流テクスチャ（メモ化した探索結果）をメモリ上に保持する。
+# 接続の変更はコールバックで受け取り、変更のあったシェーディンググループだけを次回の参照時に更新する。
+# ---------------------------------------------------------------------------
+class ShadingIndex:
+    def __init__(self):
+        self.shading_groups = {}   # シェーディンググループ -> {"material": マテリアル, "members": メンバーの集合}
+        self.by_node = {}          # ノードのロング名 -> {メンバー（シェイプ または フェース）: シェーディンググループ}
+        self.by_material = {}      # マテリアル -> シェーディンググループの集合
+        self.texture_cache = {}    # ノード -> 上流の file ノードの frozenset
+        self.dirty_groups = set()  # 次回の参照時に再取得するシェーディンググループ
+        self.stale = False         # 名前変更・親子付けがあった場合は全体を作り直す
+        self.callback_ids = []
+
+    def build(self):
+        """シーン全体から一度だけインデックスを構築する"""
+        self.shading_groups.clear()
+        self.by_node.clear()
+        self.by_material.clear()
+        self.texture_cache.clear()
+        self.dirty_groups.clear()
+        self.stale = False
+        for sg in cmds.ls(type="shadingEngine") or []:
+            self._index_group(sg)
+        print(f"シェーディングインデックスを構築しました: {len(self.shading_groups)} シェーディンググループ")
+
+    def _index_group(self, sg):
+        self._remove_group(sg)
+        if not cmds.objExists(sg):
+            return
+        material = (cmds.listConnections(f"{sg}.surfaceShader", source=True, destination=False) or [None])[0]
+        members = set(cmds.ls(cmds.sets(sg, query=True) or [], long=True) or [])
+        self.shading_groups[sg] = {"material": material, "members": members}
+        if material:
+            self.by_material.setdefault(material, set()).add(sg)
+        for member in members:
+            self.by_node.setdefault(member.split(".", 1)[0], {})[member] = sg
+
+    def _remove_group(self, sg):
+        entry = self.shading_groups.pop(sg, None)
+        if not entry:
+            return
+        if entry["material"]:
+            self.by_material.get(entry["material"], set()).discard(sg)
+        for member in entry["members"]:
+            self.by_node.get(member.split(".", 1)[0], {}).pop(member, None)
+
+    def flush(self):
+        """コールバックで溜めた変更をインデックスへ反映する"""
+        if self.stale:
+            self.build()
+            return
+        dirty, self.dirty_groups = self.dirty_groups, set()
+        for sg in dirty:
+            self._index_group(sg)
+
+    def assignments(self, obj):
+        """オブジェクト（transform またはシェイプ）の {メンバー: シェーディンググループ} を返す"""
+        self.flush()
+        nodes = cmds.ls(obj, long=True) or []
+        nodes += cmds.listRelatives(obj, shapes=True, fullPath=True, noIntermediate=True) or []
+        result = {}
+        for node in nodes:
+            result.update(self.by_node.get(node, {}))
+        return result
+
+    def materials_of(self, obj):
+        """オブジェクトに割り当てられたマテリアル（フェース単位の割り当ても含む）"""
+        groups = self.assignments(obj).values()
+        return list(dict.fromkeys(self.shading_groups[sg]["material"] for sg in groups if self.shading_groups[sg]["material"]))
+
+    def shading_group_for(self, material):
+        """マテリアルのシェーディンググループ（無ければ作成する）"""
+        self.flush()
+        groups = sorted(self.by_material.get(material, ()))
+        if groups:
+            return groups[0]
+        sg = cmds.sets(renderable=True, noSurfaceShader=True, empty=True, name=f"{material}SG")
+        cmds.connectAttr(f"{material}.outColor", f"{sg}.surfaceShader", force=True)
+        self.flush()  # 接続コールバックで登録される
+        return sg
+
+    def textures_of(self, node, visiting=None):
+        """ノードの上流にあるすべての file ノード（結果はノードごとにメモ化する）"""
+        cached = self.texture_cache.get(node)
+        if cached is not None:
+            return cached
+        visiting = visiting if visiting is not None else set()
+        visiting.add(node)
+
+        textures = set()
+        complete = True
+        for source in dict.fromkeys(cmds.listConnections(node, source=True, destination=False, skipConversionNodes=True) or []):
+            if source in visiting:
+                complete = False  # 循環中は途中結果のためメモ化しない
+                continue
+            if cmds.nodeType(source) == "file":
+                textures.add(source)
+            textures |= self.textures_of(source, visiting)
+        visiting.discard(node)
+
+        result = frozenset(textures)
+        if complete:
+            self.texture_cache[node] = result
+        return result
+
+    # ---- 変更コールバック ----
+    def _on_connection(self, source_plug, destination_plug, made, *args):
+        node = destination_plug.node()
+        if node.hasFn(om.MFn.kShadingEngine):
+            self.dirty_groups.add(om.MFnDependencyNode(node).name())
+        else:
+            self.texture_cache.clear()  # 上流のグラフが変わったためテクスチャの探索結果を破棄
+        source_node = source_plug.node()
+        if source_node.hasFn(om.MFn.kShadingEngine):
+            self.dirty_groups.add(om.MFnDependencyNode(source_node).name())
+
+    def _on_group_added(self, node, *args):
+        self.dirty_groups.add(om.MFnDependencyNode(node).name())
+
+    def _on_group_removed(self, node, *args):
+        self.dirty_groups.add(om.MFnDependencyNode(node).name())
+
+    def _on_name_changed(self, node, previous_name, *args):
+        # インデックスに登録済みの名前が変わった場合のみ作り直す（新規作成時の命名は無視）
+        if previous_name in self.shading_groups or previous_name in self.by_material:
+            self.stale = True
+        elif node.hasFn(om.MFn.kDagNode) and previous_name:
+            # ロング名の末尾（割り当てのあるノード自身）か途中（その親・祖先）に含まれていれば作り直す
+            suffix = "|" + previous_name
+            segment = suffix + "|"
+            self.stale = self.stale or any(key.endswith(suffix) or segment in key for key in self.by_node)
+
+    def _on_dag_changed(self, message, child, parent, *args):
+        # 割り当てのあるシェイプを含む階層が親子付けされた場合のみ作り直す（ロング名が変わるため）
+        if self.stale:
+            return
+        iterator = om.MItDag(om.MItDag.kDepthFirst, om.MFn.kShape)
+        iterator.reset(child.node(), om.MItDag.kDepthFirst, om.MFn.kShape)
+        while not iterator.isDone():
+            if om.MFnDependencyNode(iterator.currentItem()).findPlug("instObjGroups", False).numConnectedElements():
+                self.stale = True
+                return
+            iterator.next()
+
+    def register_callbacks(self):
+        self.remove_callbacks()
+        self.callback_ids = [
+            om.MDGMessage.addConnectionCallback(self._on_connection),
+            om.MDGMessage.addNodeAddedCallback(self._on_group_added, "shadingEngine"),
+            om.MDGMessage.addNodeRemovedCallback(self._on_group_removed, "shadingEngine"),
+            om.MNodeMessage.addNameChangedCallback(om.MObject(), self._on_name_changed),
+            om.MDagMessage.addAllDagChangesCallback(self._on_dag_changed),
+        ]
+
+    def remove_callbacks(self, *args):
+        if self.callback_ids:
+            om.MMessage.removeCallbacks(self.callback_ids)
+        self.callback_ids = []
+
+
+shading_index = None
+
+
+def get_shading_index():
+    # インデックスを初回のみ構築し、以降はコールバックで差分更新する
+    global shading_index
+    if shading_index is None:
+        shading_index = ShadingIndex()
+        shading_index.build()
+        shading_index.register_callbacks()
+    return shading_index
+
+
+def release_shading_index(*args):
+    # ウィンドウを閉じたらコールバックを解除する
+    global shading_index
+    if shading_index is not None:
+        shading_index.remove_callbacks()
+        shading_index = None
+
+
+def assign_material(material, targets):
+    """ targets（オブジェクト・フェース）にマテリアルを割り当てる（sets -forceElement は 1 回のみ） """
+    sg = get_shading_index().shading_group_for(material)
+    cmds.sets(targets, edit=True, forceElement=sg)
+    return sg
+
 
 def has_texture(material):
-    """ 指定されたマテリアルがテクスチャを持つか判定する """
-    file_nodes = cmds.listConnections(material, type="file") or []
-    return bool(file_nodes)
+    """ 指定されたマテリアルがテクスチャを持つか判定する（上流のすべての file ノードを対象） """
+    return bool(get_shading_index().textures_of(material))
 
 def apply_selected_material_to_objects():
-    global created_objects
+    global created_objects, created_materials
 
     selection = cmds.ls(selection=True)
     if not selection:
         cmds.warning("オブジェクトを選択してください。")
         return
 
-    # shadingEngine を取得
-    shading_groups = cmds.listConnections(selection[0], type='shadingEngine') or []
-    if not shading_groups:
-        shading_groups = cmds.listHistory(selection[0], future=True, pruneDagObjects=True)
-        shading_groups = cmds.ls(shading_groups, type='shadingEngine')
-
-    if not shading_groups:
+    # インデックスから割り当てを取得（フェース単位の割り当ても含む）
+    index = get_shading_index()
+    if not index.assignments(selection[0]):
         cmds.warning("選択したオブジェクトにマテリアルが適用されていません。")
         return
 
-    # マテリアルを取得（shadingEngine の surfaceShader から）
-    materials = []
-    for sg in shading_groups:
-        material = cmds.listConnections(f"{sg}.surfaceShader", source=True, destination=False)
-        if material:
-            materials.extend(material)
-
-    materials = list(set(materials))  # 重複を排除
-
+    materials = index.materials_of(selection[0])
     if not materials:
         cmds.warning("マテリアルを取得できませんでした。")
         return
@@ -77,6 +285,7 @@ def apply_selected_material_to_objects():
             if cmds.objExists(obj):
                 cmds.delete(obj)
     created_objects = []
+    created_materials = {}
 
     created_info = []
     for i, material in enumerate(materials):
@@ -89,9 +298,9 @@ def apply_selected_material_to_objects():
         else:
             obj = cmds.polySphere(name=object_name)[0]
 
-        cmds.select(obj)
-        cmds.hyperShade(assign=material)
+        assign_material(material, [obj])
         created_objects.append(obj)
+        created_materials[obj] = material
 
         created_info.append(f"オブジェクト: {object_name}\nマテリアル: {material}")
 
@@ -99,27 +308,643 @@ def apply_selected_material_to_objects():
 
 
 
+# ---------------------------------------------------------------------------
+# 並列エクスポート
+# ジョブ（オブジェクト名と出力パス）を JSON に書き出し、ヘッドレスのワーカープロセスに分配する。
+# ワーカーは 1 ジョブごとに結果を 1 行の JSON で標準出力へ返し、
+# 監視スレッドがそれを読み取って進捗をメインスレッドへ渡す。
+# ---------------------------------------------------------------------------
+WORKER_SCRIPT = r'''
+import json
+import sys
+import time
+
+def main():
+    job_file = sys.argv[1]
+    stand_in = "--stand-in" in sys.argv[2:]
+    with open(job_file, encoding="utf-8") as f:
+        job = json.load(f)
+
+    if not stand_in:
+        import maya.standalone
+        maya.standalone.initialize(name="python")
+        import maya.cmds as cmds
+        cmds.file(job["source"], open=True, force=True)
+
+    for item in job["jobs"]:
+        start = time.perf_counter()
+        result = {"object": item["object"], "path": item["path"], "ok": True, "error": ""}
+        try:
+            if stand_in:
+                # 代替エクスポーター（Maya を使わずにジョブの内容だけを書き出す）
+                with open(item["path"], "w", encoding="utf-8") as f:
+                    json.dump(item, f)
+            else:
+                cmds.select(item["object"], replace=True)
+                cmds.file(item["path"], force=True, options="v=0;", type="mayaBinary", exportSelected=True)
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - start
+        print(json.dumps(result), flush=True)
+
+    if not stand_in:
+        maya.standalone.uninitialize()
+
+main()
+'''
+
+
+def find_mayapy():
+    """ 実行中の Maya に対応する mayapy のパスを返す（見つからなければ None） """
+    name = "mayapy.exe" if os.name == "nt" else "mayapy"
+    maya_location = os.environ.get("MAYA_LOCATION", "")
+    candidates = [os.path.join(os.path.dirname(sys.executable), name)]
+    if maya_location:
+        candidates.insert(0, os.path.join(maya_location, "bin", name))
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return shutil.which(name)
+
+
+def mayapy_exporter(worker_script, job_file):
+    """ 本番用: mayapy で Maya をヘッドレス起動して .mb を書き出す """
+    mayapy = find_mayapy()
+    return [mayapy, worker_script, job_file] if mayapy else None
+
+
+def stand_in_exporter(worker_script, job_file):
+    """ テスト用: Maya を起動せず、ジョブの内容だけをファイルに書き出す """
+    python = find_mayapy() or shutil.which("python3") or shutil.which("python")
+    return [python, worker_script, job_file, "--stand-in"] if python else None
+
+
+# エクスポーター名 -> ワーカー起動コマンドを返す関数（差し替え可能）
+EXPORTERS = {"mayapy": mayapy_exporter, "stand-in": stand_in_exporter}
+exporter_name = "mayapy"
+
+
+class ExportPool:
+    def __init__(self, jobs, job_dir, exporter, workers=EXPORT_WORKERS):
+        self.jobs = jobs
+        self.job_dir = job_dir
+        self.exporter = exporter
+        self.workers = max(1, min(workers, len(jobs)))
+        self.processes = []
+        self.running_readers = 0
+        self.results = []
+        self.lock = threading.Lock()
+        self.cancelled = False
+        self.started = 0.0
+        self.skipped = 0
+        self.removed = 0
+
+    def start(self, source):
+        worker_script = os.path.join(self.job_dir, "material_export_worker.py")
+        with open(worker_script, "w", encoding="utf-8") as f:
+            f.write(WORKER_SCRIPT)
+
+        commands = []
+        for index in range(self.workers):
+            # ジョブは順番に振り分け、各ワーカーの進み具合を均等にする
+            job_file = os.path.join(self.job_dir, f"jobs_{index}.json")
+            with open(job_file, "w", encoding="utf-8") as f:
+                json.dump({"source": source, "jobs": self.jobs[index::self.workers]}, f, ensure_ascii=False)
+            command = self.exporter(worker_script, job_file)
+            if command is None:
+                return False
+            commands.append(command)
+
+        self.started = time.perf_counter()
+        self.running_readers = len(commands)
+        for index, command in enumerate(commands):
+            log = open(os.path.join(self.job_dir, f"worker_{index}.log"), "w", encoding="utf-8")
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=log, text=True, encoding="utf-8", errors="replace")
+            self.processes.append(process)
+            threading.Thread(target=self.read_results, args=(process, log), daemon=True).start()
+        return True
+
+    def read_results(self, process, log):
+        # ワーカーの出力を 1 行ずつ読み、結果をメインスレッドに渡す
+        # 読み込みで例外が起きても、ログを閉じて完了を数える（最後のワーカーで finish_export を呼ぶため）
+        try:
+            for line in process.stdout:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    continue  # Maya の起動メッセージなど
+                with self.lock:
+                    self.results.append(result)
+                    done = len(self.results)
+                cmds.evalDeferred(partial(report_export_progress, self, result, done))
+            process.wait()
+        finally:
+            log.close()
+            with self.lock:
+                self.running_readers -= 1
+                finished = self.running_readers == 0
+            if finished:
+                cmds.evalDeferred(partial(finish_export, self))
+
+    def cancel(self):
+        self.cancelled = True
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+
+
+def report_export_progress(pool, result, done):
+    status = "完了" if result["ok"] else f"失敗: {result['error']}"
+    print(f"[{done}/{len(pool.jobs)}] {os.path.basename(result['path'])} {result['seconds']:.2f} 秒 {status}")
+    if cmds.progressBar("exportProgressBar", exists=True):
+        cmds.progressBar("exportProgressBar", edit=True, maxValue=len(pool.jobs), progress=done)
+        cmds.text("exportStatusText", edit=True, label=f"エクスポート中... {done} / {len(pool.jobs)}")
+
+
+def finish_export(pool):
+    global export_pool
+    export_pool = None
+    if pool.job_dir is None:
+        pass  # プロセス内で書き出した（ネットワーク形式）
+    elif len(pool.results) < len(pool.jobs) and not pool.cancelled:
+        # ワーカーが途中で終了した場合はログを確認できるように残す
+        cmds.warning(f"結果を返さなかったジョブがあります。ワーカーのログ: {pool.job_dir}")
+    else:
+        shutil.rmtree(pool.job_dir, ignore_errors=True)
+
+    if pool.job_dir is not None:
+        record_exported_jobs(pool.results, pool.jobs)
+
+    elapsed = time.perf_counter() - pool.started
+    exported = [r for r in pool.results if r["ok"]]
+    failed = [r for r in pool.results if not r["ok"]]
+    summary = (f"エクスポート {len(exported)} / スキップ {pool.skipped} / 除外 {pool.removed}"
+               f"（{elapsed:.1f} 秒, {pool.workers} プロセス）")
+    if pool.cancelled:
+        summary = "エクスポートを中止しました。" + summary
+    if cmds.text("exportStatusText", exists=True):
+        cmds.text("exportStatusText", edit=True, label=summary)
+
+    exported_text = "\n\n".join(f"{os.path.basename(r['path'])}\n{r['path']}" for r in exported)
+    if failed:
+        exported_text += "\n\n失敗:\n" + "\n".join(f"{r['object']}: {r['error']}" for r in failed)
+    cmds.confirmDialog(title="エクスポート完了", message=f"{summary}\n\n{exported_text}", button="OK")
+
+
+# ---------------------------------------------------------------------------
+# 差分エクスポート用のマニフェスト
+# マテリアルの上流ネットワーク（ノードの種類・デフォルト以外のアトリビュート値・接続・
+# テクスチャファイルの更新時刻）から正規化したハッシュを作り、エクスポートフォルダに記録する。
+# ハッシュが前回と同じマテリアルは書き出さない。
+# エクスポートフォルダは複数のシーンで共有されるため、エントリはシーンごとに分けて記録する。
+# エクスポート時はマニフェストのエントリを除外するだけで、ファイルは削除しない
+# （不要なファイルの削除は「不要なエクスポートファイルを削除」から確認のうえ行う）。
+# ---------------------------------------------------------------------------
+MANIFEST_NAME = "material_manifest.json"
+MANIFEST_VERSION = 2
+
+
+def manifest_path():
+    return os.path.join(export_folder, MANIFEST_NAME)
+
+
+def manifest_scene_key():
+    """ マニフェストのシーンごとのキー（未保存のシーンは untitled） """
+    scene = cmds.file(q=True, sceneName=True)
+    return os.path.normcase(os.path.normpath(scene)) if scene else "untitled"
+
+
+def load_manifest():
+    try:
+        with open(manifest_path(), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}  # 形式が変わった場合はすべて書き出し直す
+    return manifest.get("scenes", {})  # シーンのキー -> {マテリアル: エントリ}
+
+
+def save_manifest(scenes):
+    # 書き込み途中で中断されても壊れないよう、一時ファイルから置き換える
+    temp_path = manifest_path() + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "scenes": scenes}, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temp_path, manifest_path())
+
+
+def expand_texture_path(path):
+    """ UDIM などのトークンを含むパスを該当する全ファイルに展開する（プロジェクト相対パスは絶対パスにする） """
+    if path and not os.path.isabs(path):
+        path = cmds.workspace(expandName=path)
+    pattern = path
+    for token in ("<UDIM>", "<udim>", "<UVTILE>", "<uvtile>", "<f>", "<F>"):
+        pattern = pattern.replace(token, "*")
+    return sorted(glob.glob(pattern)) if pattern != path else [path]
+
+
+def texture_signatures(path):
+    """ テクスチャファイル（UDIM などのトークンを含む場合は該当する全ファイル）の更新時刻とサイズ """
+    signatures = []
+    for file_path in expand_texture_path(path):
+        try:
+            stat = os.stat(file_path)
+            signatures.append((os.path.basename(file_path), stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signatures.append((os.path.basename(file_path), None, None))
+    return signatures
+
+
+def node_signature(node):
+    """ ノードの種類とデフォルト以外のアトリビュート値（setAttr 形式）を返す """
+    selection = om.MSelectionList()
+    selection.add(node)
+    obj = selection.getDependNode(0)
+    fn = om.MFnDependencyNode(obj)
+
+    values = []
+    for i in range(fn.attributeCount()):
+        attribute = om.MFnAttribute(fn.attribute(i))
+        # 子アトリビュートは親の setAttr に含まれる
+        if not attribute.storable or not attribute.parent.isNull():
+            continue
+        plug = om.MPlug(obj, fn.attribute(i))
+        values.extend(plug.getSetAttrCmds(om.MPlug.kNonDefault, False))
+    return fn.typeName, sorted(values)
+
+
+def material_network_hash(material, preview_type):
+    """ マテリアルの上流ネットワーク全体の正規化ハッシュ """
+    nodes = sorted(set(cmds.listHistory(material) or []) | {material})
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{MANIFEST_VERSION}|{preview_type}".encode("utf-8"))
+
+    for node in nodes:
+        node_type, values = node_signature(node)
+        digest.update(f"\nnode|{node}|{node_type}".encode("utf-8"))
+        for value in values:
+            digest.update(f"\n{value}".encode("utf-8"))
+        if node_type == "file":
+            texture = cmds.getAttr(f"{node}.fileTextureName") or ""
+            digest.update(f"\ntexture|{texture}|{texture_signatures(texture)}".encode("utf-8"))
+
+    # ネットワーク内の接続（ネットワーク外からの接続はノード値の変化として扱わない）
+    connections = cmds.listConnections(nodes, source=True, destination=False, connections=True, plugs=True) or []
+    network = set(nodes)
+    pairs = sorted(
+        (source, destination) for destination, source in zip(connections[::2], connections[1::2])
+        if source.split(".", 1)[0] in network
+    )
+    for source, destination in pairs:
+        digest.update(f"\nconnect|{source}|{destination}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def build_export_jobs(objects):
+    jobs = []
+    for obj in objects:
+        material_name = obj.replace("_pMesh", "")
+        export_path = os.path.join(export_folder, f"{material_name}{EXPORT_FORMATS[export_format]}").replace('/', '\\')
+        jobs.append({"object": obj, "material": material_name, "shader": created_materials.get(obj, ""), "path": export_path})
+    return jobs
+
+
+def filter_changed_jobs(jobs, manifest):
+    """ ハッシュを計算し、前回から変わったジョブと変わっていないジョブに分ける """
+    changed, unchanged = [], []
+    for job in jobs:
+        preview_type = "plane" if has_texture(job["shader"]) else "sphere"
+        job["hash"] = material_network_hash(job["shader"], preview_type) if job["shader"] else ""
+        entry = manifest.get(job["shader"])
+        if (job["hash"] and entry and entry["hash"] == job["hash"]
+                and entry["file"] == os.path.basename(job["path"]) and os.path.exists(job["path"])):
+            unchanged.append(job)
+        else:
+            changed.append(job)
+    return changed, unchanged
+
+
+def prune_manifest(scene_manifest):
+    """ 現在のシーンのエントリのうち、シーンに無くなったマテリアルとファイルが消えたものを除外する（ファイルは削除しない。戻り値: 除外数） """
+    removed = 0
+    for shader, entry in list(scene_manifest.items()):
+        if cmds.objExists(shader) and os.path.exists(os.path.join(export_folder, entry["file"])):
+            continue
+        del scene_manifest[shader]
+        removed += 1
+    return removed
+
+
+def record_exported_jobs(results, jobs):
+    """ 書き出しに成功したジョブを現在のシーンのマニフェストに記録する """
+    manifest = load_manifest()
+    scene_manifest = manifest.setdefault(manifest_scene_key(), {})
+    jobs_by_path = {job["path"]: job for job in jobs}
+    for result in results:
+        job = jobs_by_path.get(result["path"])
+        if result["ok"] and job and job["shader"]:
+            scene_manifest[job["shader"]] = {"hash": job["hash"], "file": os.path.basename(job["path"]), "exported": time.time()}
+    save_manifest(manifest)
+
+
+def stale_export_files(manifest):
+    """ どのシーンのマニフェストからも参照されていないエクスポートファイル
+    （保存先のシーンファイルが無くなったシーンのエントリは manifest から取り除く） """
+    for scene in list(manifest):
+        if scene != "untitled" and not os.path.exists(scene):
+            del manifest[scene]
+    referenced = {entry["file"] for entries in manifest.values() for entry in entries.values()}
+    extensions = set(EXPORT_FORMATS.values())
+    return sorted(
+        name for name in os.listdir(export_folder)
+        if os.path.splitext(name)[1] in extensions and name not in referenced
+        and os.path.isfile(os.path.join(export_folder, name))
+    )
+
+
+def clean_export_folder():
+    """ 不要なエクスポートファイルを確認のうえ削除する """
+    if not os.path.exists(export_folder):
+        cmds.warning("エクスポートフォルダが存在しません")
+        return
+    manifest = load_manifest()
+    stale = stale_export_files(manifest)
+    if not stale:
+        cmds.confirmDialog(title="エクスポートフォルダの整理", message="削除できるファイルはありません。", button="OK")
+        return
+    listed = "\n".join(stale[:20]) + (f"\n... 他 {len(stale) - 20} 個" if len(stale) > 20 else "")
+    result = cmds.confirmDialog(title="エクスポートフォルダの整理",
+                                message=f"どのシーンのマニフェストにも記録されていないファイルが {len(stale)} 個あります。\n\n{listed}\n\n削除しますか？",
+                                button=["削除する", "キャンセル"], defaultButton="キャンセル", cancelButton="キャンセル", dismissString="キャンセル")
+    if result != "削除する":
+        return
+    deleted = 0
+    for name in stale:
+        try:
+            os.remove(os.path.join(export_folder, name))
+            deleted += 1
+        except OSError as e:
+            cmds.warning(f"{name} を削除できませんでした: {e}")
+    save_manifest(manifest)
+    print(f"{deleted} 個のエクスポートファイルを削除しました。")
+
+
+# ---------------------------------------------------------------------------
+# シェーディングネットワークのシリアライズ
+# マテリアルの上流ネットワーク（＋シェーディンググループ・materialInfo）を 1 回だけたどり、
+# ノード・デフォルト以外のアトリビュート値（setAttr 形式）・ネットワーク内の接続を書き出す。
+#   .json : そのまま読める JSON
+#   .snet : NETWORK_HEADER + zlib 圧縮した同じ JSON（Maya 無しでも json/zlib で読める）
+# インポートはネットワーク全体を 1 つの MEL にまとめて 1 回の mel.eval で作成する。
+# ---------------------------------------------------------------------------
+NETWORK_VERSION = 1
+NETWORK_MAGIC = b"SNET"
+NETWORK_HEADER = struct.Struct("<4sHI")  # マジック, バージョン, 展開後のサイズ
+
+# 出力形式 -> 拡張子
+EXPORT_FORMATS = {"Maya Binary": ".mb", "JSON": ".json", "Binary": ".snet"}
+export_format = "Maya Binary"
+
+
+def network_nodes(material):
+    """ マテリアルの上流ノードと、接続されたシェーディンググループ・materialInfo を返す """
+    nodes = list(dict.fromkeys((cmds.listHistory(material) or []) + [material]))
+    shading_groups = cmds.listConnections(material, type="shadingEngine", source=False, destination=True) or []
+    for sg in dict.fromkeys(shading_groups):
+        nodes.append(sg)
+        nodes.extend(cmds.listConnections(sg, type="materialInfo", source=False, destination=True) or [])
+    # defaultColorMgtGlobals などシーン共通のノードは含めない（接続も書き出さない）
+    defaults = set(cmds.ls(nodes, defaultNodes=True) or [])
+    return [node for node in dict.fromkeys(nodes) if node not in defaults]
+
+
+def node_kind(node_type):
+    """ shadingNode の作成フラグ（分類の無いノードは createNode で作成する） """
+    if node_type == "shadingEngine":
+        return "shadingEngine"
+    classification = " ".join(cmds.getClassification(node_type) or [])
+    for prefix, kind in (("shader", "asShader"), ("texture", "asTexture"), ("utility", "asUtility"), ("light", "asLight")):
+        if classification.startswith(prefix) or f":{prefix}" in classification:
+            return kind
+    return ""
+
+
+def serialize_network(material):
+    nodes = network_nodes(material)
+    index = {node: i for i, node in enumerate(nodes)}
+
+    data = {"version": NETWORK_VERSION, "material": material, "nodes": [], "connections": []}
+    for node in nodes:
+        node_type, values = node_signature(node)
+        data["nodes"].append({"name": node, "type": node_type, "kind": node_kind(node_type),
+                              "attrs": [value.strip() for value in values]})
+
+    # ネットワーク内の接続のみ（[接続元の番号, アトリビュート, 接続先の番号, アトリビュート]）
+    connections = cmds.listConnections(nodes, source=True, destination=False, connections=True, plugs=True) or []
+    for destination, source in zip(connections[::2], connections[1::2]):
+        source_node, source_attr = source.split(".", 1)
+        destination_node, destination_attr = destination.split(".", 1)
+        if source_node in index and destination_node in index:
+            data["connections"].append([index[source_node], source_attr, index[destination_node], destination_attr])
+    data["connections"].sort()
+    return data
+
+
+def write_network(path, data):
+    text = json.dumps(data, ensure_ascii=False, indent=None if path.endswith(".snet") else 1)
+    if path.endswith(".snet"):
+        raw = text.encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(NETWORK_HEADER.pack(NETWORK_MAGIC, NETWORK_VERSION, len(raw)))
+            f.write(zlib.compress(raw, 6))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+def read_network(path):
+    if path.endswith(".snet"):
+        with open(path, "rb") as f:
+            magic, version, size = NETWORK_HEADER.unpack(f.read(NETWORK_HEADER.size))
+            if magic != NETWORK_MAGIC or version != NETWORK_VERSION:
+                raise ValueError(f"対応していないファイルです: {path}")
+            return json.loads(zlib.decompress(f.read()).decode("utf-8"))
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def network_to_mel(data):
+    """ ネットワークを作成する MEL（作成したノード名の配列を返す proc）を組み立てる """
+    lines = ["proc string[] materialObjExportImportNetwork() {"]
+    for i, node in enumerate(data["nodes"]):
+        name, node_type, kind = node["name"].split(":")[-1], node["type"], node["kind"]
+        if kind == "shadingEngine":
+            lines.append(f'string $n{i} = `sets -renderable true -noSurfaceShader true -empty -name "{name}"`;')
+        elif kind:
+            lines.append(f'string $n{i} = `shadingNode -{kind} -skipSelect -name "{name}" {node_type}`;')
+        else:
+            lines.append(f'string $n{i} = `createNode -skipSelect -name "{name}" {node_type}`;')
+        if node["attrs"]:
+            lines.append(f"select -noExpand $n{i};")
+            lines.extend(node["attrs"])
+    for source, source_attr, destination, destination_attr in data["connections"]:
+        lines.append(f'connectAttr -force ($n{source} + ".{source_attr}") ($n{destination} + ".{destination_attr}");')
+    lines.append("select -clear;")
+    lines.append("return {" + ", ".join(f"$n{i}" for i in range(len(data["nodes"]))) + "};")
+    lines.append("}")
+    lines.append("materialObjExportImportNetwork();")
+    return "\n".join(lines)
+
+
+def import_network(path):
+    """ 書き出したネットワークを読み込み、作成したノード名のリストを返す """
+    data = read_network(path)
+    cmds.undoInfo(openChunk=True, chunkName="importShadingNetwork")
+    try:
+        created = mel.eval(network_to_mel(data)) or []
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return created
+
+
+def export_networks(jobs):
+    """ JSON / バイナリ形式のジョブをこのプロセス内で書き出す（Maya のファイル書き出しを使わないため高速） """
+    results = []
+    for job in jobs:
+        start = time.perf_counter()
+        result = {"object": job["object"], "path": job["path"], "ok": True, "error": ""}
+        try:
+            write_network(job["path"], serialize_network(job["shader"]))
+        except (OSError, RuntimeError, ValueError) as e:
+            result["ok"] = False
+            result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - start
+        results.append(result)
+    record_exported_jobs(results, jobs)
+    return results
+
+
+# .mb とネットワーク形式の書き出し・読み込み時間を比較する（作成済みのオブジェクトのマテリアルを使用）
+def benchmark_network_roundtrip():
+    objects = [obj for obj in created_objects if cmds.objExists(obj) and created_materials.get(obj)]
+    if not objects:
+        cmds.warning("先にマテリアルを取得してオブジェクトを作成してください。")
+        return
+
+    temp_dir = tempfile.mkdtemp(prefix="material_benchmark_")
+    try:
+        start = time.perf_counter()
+        for i, obj in enumerate(objects):
+            cmds.select(obj, replace=True)
+            cmds.file(os.path.join(temp_dir, f"{i}.mb"), force=True, options="v=0;", type="mayaBinary", exportSelected=True)
+        mb_export = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(len(objects)):
+            cmds.file(os.path.join(temp_dir, f"{i}.mb"), i=True, type="mayaBinary", namespace="materialBenchmark",
+                      mergeNamespacesOnClash=True, options="v=0;")
+        mb_import = time.perf_counter() - start
+        cmds.namespace(removeNamespace="materialBenchmark", deleteNamespaceContent=True)
+
+        created = []
+        start = time.perf_counter()
+        for i, obj in enumerate(objects):
+            write_network(os.path.join(temp_dir, f"{i}.snet"), serialize_network(created_materials[obj]))
+        network_export = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(len(objects)):
+            created.extend(import_network(os.path.join(temp_dir, f"{i}.snet")))
+        network_import = time.perf_counter() - start
+        cmds.delete([node for node in created if cmds.objExists(node)])
+
+        print(f"マテリアル {len(objects)} 個の書き出し / 読み込み: "
+              f".mb {mb_export:.2f} / {mb_import:.2f} 秒 | ネットワーク {network_export:.2f} / {network_import:.2f} 秒")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        cmds.select(clear=True)
+
+
 def export_objects():
-    global created_objects
+    global created_objects, export_pool
 
-    if not created_objects:
+    if export_pool is not None:
+        cmds.warning("エクスポートを実行中です。")
+        return
+
+    objects = [obj for obj in created_objects if cmds.objExists(obj)]
+    if not objects:
         cmds.warning("エクスポートするオブジェクトが存在しません。")
         return
 
     if not os.path.exists(export_folder):
         os.makedirs(export_folder)
 
-    exported_files = []
-    for obj in created_objects:
-        if not cmds.objExists(obj):
-            continue
+    start = time.perf_counter()
+    manifest = load_manifest()
+    scene_manifest = manifest.setdefault(manifest_scene_key(), {})
+    removed = prune_manifest(scene_manifest)
+    jobs, unchanged = filter_changed_jobs(build_export_jobs(objects), scene_manifest)
+    save_manifest(manifest)
+    summary = f"エクスポート {len(jobs)} / スキップ {len(unchanged)} / 除外 {removed}（ハッシュ計算 {time.perf_counter() - start:.2f} 秒）"
+    print(summary)
+    if not jobs:
+        if cmds.text("exportStatusText", exists=True):
+            cmds.text("exportStatusText", edit=True, label=summary)
+        cmds.confirmDialog(title="エクスポート完了", message=f"変更されたマテリアルはありません。\n\n{summary}", button="OK")
+        return
 
-        material_name = obj.replace("_pMesh", "")
-        export_path = os.path.join(export_folder, f"{material_name}.mb").replace('/', '\\')
+    if export_format != "Maya Binary":
+        # ネットワーク形式は Maya のファイル書き出しを使わないため、ワーカーを起動せずに書き出す
+        pool = ExportPool(jobs, None, None, workers=1)
+        pool.skipped = len(unchanged)
+        pool.removed = removed
+        pool.started = start
+        pool.results = export_networks(jobs)
+        finish_export(pool)
+        return
+
+    # 作成したオブジェクトをまとめて 1 つのファイルに書き出し、ワーカーはそれを開いて分割する
+    job_dir = tempfile.mkdtemp(prefix="material_export_")
+    source = os.path.join(job_dir, "source.mb")
+    current_selection = cmds.ls(selection=True)
+    cmds.select([job["object"] for job in jobs], replace=True)
+    cmds.file(source, force=True, options="v=0;", type="mayaBinary", exportSelected=True)
+    if current_selection:
+        cmds.select(current_selection, replace=True)
+    else:
+        cmds.select(clear=True)
+
+    pool = ExportPool(jobs, job_dir, EXPORTERS[exporter_name])
+    pool.skipped = len(unchanged)
+    pool.removed = removed
+    if not pool.start(source):
+        shutil.rmtree(job_dir, ignore_errors=True)
+        cmds.warning("mayapy が見つからないため、このプロセス内でエクスポートします。")
+        export_objects_serial(jobs)
+        return
+
+    export_pool = pool
+    print(f"エクスポートを開始しました（{len(jobs)} ファイル, {pool.workers} プロセス）")
+    if cmds.progressBar("exportProgressBar", exists=True):
+        cmds.progressBar("exportProgressBar", edit=True, maxValue=len(jobs), progress=0)
+        cmds.text("exportStatusText", edit=True, label=f"エクスポート中... 0 / {len(jobs)}")
 
-        cmds.select(obj)
-        cmds.file(export_path, force=True, options="v=0;", type="mayaBinary", exportSelected=True)
-        exported_files.append(f"{material_name}.mb\n{export_path}")
+
+def cancel_export():
+    if export_pool is None:
+        cmds.warning("実行中のエクスポートはありません。")
+        return
+    export_pool.cancel()
+
+
+# ワーカーを起動できない場合の従来の処理（このプロセス内で順番に書き出す）
+def export_objects_serial(jobs):
+    exported_files = []
+    for job in jobs:
+        cmds.select(job["object"])
+        cmds.file(job["path"], force=True, options="v=0;", type="mayaBinary", exportSelected=True)
+        exported_files.append(f"{os.path.basename(job['path'])}\n{job['path']}")
+    record_exported_jobs([{"path": job["path"], "ok": True} for job in jobs], jobs)
 
     if exported_files:
         exported_text = "\n\n".join(exported_files)
@@ -128,36 +953,263 @@ def export_objects():
 def import_object():
     initial_dir = export_folder if os.path.exists(export_folder) else scene_dir
 
-    file_path = cmds.fileDialog2(fileMode=1, caption="インポートするオブジェクトを選択", fileFilter="Maya Binary (*.mb)", dir=initial_dir)
+    file_path = cmds.fileDialog2(fileMode=1, caption="インポートするオブジェクトを選択",
+                                 fileFilter="Maya Binary (*.mb);;Shading Network (*.json *.snet)", dir=initial_dir)
     if not file_path:
         return
 
+    if file_path[0].endswith((".json", ".snet")):
+        created = import_network(file_path[0])
+        cmds.confirmDialog(title="インポート完了", message=f"シェーディングネットワークをインポートしました（{len(created)} ノード）。", button="OK")
+        return
+
     cmds.file(file_path[0], i=True, type="mayaBinary", ignoreVersion=True, mergeNamespacesOnClash=False, options="v=0;")
     cmds.confirmDialog(title="インポート完了", message="ファイルをインポートしました。", button="OK")
 
 def apply_material_between_selected():
+    # 最後に選択したオブジェクト (B) のマテリアルを、それ以外のすべての選択 (A) に割り当てる
     selection = cmds.ls(selection=True)
     if len(selection) < 2:
         cmds.warning("2つのオブジェクトを選択してください。")
         return
 
-    source_obj, target_obj = selection[1], selection[0]
-    shading_groups = cmds.ls(cmds.listHistory(source_obj, future=True, pruneDagObjects=True) or [], type="shadingEngine")
-
-    if not shading_groups:
+    source_obj, targets = selection[-1], selection[:-1]
+    index = get_shading_index()
+    if not index.assignments(source_obj):
         cmds.warning("マテリアルを取得できませんでした。")
         return
 
-    materials = cmds.listConnections(shading_groups[0] + ".surfaceShader", source=True, destination=False) or []
+    materials = index.materials_of(source_obj)
     if not materials:
         cmds.warning("マテリアルが見つかりません。")
         return
 
-    cmds.select(target_obj, replace=True)
-    cmds.hyperShade(assign=materials[0])
+    assign_material(materials[0], targets)
     cmds.select(clear=True)
 
-    cmds.confirmDialog(title="マテリアル適用", message=f"{target_obj} に {materials[0]} を適用しました。", button="OK")
+    target_text = targets[0] if len(targets) == 1 else f"{len(targets)} 個のオブジェクト"
+    cmds.confirmDialog(title="マテリアル適用", message=f"{target_text} に {materials[0]} を適用しました。", button="OK")
+
+# ---------------------------------------------------------------------------
+# 未使用・重複マテリアルの分析
+# 未割り当てのマテリアルと、名前を除いた構造が同じネットワークを正規化ハッシュで検出する。
+# テクスチャのメモリ量は画像ヘッダー（解像度・チャンネル数・ビット数）から推定し、
+# ヘッダーの読み込みはスレッドプールで並列に行う。
+# ---------------------------------------------------------------------------
+ANALYZE_WORKERS = 8
+MIPMAP_FACTOR = 4.0 / 3.0  # ミップマップを含めたメモリ量の倍率
+
+
+def read_texture_info(path):
+    """ 画像ヘッダーから (幅, 高さ, チャンネル数, 1 チャンネルあたりのバイト数) を返す（読めなければ None） """
+    try:
+        info = read_image_header(path, check_complete=False)
+    except (OSError, ValueError, TextureNotReady, struct.error):
+        return None  # 壊れたヘッダーや未対応の形式はサイズ不明として扱う
+    if not info["width"] or not info["height"]:
+        return None
+    return info["width"], info["height"], info["channels"], max(1, info["bits"] // 8)
+
+
+
+def estimate_texture_memory(paths):
+    """ テクスチャパス -> 推定メモリ量（バイト）。ヘッダーはスレッドプールで読む """
+    with ThreadPoolExecutor(max_workers=ANALYZE_WORKERS) as pool:
+        infos = dict(zip(paths, pool.map(read_texture_info, paths)))
+    return {
+        path: int(info[0] * info[1] * info[2] * info[3] * MIPMAP_FACTOR) if info else 0
+        for path, info in infos.items()
+    }
+
+
+def structural_network_hash(material, defaults=frozenset()):
+    """ ノード名を除いたネットワーク構造の正規化ハッシュ（同じ構造・同じ値なら同じになる） """
+    # マテリアルから接続先アトリビュート名の順に上流をたどり、ノードに正規の番号を振る
+    order = [material]
+    index = {material: 0}
+    edges = []
+    position = 0
+    while position < len(order):
+        node = order[position]
+        connections = cmds.listConnections(node, source=True, destination=False, connections=True, plugs=True) or []
+        for destination, source in sorted(zip(connections[::2], connections[1::2])):
+            source_node, source_attr = source.split(".", 1)
+            if source_node in defaults:
+                continue  # シーン共通のノードは構造に含めない
+            if source_node not in index:
+                index[source_node] = len(order)
+                order.append(source_node)
+            edges.append((index[source_node], source_attr, position, destination.split(".", 1)[1]))
+        position += 1
+
+    digest = hashlib.blake2b(digest_size=16)
+    for node in order:
+        node_type, values = node_signature(node)
+        digest.update(f"\nnode|{node_type}".encode("utf-8"))
+        for value in values:
+            digest.update(f"\n{value}".encode("utf-8"))
+    for edge in sorted(edges):
+        digest.update(f"\nconnect|{edge}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def analyze_materials():
+    """ 未使用・重複マテリアルとテクスチャのメモリ量を調べる """
+    index = get_shading_index()
+    index.flush()
+    defaults = set(cmds.ls(defaultNodes=True) or [])
+    materials = [m for m in cmds.ls(materials=True) or [] if m not in defaults]
+
+    def members(material):
+        return [member for sg in index.by_material.get(material, ()) for member in index.shading_groups[sg]["members"]]
+
+    def feeds_other_network(material):
+        # レイヤーシェーダーなど、シェーディンググループ以外の入力として使われているか
+        outputs = cmds.listConnections(material, source=False, destination=True) or []
+        return any(node not in defaults and cmds.nodeType(node) not in ("shadingEngine", "materialInfo") for node in outputs)
+
+    unused = [m for m in materials if not members(m) and not feeds_other_network(m)]
+
+    # 構造が同じマテリアルをまとめる（割り当ての多いものを残す）
+    # 他のネットワークの入力になっているものは付け替えられないため対象外
+    by_hash = {}
+    for material in materials:
+        if material not in unused and not feeds_other_network(material):
+            by_hash.setdefault(structural_network_hash(material, defaults), []).append(material)
+    duplicates = [sorted(group, key=lambda m: (-len(members(m)), m)) for group in by_hash.values() if len(group) > 1]
+
+    # テクスチャのメモリ量（UDIM などのタイルも含む）
+    textures = {}
+    for material in materials:
+        for file_node in index.textures_of(material):
+            for path in expand_texture_path(cmds.getAttr(f"{file_node}.fileTextureName") or ""):
+                textures.setdefault(path, set()).add(material)
+    memory = estimate_texture_memory(list(textures))
+    material_memory = {m: 0 for m in materials}
+    for path, users in textures.items():
+        for material in users:
+            material_memory[material] += memory[path]
+
+    return {"materials": materials, "unused": unused, "duplicates": duplicates,
+            "texture_memory": memory, "material_memory": material_memory}
+
+
+def print_material_report(report):
+    mb = 1024 * 1024
+    total = sum(report["texture_memory"].values())
+    unused_memory = sum(report["material_memory"][m] for m in report["unused"])
+    duplicate_memory = sum(report["material_memory"][m] for group in report["duplicates"] for m in group[1:])
+    print(f"マテリアル {len(report['materials'])} 個 | テクスチャ {len(report['texture_memory'])} 枚（推定 {total / mb:.1f} MB）")
+    print(f"未使用: {len(report['unused'])} 個（テクスチャ推定 {unused_memory / mb:.1f} MB）")
+    for material in report["unused"]:
+        print(f"  {material}  {report['material_memory'][material] / mb:.1f} MB")
+    print(f"重複: {sum(len(group) - 1 for group in report['duplicates'])} 個（テクスチャ推定 {duplicate_memory / mb:.1f} MB）")
+    for group in report["duplicates"]:
+        print(f"  {group[0]} <- {', '.join(group[1:])}")
+    for path, size in sorted(report["texture_memory"].items(), key=lambda item: -item[1])[:20]:
+        print(f"  {size / mb:8.1f} MB  {path}")
+    return f"未使用 {len(report['unused'])} / 重複 {sum(len(group) - 1 for group in report['duplicates'])} / テクスチャ推定 {total / mb:.1f} MB"
+
+
+# シェーディングネットワークの外にあっても削除を妨げない、シーン共通のノードの種類
+SHARED_NODE_TYPES = {"lightLinker", "renderPartition", "defaultShaderList", "defaultTextureList",
+                     "defaultRenderUtilityList", "materialInfo", "colorManagementGlobals"}
+SHADING_CLASSIFICATIONS = ("shader", "texture", "utility")
+
+
+def is_protected_node(node):
+    """ リファレンスから読み込まれたノード・ロックされたノード """
+    return cmds.referenceQuery(node, isNodeReferenced=True) or cmds.lockNode(node, query=True, lock=True)[0]
+
+
+def is_shading_node(node):
+    """ DAG ではなく、シェーディングノードとして分類されたノード（シェーディンググループ・materialInfo を含む） """
+    if cmds.objectType(node, isAType="dagNode"):
+        return False
+    node_type = cmds.nodeType(node)
+    if node_type in ("shadingEngine", "materialInfo"):
+        return True
+    for classification in cmds.getClassification(node_type) or []:
+        for entry in classification.split(":"):
+            if entry.split("/", 1)[0] in SHADING_CLASSIFICATIONS:
+                return True
+    return False
+
+
+def deletable_nodes(candidates, defaults):
+    """ 削除してよいノードだけを残す
+    DAG・リファレンス・ロック・シェーディング以外（リグのコントロールやエクスプレッションなど）を除き、
+    削除しないノードと接続されているノードも除く（除いたノードの上流も連鎖的に残る） """
+    nodes = {node for node in candidates if cmds.objExists(node) and is_shading_node(node) and not is_protected_node(node)}
+    neighbours = {}
+    for node in nodes:
+        connected = cmds.listConnections(node, source=True, destination=True) or []
+        neighbours[node] = {
+            other for other in connected
+            if other not in defaults and cmds.nodeType(other) not in SHARED_NODE_TYPES
+        }
+
+    changed = True
+    while changed:
+        changed = False
+        for node in list(nodes):
+            if not neighbours[node] <= nodes:
+                nodes.discard(node)
+                changed = True
+    return nodes
+
+
+def consolidate_materials(report):
+    """ 重複マテリアルの割り当てを残すマテリアルへ付け替え、未使用・重複のネットワークを 1 つの Undo チャンクで削除する """
+    index = get_shading_index()
+    defaults = set(cmds.ls(defaultNodes=True) or [])
+
+    # リファレンス・ロックされたマテリアルは付け替えも削除もしない
+    protected = {m for m in report["unused"] + [m for group in report["duplicates"] for m in group] if is_protected_node(m)}
+    if protected:
+        cmds.warning(f"リファレンスまたはロックされているため整理しないマテリアル: {sorted(protected)}")
+    remove = {m for m in report["unused"] if m not in protected}
+
+    cmds.undoInfo(openChunk=True, chunkName="consolidateMaterials")
+    try:
+        for group in report["duplicates"]:
+            keep = group[0]
+            merged = [m for m in group[1:] if m not in protected]
+            targets = [member for m in merged for sg in index.by_material.get(m, ()) for member in index.shading_groups[sg]["members"]]
+            if targets:
+                assign_material(keep, targets)
+            remove.update(merged)
+
+        # 残すマテリアルが使っているノード（共有テクスチャなど）は削除しない
+        keep_nodes = set()
+        for material in report["materials"]:
+            if material not in remove:
+                keep_nodes.update(network_nodes(material))
+        candidates = {node for material in remove for node in network_nodes(material)} - keep_nodes
+        delete_nodes = sorted(deletable_nodes(candidates, defaults))
+        if delete_nodes:
+            cmds.delete(delete_nodes)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    kept = len(candidates) - len(delete_nodes)
+    print(f"{len(remove)} 個のマテリアルを整理しました（{len(delete_nodes)} ノードを削除"
+          + (f", 他のノードと接続されているなどの理由で {kept} ノードを残しました）" if kept else "）"))
+    return len(remove)
+
+
+def analyze_materials_ui():
+    start = time.perf_counter()
+    report = analyze_materials()
+    summary = print_material_report(report)
+    summary += f"（{time.perf_counter() - start:.2f} 秒）"
+    if not report["unused"] and not report["duplicates"]:
+        cmds.confirmDialog(title="マテリアル分析", message=f"整理できるマテリアルはありません。\n\n{summary}", button="OK")
+        return
+    result = cmds.confirmDialog(title="マテリアル分析", message=f"{summary}\n\n詳細はスクリプトエディタを確認してください。\n重複の割り当てを統合し、未使用のマテリアルを削除しますか？",
+                                button=["整理する", "キャンセル"], defaultButton="キャンセル", cancelButton="キャンセル", dismissString="キャンセル")
+    if result == "整理する":
+        consolidate_materials(report)
+
 
 def open_export_folder_in_explorer(*args):
     """エクスポートフォルダをエクスプローラーで開く"""
@@ -177,21 +1229,39 @@ def create_ui():
     if cmds.window("materialExportUI", exists=True):
         cmds.deleteUI("materialExportUI")
 
-    window = cmds.window("materialExportUI", title="Material obj Export", widthHeight=(380, 240))
+    window = cmds.window("materialExportUI", title="Material obj Export", widthHeight=(380, 390))
     cmds.columnLayout(adjustableColumn=True)
 
     cmds.separator(height=3, style='none')
     cmds.button(label="マテリアルを取得しオブジェクトを作成", command=lambda _: apply_selected_material_to_objects())
     cmds.separator(height=5, style='none')
+    def on_format_change(value):
+        global export_format
+        export_format = value
+
+    format_menu = cmds.optionMenu(label="形式", changeCommand=on_format_change)
+    for format_name in EXPORT_FORMATS:
+        cmds.menuItem(label=format_name)
+    cmds.optionMenu(format_menu, edit=True, value=export_format)
     cmds.button(label="エクスポート", command=lambda _: export_objects())
+    cmds.progressBar("exportProgressBar", maxValue=1, progress=0)
+    cmds.text("exportStatusText", label="", align="left")
+    cmds.button(label="エクスポートを中止", command=lambda _: cancel_export())
     cmds.separator(height=5, style='none')
     cmds.button(label="インポート", command=lambda _: import_object())
     cmds.separator(height=5, style='none')
     cmds.button(label="B→Aにマテリアルを適用", command=lambda _: apply_material_between_selected())
+    cmds.separator(height=5, style='none')
+    cmds.button(label="未使用・重複マテリアルを分析", command=lambda _: analyze_materials_ui())
     cmds.separator(height=5, style='in')
     cmds.button(label="エクスポートフォルダを開く", command=lambda _: open_export_folder_in_explorer())  # 新しいボタンを追加
+    cmds.separator(height=5, style='none')
+    cmds.button(label="不要なエクスポートファイルを削除", command=lambda _: clean_export_folder())
 
     cmds.setParent("..")
     cmds.showWindow(window)
 
+    # ウィンドウを閉じたらインデックスのコールバックを解除
+    cmds.scriptJob(uiDeleted=[window, release_shading_index], runOnce=True)
+
 create_ui()
\ No newline at end of file
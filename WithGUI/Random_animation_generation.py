@@ -2,9 +2,13 @@
 # ScriptName: Random animation generation
 # Author: Naruse,GPT-5
 # Contents   :選択したオブジェクトをアニメーションレイヤーに追加してランダムアニメーションを生成する
+#              値の生成は NumPy でまとめて行い、キーはカーブ単位で一括して書き込む
+#              シードを固定すると (シード, UUID, アトリビュート) ごとに同じ乱数列で再生成できる
+#              一様乱数のほかに Perlin / Simplex ノイズ（オクターブ 2 以上で fBm）で滑らかな揺れを生成できる
+#              一時的なアニメーションレイヤーでプレビューし、確定時はオブジェクト単位で分割して書き込む（キャンセル可）
 # CreatedDate: 2025年12月15日
-# LastUpdate: 2025年12月16日
-# Version: 0.2
+# LastUpdate: 2026年10月19日
+# Version: 0.6
 #
 # 《License》
 # Copyright (c) 2025 Naruse
@@ -14,10 +18,57 @@
 
 
 import maya.cmds as cmds
-import random
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+import hashlib
+import os
+import sys
+import time
+import numpy as np
 
 WINDOW_NAME = "RandomAnimationGenerationUI"
 
+NOISE_TYPES = ("ランダム", "Perlin", "Simplex")  # 先頭は従来の一様乱数
+FBM_GAIN = 0.5                                  # fBm のオクターブごとの振幅倍率
+FBM_LACUNARITY = 2.0                            # fBm のオクターブごとの周波数倍率
+SIMPLEX_SCALE = 256.0 / 81.0                    # 1D Simplex の最大値 81/256 を ±1 に正規化する
+
+PREVIEW_MEMORY_MB = 64       # プレビューで生成する値の上限（超えた分のオブジェクトはプレビューしない）
+PREVIEW_LAYER_NAME = "randomAnimationPreview"  # プレビュー用の一時レイヤー
+COMMIT_MEMORY_MB = 256       # 書き込み時に 1 チャンクで生成する値の上限
+COMMIT_CHUNK_OBJECTS = 100   # 書き込み時の 1 チャンクあたりの最大オブジェクト数
+
+animation_preview = None       # 表示中の AnimationPreview
+scene_callback_ids = []        # シーンの保存・新規作成・読み込み前にプレビューを削除するコールバック
+
+
+# =============================================
+# Undo 対応の API 書き込み
+# MFnAnimCurve.addKeys（MAnimCurveChange）など API による変更は Maya の Undo キューに入らないため、
+# リポジトリの plugin/mayaUtilitiesApiUndo にある小さな MPxCommand プラグイン経由で実行する（Ctrl+Z / Ctrl+Y で戻せる）
+API_UNDO_PLUGIN = "mayaUtilitiesApiUndo"
+API_UNDO_SHARED = "mayaUtilitiesApiUndoShared"  # プラグインが run_undoable / call_without_undo を公開するモジュール名
+
+
+# プラグインを読み込み、共有モジュールを返す
+# MAYA_PLUG_IN_PATH に無い場合は、このスクリプトと同じリポジトリの plugin フォルダから読み込む
+def api_undo():
+    if not cmds.pluginInfo(API_UNDO_PLUGIN, query=True, loaded=True):
+        try:
+            cmds.loadPlugin(API_UNDO_PLUGIN, quiet=True)
+        except RuntimeError:
+            if "__file__" not in globals():
+                raise
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cmds.loadPlugin(os.path.join(root, "plugin", API_UNDO_PLUGIN, API_UNDO_PLUGIN + ".py"), quiet=True)
+    return sys.modules[API_UNDO_SHARED]
+
+
+# do_it を Undo 可能なコマンドとして実行する（Undo で undo_it、Redo で redo_it（省略時は do_it）を呼ぶ）
+def run_undoable(do_it, undo_it, redo_it=None):
+    api_undo().run_undoable(do_it, undo_it, redo_it)
+
+
 # 指定フレームを Maya のタイムライン範囲内に収める。
 def clamp_to_timeline(frame):
     min_f = int(cmds.playbackOptions(q=True, min=True)) # 最小フレーム未満 → 最小フレーム
@@ -46,9 +97,247 @@ def lerp(a, b, t):
     return a + (b - a) * t
 
 # =============================================
-# 選択オブジェクトをアニメーションレイヤーに追加し、
-# ランダム値＋任意フェード＋可変フレーム間隔でキーを生成するメイン処理
-def add_selected_to_anim_layer_with_keys(
+# 生成ステージ（Maya を使わず NumPy だけで計算する）
+# キーを打つフレームの列と、フレーム × アトリビュートの値の配列を作る
+
+# ---- 乱数ストリーム ----
+# (シード, オブジェクト UUID, アトリビュート) ごとに独立した Generator を作る。
+# 値は他のオブジェクトや生成順に左右されないため、一部だけ再生成しても同じ結果になり、
+# オブジェクトを分割して別プロセスで生成しても結合結果は変わらない
+
+# Python の hash() はプロセスごとに変わるため、名前は blake2b で固定の 32bit ワード列にする
+def stream_words(*names):
+    digest = hashlib.blake2b("/".join(names).encode("utf-8"), digest_size=16).digest()
+    return [int(word) for word in np.frombuffer(digest, dtype="<u4")]
+
+def random_stream(seed, *names):
+    sequence = np.random.SeedSequence([int(seed)] + stream_words(*names))
+    return np.random.Generator(np.random.PCG64(sequence))
+
+# シード未指定時に使う新しいシード（intField に入る範囲に収める）
+def new_seed():
+    return int(np.random.SeedSequence().entropy % (2 ** 31))
+
+# 生成フレーム間隔（ランダム成長を含む）から、キーを打つフレームの配列を作る
+def build_frame_schedule(start, end, step, random_step_enabled, step_limit, rng):
+    frames = []
+    current_frame = start
+    current_step = step
+    while current_frame <= end:
+        frames.append(current_frame)
+        if random_step_enabled:
+            # 現在のステップ幅を基準にランダム増加（上限がある場合はクランプ）
+            current_step += int(rng.integers(0, current_step + 1))
+            if step_limit is not None:
+                current_step = min(current_step, step_limit)
+        current_frame += current_step
+    return np.array(frames, dtype=np.float64)
+
+# フェード（ease-out）の重みをフレームごとに計算する（フェード開始前は 0）
+def fade_weights(frames, fade_start, end):
+    denom = max(1, end - fade_start)
+    t = np.clip((frames - fade_start) / float(denom), 0.0, 1.0)
+    t = 1.0 - (1.0 - t) ** 2
+    return np.where(frames >= fade_start, t, 0.0)
+
+# ---- コヒーレントノイズ ----
+# x（フレーム × 周波数）の列に対し、全アトリビュート分の勾配テーブル (格子点数, 列数) を使って
+# フレーム × 列 のノイズをまとめて評価する。戻り値はおおよそ -1 ～ 1
+
+def smootherstep(t):
+    return t * t * t * (t * (t * 6.0 - 15.0) + 10.0)
+
+# 1D Perlin（勾配）ノイズ
+def perlin_noise(x, gradients):
+    cell = np.floor(x).astype(np.int64)
+    f = (x - cell)[:, None]
+    g0 = gradients[cell]
+    g1 = gradients[cell + 1]
+    return 2.0 * lerp(g0 * f, g1 * (f - 1.0), smootherstep(f))
+
+# 1D Simplex ノイズ（両隣の格子点からの寄与を減衰カーネルで足し合わせる）
+def simplex_noise(x, gradients):
+    cell = np.floor(x).astype(np.int64)
+    x0 = (x - cell)[:, None]
+    x1 = x0 - 1.0
+    t0 = (1.0 - x0 * x0) ** 4
+    t1 = (1.0 - x1 * x1) ** 4
+    return SIMPLEX_SCALE * (t0 * gradients[cell] * x0 + t1 * gradients[cell + 1] * x1)
+
+NOISE_FUNCTIONS = {"Perlin": perlin_noise, "Simplex": simplex_noise}
+
+# オクターブを重ねたフラクタルノイズ（octaves=1 なら単一のノイズ）
+# 勾配テーブルは各列のストリームから順に引くため、シードと UUID が同じなら同じカーブになる
+def fractal_noise(frames, streams, noise_type, frequency, octaves):
+    noise_fn = NOISE_FUNCTIONS[noise_type]
+    offset = frames - frames[0]
+    result = np.zeros((len(frames), len(streams)))
+    total = 0.0
+    amplitude = 1.0
+    for octave in range(max(1, int(octaves))):
+        x = offset * (frequency * FBM_LACUNARITY ** octave)
+        lattice = int(np.floor(x[-1])) + 2
+        gradients = np.empty((lattice, len(streams)))
+        for column, rng in enumerate(streams):
+            gradients[:, column] = rng.uniform(-1.0, 1.0, lattice)
+        result += amplitude * noise_fn(x, gradients)
+        total += amplitude
+        amplitude *= FBM_GAIN
+    return result / total
+
+# ノイズ評価の速度を計測する（Maya 不要）
+def benchmark_noise(frame_count=2000, column_count=1000, noise_type="Perlin", octaves=4, frequency=0.05):
+    frames = np.arange(frame_count, dtype=np.float64)
+    streams = [random_stream(0, "benchmark", str(column)) for column in range(column_count)]
+    start = time.perf_counter()
+    fractal_noise(frames, streams, noise_type, frequency, octaves)
+    elapsed = time.perf_counter() - start
+    samples = frame_count * column_count * max(1, int(octaves))
+    print(f"{noise_type} x {octaves} オクターブ: {samples:,} サンプル / {elapsed:.3f} 秒"
+          f"（{samples / max(elapsed, 1e-9) / 1e6:.1f} M サンプル/秒）")
+    return elapsed
+
+# keys = [(UUID, アトリビュート名), ...] の各列をそれぞれのストリームから生成し、フェードを適用する
+# noise = (ノイズの種類, 周波数, オクターブ, 振幅)。None または "ランダム" なら一様乱数
+# ノイズは Min / Max の中央を基準に、振幅 1 で Min ～ Max に収まるよう配置する
+# Maya に依存しないトップレベル関数なので、そのままプロセスプールに渡せる
+def generate_key_chunk(frames, keys, seed, rand_min, rand_max, fade=None, noise=None):
+    streams = [random_stream(seed, uuid, attr) for uuid, attr in keys]
+    if noise is None or noise[0] not in NOISE_FUNCTIONS:
+        values = np.empty((len(frames), len(keys)))
+        for column, rng in enumerate(streams):
+            values[:, column] = rng.uniform(rand_min, rand_max, len(frames))
+    else:
+        noise_type, frequency, octaves, amplitude = noise
+        center = (rand_min + rand_max) * 0.5
+        half_range = (rand_max - rand_min) * 0.5
+        values = center + half_range * amplitude * fractal_noise(frames, streams, noise_type, frequency, octaves)
+    if fade is not None:
+        fade_start, fade_end, end = fade
+        weights = fade_weights(frames, fade_start, end)[:, None]
+        values = lerp(values, fade_end, weights)
+    return values
+
+# ランダム値を フレーム × アトリビュート の配列で生成する
+# executor（ProcessPoolExecutor など）を渡すと chunk_size ごとに分割して並列に生成する
+def generate_key_values(frames, keys, seed, rand_min, rand_max, fade=None, noise=None,
+                        executor=None, chunk_size=1024):
+    if executor is None or len(keys) <= chunk_size:
+        return generate_key_chunk(frames, keys, seed, rand_min, rand_max, fade, noise)
+    chunks = [keys[i:i + chunk_size] for i in range(0, len(keys), chunk_size)]
+    count = len(chunks)
+    results = executor.map(
+        generate_key_chunk,
+        [frames] * count, chunks, [seed] * count, [rand_min] * count, [rand_max] * count,
+        [fade] * count, [noise] * count
+    )
+    return np.concatenate(list(results), axis=1)
+
+# =============================================
+# 書き込みステージ
+# アトリビュートごとにレイヤー上のカーブを用意し、MFnAnimCurve.addKeys で全フレームを 1 回で追加する
+# addKeys は MAnimCurveChange に記録し、Undo 可能なコマンドとして実行する
+
+# API には内部単位（角度はラジアン、距離は cm）で渡す必要があるため、UI 単位からの倍率を返す
+def ui_to_internal_scale(kind):
+    if kind == "angle":
+        return om.MAngle(1.0, om.MAngle.uiUnit()).asRadians()
+    if kind == "distance":
+        return om.MDistance(1.0, om.MDistance.uiUnit()).asCentimeters()
+    return 1.0
+
+def internal_unit_scale(curve_fn):
+    curve_type = curve_fn.animCurveType
+    if curve_type in (oma.MFnAnimCurve.kAnimCurveTA, oma.MFnAnimCurve.kAnimCurveUA):
+        return ui_to_internal_scale("angle")
+    if curve_type in (oma.MFnAnimCurve.kAnimCurveTL, oma.MFnAnimCurve.kAnimCurveUL):
+        return ui_to_internal_scale("distance")
+    return 1.0
+
+def layer_curve(attr, layer_name):
+    # レイヤー上のカーブを MFnAnimCurve として取得する（見つからなければ None）
+    curves = cmds.animLayer(layer_name, q=True, findCurveForPlug=attr) or []
+    if not curves:
+        return None
+    selection = om.MSelectionList()
+    selection.add(curves[0])
+    return oma.MFnAnimCurve(selection.getDependNode(0))
+
+def write_key_curves(attrs, frames, values, layer_name):
+    # 先頭フレームのキーを全アトリビュートにまとめて作成し、レイヤー上のカーブを用意する
+    for a, attr in enumerate(attrs):
+        cmds.setKeyframe(attr, animLayer=layer_name, time=frames[0], value=float(values[0, a]))
+
+    times = om.MTimeArray([om.MTime(float(frame), om.MTime.uiUnit()) for frame in frames])
+    pending = []
+    for a, attr in enumerate(attrs):
+        curve_fn = layer_curve(attr, layer_name)
+        if curve_fn is None:
+            cmds.warning(f"{attr} のレイヤーカーブが見つかりません。")
+            continue
+        pending.append((curve_fn, values[:, a] * internal_unit_scale(curve_fn)))
+
+    change = oma.MAnimCurveChange()
+
+    def do_it():
+        for curve_fn, column in pending:
+            curve_fn.addKeys(times, column.tolist(), keepExistingKeys=True, change=change)
+
+    if pending:
+        run_undoable(do_it, change.undoIt, change.redoIt)
+    return len(pending)
+
+# =============================================
+# 生成プラン
+# UI の入力を検証し、対象オブジェクト・フレーム列・シードなどをまとめる。
+# 値はストリームから決まるため、プレビューと書き込みで同じものを何度でも生成できる
+class GenerationPlan:
+    def __init__(self, layer_name, targets, frames, seed, rand_min, rand_max, fade, noise):
+        self.layer_name = layer_name
+        self.targets = targets  # [(オブジェクト, [アトリビュート], [(UUID, アトリビュート名)]), ...]
+        self.frames = frames
+        self.seed = seed
+        self.rand_min = rand_min
+        self.rand_max = rand_max
+        self.fade = fade
+        self.noise = noise
+
+    def attr_count(self):
+        return sum(len(attrs) for _, attrs, _ in self.targets)
+
+    def values(self, keys):
+        return generate_key_values(
+            self.frames, keys, self.seed, self.rand_min, self.rand_max, self.fade, self.noise
+        )
+
+    # 値の配列がメモリ上限を超えず、最大オブジェクト数以下になるようにオブジェクト単位で分割する
+    def chunks(self, memory_mb, max_objects):
+        column_limit = max(1, int(memory_mb * 1024 * 1024 // (len(self.frames) * 8)))
+        chunk = []
+        columns = 0
+        for target in self.targets:
+            if chunk and (len(chunk) >= max_objects or columns + len(target[1]) > column_limit):
+                yield chunk
+                chunk = []
+                columns = 0
+            chunk.append(target)
+            columns += len(target[1])
+        if chunk:
+            yield chunk
+
+def chunk_attrs(chunk):
+    attrs = [attr for _, target_attrs, _ in chunk for attr in target_attrs]
+    keys = [key for _, _, target_keys in chunk for key in target_keys]
+    return attrs, keys
+
+# シード未指定時は、プレビュー中ならそのシードを使う（プレビューと同じ結果で確定する）
+def default_seed():
+    if animation_preview is not None:
+        return animation_preview.plan.seed
+    return new_seed()
+
+# 選択オブジェクトと UI の入力から GenerationPlan を作る（不正な入力は警告して None）
+def build_generation_plan(
     layer_name, start_frame, end_frame,
     flags,
     random_value_min,
@@ -59,19 +348,20 @@ def add_selected_to_anim_layer_with_keys(
     frame_step_input,
     random_step_enabled,
     random_step_limit,
-    disable_random_step_limit
+    disable_random_step_limit,
+    seed=None,
+    noise=None
 ):
-
     # Transform ノードのみ対象にする
     sel = cmds.ls(sl=True, type="transform")
     if not sel:
         cmds.warning("オブジェクトが選択されていません。")
-        return
+        return None
 
     # どのチャンネルにもチェックが入っていない場合は中断
     if not any(flags.values()):
         cmds.warning("キーを生成する要素が選択されていません。")
-        return
+        return None
 
     # 開始・終了フレームを確定
     start = int(start_frame)
@@ -79,7 +369,7 @@ def add_selected_to_anim_layer_with_keys(
 
     if start > end:
         cmds.warning("開始フレームが終了フレームを超えています。")
-        return
+        return None
 
     # ランダム最大値（float前提）
 
@@ -95,103 +385,185 @@ def add_selected_to_anim_layer_with_keys(
     step = step_input + 1
 
     # フェード設定が有効な場合の入力チェック
+    fade = None
     if fade_enabled:
         fade_start = int(fade_start_frame)
         fade_end = float(fade_end_value)
 
         if fade_start is None or fade_end is None:
             cmds.warning("減衰の入力が空白、または不正です。処理を中断します。")
-            return
+            return None
 
         if fade_start > end:
             cmds.warning("減衰の開始フレームが最終フレームを超えています。処理を中断します。")
-            return
-
-        fade_start = int(fade_start)
+            return None
 
-    # アニメーションレイヤーが存在しなければ新規作成
-    if not cmds.objExists(layer_name):
-        layer_name = cmds.animLayer(layer_name)
+        fade = (int(fade_start), fade_end, end)
 
-    # 実際にキーを打つアトリビュート一覧を構築
-    attrs_to_add = []
+    # 実際にキーを打つアトリビュート一覧と、乱数ストリームのキー (UUID, アトリビュート名) を構築
+    targets = []
     for obj in sel:
-        attrs_to_add.extend(collect_attrs(obj, flags))
+        uuid = cmds.ls(obj, uuid=True)[0]
+        attrs = collect_attrs(obj, flags)
+        if attrs:
+            targets.append((obj, attrs, [(uuid, attr.rsplit(".", 1)[1]) for attr in attrs]))
 
-    if not attrs_to_add:
+    if not targets:
         cmds.warning("有効なアトリビュートがありません。")
+        return None
+
+    # ランダムステップの上限設定
+    # 無効時は None にして分岐を単純化
+    if not disable_random_step_limit:
+        step_limit = max(1, int(random_step_limit))
+    else:
+        step_limit = None  # 上限なし
+
+    # シード未指定なら新しく決めて表示する（同じ値を入力すれば再現できる）
+    if seed is None:
+        seed = default_seed()
+    frames = build_frame_schedule(
+        start, end, step, random_step_enabled, step_limit, random_stream(seed, "frame_schedule")
+    )
+    return GenerationPlan(layer_name, targets, frames, seed, rand_min, rand_max, fade, noise)
+
+# =============================================
+# プレビュー
+# 書き込み先と同じ種類（加算 / オーバーライド）の一時レイヤーを作り、同じ書き込みステージでキーを作って表示する。
+# キーやアニメーションレイヤーが既に接続されたアトリビュートも、レイヤーの合成で正しく表示される。
+# 一時レイヤーの作成・キーの書き込み・削除は通常の操作と同じく Undo キューに記録する
+# （記録を止めて DG を変更すると Undo キューと食い違うため）。終了時とシーンの保存前にレイヤーごと削除する
+class AnimationPreview:
+    def __init__(self, plan):
+        self.plan = plan
+        # メモリ上限に収まる先頭のチャンクだけをプレビューする
+        self.targets = next(plan.chunks(PREVIEW_MEMORY_MB, len(plan.targets)))
+        self.layer = None
+
+    def start(self):
+        attrs, keys = chunk_attrs(self.targets)
+        values = self.plan.values(keys)
+        override = bool(
+            cmds.objExists(self.plan.layer_name) and cmds.animLayer(self.plan.layer_name, q=True, override=True)
+        )
+
+        # 作成からキーの書き込みまでを 1 つの Undo ステップにまとめる
+        cmds.undoInfo(openChunk=True)
+        try:
+            self.layer = cmds.animLayer(PREVIEW_LAYER_NAME, override=override)
+            cmds.animLayer(self.layer, edit=True, attribute=attrs)
+            write_key_curves(attrs, self.plan.frames, values, self.layer)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+    def restore(self):
+        # Undo でレイヤーが既に消えている場合は何もしない
+        if self.layer is not None and cmds.objExists(self.layer):
+            cmds.delete(self.layer)
+        self.layer = None
+
+def stop_preview(*_):
+    global animation_preview
+    if animation_preview is not None:
+        animation_preview.restore()
+    animation_preview = None
+
+# プレビューのレイヤーがシーンに保存されないよう、保存・新規作成・読み込みの前に削除する
+def register_scene_callbacks():
+    if scene_callback_ids:
+        return
+    for message in (om.MSceneMessage.kBeforeSave, om.MSceneMessage.kBeforeNew, om.MSceneMessage.kBeforeOpen):
+        scene_callback_ids.append(om.MSceneMessage.addCallback(message, stop_preview))
+
+# ウィンドウを閉じたらプレビューを削除してコールバックを解除する
+def release_preview(*_):
+    stop_preview()
+    for callback_id in scene_callback_ids:
+        om.MMessage.removeCallback(callback_id)
+    del scene_callback_ids[:]
+
+# 引数は build_generation_plan と同じ
+def preview_selected_animation(*args, **kwargs):
+    global animation_preview
+    # 前のプレビューを戻してから新しいシードで作り直す
+    stop_preview()
+    plan = build_generation_plan(*args, **kwargs)
+    if plan is None:
         return
+    animation_preview = AnimationPreview(plan)
+    try:
+        animation_preview.start()
+    except RuntimeError as e:
+        stop_preview()
+        cmds.warning(f"プレビューを作成できませんでした: {e}")
+        return
+    skipped = len(plan.targets) - len(animation_preview.targets)
+    print(f"{len(animation_preview.targets)} オブジェクトをプレビュー中です（シード {plan.seed}）。")
+    if skipped:
+        cmds.warning(f"メモリ上限のため {skipped} オブジェクトはプレビューしていません（書き込み時は全て生成します）。")
 
-    # Undo を 1 ステップにまとめる
+# =============================================
+# 書き込み
+# オブジェクト単位のチャンクごとに値を生成して書き込み、進捗を表示する。
+# キャンセルした場合は書き込んだキーとレイヤー登録をすべて元に戻す
+def commit_generation(plan):
+    total = len(plan.targets)
+    written = 0
+    done = 0
+    cancelled = False
+    recorded = False  # この Undo チャンクに何か記録したか（キャンセル時に無関係な操作を戻さないため）
+    start_time = time.perf_counter()
+
+    cmds.progressWindow(
+        title="ランダムアニメーション生成", progress=0, maxValue=total,
+        status=f"0 / {total} オブジェクト", isInterruptable=True
+    )
+    # Undo を 1 ステップにまとめる（addKeys も Undo 可能なコマンドとしてこのチャンクに入る）
     cmds.undoInfo(openChunk=True)
     try:
-        # 対象アトリビュートをアニメーションレイヤーに登録
-        cmds.animLayer(layer_name, edit=True, attribute=attrs_to_add)
-
-        current_frame = start
-        current_step = step
-
-        # ランダムステップの上限設定
-        # 無効時は None にして分岐を単純化
-        if not disable_random_step_limit:
-            step_limit = max(1, int(random_step_limit))
-        else:
-            step_limit = None  # 上限なし
-
-        # フレーム生成ループ
-        while current_frame <= end:
-            frame = current_frame
-            cmds.currentTime(frame, edit=True)
-
-            # 現在フレームで使用するランダム最大値
-            current_max = rand_max
-
-            # フェード有効時は、開始フレーム以降で値を補間
-            if fade_enabled and frame >= fade_start:
-                denom = max(1, end - fade_start)
-                t = (frame - fade_start) / float(denom)
-                t = max(0.0, min(1.0, t))
-                current_max = lerp(rand_max, fade_end, t)
-
-            # 各アトリビュートにランダム値を設定
-            for attr in attrs_to_add:
-
-                # 元となるランダム値を生成
-                base_value = random.uniform(rand_min, rand_max)
-
-                if fade_enabled and frame >= fade_start:
-                    denom = max(1, end - fade_start)
-                    t = (frame - fade_start) / float(denom)
-                    t = max(0.0, min(1.0, t))
-
-                    # ease-out フェード
-                    t = 1.0 - pow(1.0 - t, 2)
-                    value = lerp(base_value, fade_end, t)
-
-                else:
-                    value = base_value
-
-                cmds.setAttr(attr, value)
-
-            # 現在フレームにキーを作成
-            cmds.setKeyframe(attrs_to_add, animLayer=layer_name)
-
-            # ---- フレーム間隔のランダム成長処理 ----
-            if random_step_enabled:
-                # 現在のステップ幅を基準にランダム増加
-                random_add = random.randint(0, current_step)
-                current_step += random_add
-
-                # 上限がある場合はクランプ
-                if step_limit is not None:
-                    current_step = min(current_step, step_limit)
-
-            # 次のフレームへ進める
-            current_frame += current_step
-
+        # アニメーションレイヤーが存在しなければ新規作成
+        layer_name = plan.layer_name
+        if not cmds.objExists(layer_name):
+            layer_name = cmds.animLayer(layer_name)
+            recorded = True
+
+        for chunk in plan.chunks(COMMIT_MEMORY_MB, COMMIT_CHUNK_OBJECTS):
+            if cmds.progressWindow(q=True, isCancelled=True):
+                cancelled = True
+                break
+            attrs, keys = chunk_attrs(chunk)
+            values = plan.values(keys)
+            # 対象アトリビュートをアニメーションレイヤーに登録
+            recorded = True
+            cmds.animLayer(layer_name, edit=True, attribute=attrs)
+            written += write_key_curves(attrs, plan.frames, values, layer_name)
+            done += len(chunk)
+            cmds.progressWindow(e=True, progress=done, status=f"{done} / {total} オブジェクト")
     finally:
         # Undo チャンクを必ず閉じる
         cmds.undoInfo(closeChunk=True)
+        cmds.progressWindow(endProgress=True)
+
+    if cancelled:
+        if recorded:
+            cmds.undo()
+        cmds.warning(f"キャンセルしました。書き込んだ {done} オブジェクト分のキーを元に戻しました。")
+        return
+
+    print(f"{total} オブジェクト / {written} カーブ × {len(plan.frames)} キーを生成しました（シード {plan.seed}）"
+          f"（{time.perf_counter() - start_time:.2f} 秒）")
+
+# =============================================
+# 選択オブジェクトをアニメーションレイヤーに追加し、
+# ランダム値＋任意フェード＋可変フレーム間隔でキーを生成するメイン処理
+# 引数は build_generation_plan と同じ（シード未指定でプレビュー中なら、プレビューと同じ結果を書き込む）
+def add_selected_to_anim_layer_with_keys(*args, **kwargs):
+    plan = build_generation_plan(*args, **kwargs)
+    if plan is None:
+        return
+    # プレビュー用の一時レイヤーを削除してから書き込む
+    stop_preview()
+    commit_generation(plan)
 
 def sync_all(parent, children):
     # 「ALL」チェックボックス用。
@@ -211,7 +583,7 @@ def build_ui():
 
     ui = {}
 
-    cmds.window(WINDOW_NAME, title="Random animation generation", widthHeight=(330, 860))
+    cmds.window(WINDOW_NAME, title="Random animation generation", widthHeight=(330, 1100))
     cmds.columnLayout(adjustableColumn=True, rowSpacing=6)
 
     # -------------------------------------------------
@@ -320,7 +692,34 @@ def build_ui():
     cmds.setParent("..")
     cmds.separator(style="in")
 
+    # -------------------------------------------------
+    # ノイズ
+    # -------------------------------------------------
+    ui["noise_menu"] = cmds.optionMenu(label="値の種類")
+    for noise_type in NOISE_TYPES:
+        cmds.menuItem(label=noise_type)
+    cmds.rowLayout(numberOfColumns=2, adjustableColumn=2)
+    cmds.text(label="周波数（1 フレームあたり）")
+    ui["noise_frequency_field"] = cmds.floatField(value=0.05, minValue=0.0001, precision=4)
+    cmds.setParent("..")
+    cmds.rowLayout(numberOfColumns=2, adjustableColumn=2)
+    cmds.text(label="オクターブ（2 以上で fBm）")
+    ui["noise_octaves_field"] = cmds.intField(value=1, minValue=1, maxValue=8)
+    cmds.setParent("..")
+    cmds.rowLayout(numberOfColumns=2, adjustableColumn=2)
+    cmds.text(label="振幅")
+    ui["noise_amplitude_field"] = cmds.floatField(value=1.0)
+    cmds.setParent("..")
 
+    def update_noise_ui(*_):
+        noise_enabled = cmds.optionMenu(ui["noise_menu"], q=True, value=True) in NOISE_FUNCTIONS
+        cmds.floatField(ui["noise_frequency_field"], e=True, enable=noise_enabled)
+        cmds.intField(ui["noise_octaves_field"], e=True, enable=noise_enabled)
+        cmds.floatField(ui["noise_amplitude_field"], e=True, enable=noise_enabled)
+
+    cmds.optionMenu(ui["noise_menu"], e=True, changeCommand=update_noise_ui)
+
+    cmds.separator(style="in")
 
     # -------------------------------------------------
     # フェード
@@ -352,6 +751,22 @@ def build_ui():
 
     cmds.separator(style="in")
 
+    # -------------------------------------------------
+    # シード
+    # -------------------------------------------------
+    ui["seed_cb"] = cmds.checkBox(label="シードを固定（同じ結果を再生成）", value=False)
+    cmds.rowLayout(numberOfColumns=2, adjustableColumn=2)
+    cmds.text(label="シード")
+    ui["seed_field"] = cmds.intField(value=0, minValue=0)
+    cmds.setParent("..")
+
+    def update_seed_ui(*_):
+        cmds.intField(ui["seed_field"], e=True, enable=cmds.checkBox(ui["seed_cb"], q=True, value=True))
+
+    cmds.checkBox(ui["seed_cb"], e=True, cc=update_seed_ui)
+
+    cmds.separator(style="in")
+
     # -------------------------------------------------
     # 実行ボタン
     # -------------------------------------------------
@@ -359,10 +774,8 @@ def build_ui():
     # *_field → UI部品
     # *_cb → checkBox
     # *_btn → button
-    cmds.button(
-        label="選択オブジェクトを追加してキー生成",
-        height=40,
-        command=lambda *_: add_selected_to_anim_layer_with_keys(
+    def gather_args():
+        return (
             cmds.textField(ui["layer_field"], q=True, text=True),
             cmds.intField(ui["start_field"], q=True, value=True),
             cmds.intField(ui["end_field"], q=True, value=True),
@@ -376,13 +789,36 @@ def build_ui():
             cmds.checkBox(ui["random_step_cb"], q=True, value=True),
             cmds.intField(ui["random_step_limit_field"], q=True, value=True),
             cmds.checkBox(ui["disable_limit_cb"], q=True, value=True),
-
+            cmds.intField(ui["seed_field"], q=True, value=True)
+            if cmds.checkBox(ui["seed_cb"], q=True, value=True) else None,
+            (
+                cmds.optionMenu(ui["noise_menu"], q=True, value=True),
+                cmds.floatField(ui["noise_frequency_field"], q=True, value=True),
+                cmds.intField(ui["noise_octaves_field"], q=True, value=True),
+                cmds.floatField(ui["noise_amplitude_field"], q=True, value=True),
+            ),
         )
+
+    cmds.rowLayout(numberOfColumns=2, adjustableColumn=1)
+    cmds.button(label="プレビュー", command=lambda *_: preview_selected_animation(*gather_args()))
+    cmds.button(label="プレビュー終了", command=lambda *_: stop_preview())
+    cmds.setParent("..")
+
+    cmds.button(
+        label="選択オブジェクトを追加してキー生成",
+        height=40,
+        command=lambda *_: add_selected_to_anim_layer_with_keys(*gather_args())
     )
 
     # 初期状態同期
     update_random_ui()
     update_fade_ui()
+    update_seed_ui()
+    update_noise_ui()
+
+    # ウィンドウを閉じたらプレビューを元に戻す
+    register_scene_callbacks()
+    cmds.scriptJob(uiDeleted=[WINDOW_NAME, release_preview], runOnce=True)
 
     cmds.showWindow(WINDOW_NAME)
 
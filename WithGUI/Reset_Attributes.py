@@ -4,8 +4,8 @@
 # Contents: 選択した曲線の移動および回転属性のリセットツール
 #           (Tool to reset translation and rotation attributes of selected curves.)
 # CreatedDate: 2024年12月23日
-# LastUpdate: 2025年11月24日
-# Version:0.2
+# LastUpdate: 2026年10月19日
+# Version:0.3
 #
 # 《License》
 # Copyright (c) 2025 Naruse
@@ -14,6 +14,11 @@
 # --------------------------------------------------------------------------
 
 import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import fnmatch
+
+# リグ全体・ネームスペース指定で使用するコントロールインデックス
+control_index = None
 
 def reset_attributes(selected_curves, translate_options, rotate_options):
     # Reset specified translate and rotate attributes for selected curves.
@@ -85,6 +90,244 @@ def reset_all_attributes(selected_curves):
     else:
         cmds.warning("NURBS 曲線が選択されていません。")
 
+# --------------------------------------------------------------------------
+# コントロールインデックス
+# シーン内の transform をシェイプタイプ・ネームスペース・名前で索引化し、
+# DAG 変更コールバックで差分更新する。リセット時に毎回 DAG を走査しないためのもの。
+# --------------------------------------------------------------------------
+class ControlIndex:
+    def __init__(self):
+        self.entries = {}          # UUID -> {"name": ロング名, "short": ショート名, "namespace": ネームスペース, "shapes": シェイプタイプ}
+        self.by_shape_type = {}    # シェイプタイプ -> UUID の集合
+        self.by_namespace = {}     # ネームスペース -> UUID の集合
+        self.events = []           # コールバックで溜めた変更 ("add", MObjectHandle) / ("remove", UUID)
+        self.callback_ids = []
+
+    def build(self):
+        """シーン全体から一度だけインデックスを構築する"""
+        self.entries.clear()
+        self.by_shape_type.clear()
+        self.by_namespace.clear()
+        self.events = []
+
+        # シェイプとそのタイプを 1 回の ls で取得し、親 transform ごとにまとめる
+        shapes = cmds.ls(type="shape", long=True, noIntermediate=True, showType=True) or []
+        shape_types = {}
+        for shape, shape_type in zip(shapes[0::2], shapes[1::2]):
+            parent = shape.rsplit("|", 1)[0]
+            if parent:
+                shape_types.setdefault(parent, set()).add(shape_type)
+
+        transforms = list(shape_types)
+        if not transforms:
+            return
+        uuids = cmds.ls(transforms, uuid=True) or []
+        if len(uuids) != len(transforms):
+            # インスタンス等で整列が崩れた場合は個別に取得
+            uuids = [(cmds.ls(t, uuid=True) or [None])[0] for t in transforms]
+
+        for transform, uuid in zip(transforms, uuids):
+            if uuid:
+                self._add_entry(uuid, transform, shape_types[transform])
+
+        print(f"コントロールインデックスを構築しました: {len(self.entries)} 件")
+
+    def _add_entry(self, uuid, long_name, shape_types):
+        self._remove_entry(uuid)
+        short_name = long_name.rsplit("|", 1)[-1]
+        namespace = short_name.rpartition(":")[0]
+        self.entries[uuid] = {"name": long_name, "short": short_name, "namespace": namespace, "shapes": set(shape_types)}
+        for shape_type in shape_types:
+            self.by_shape_type.setdefault(shape_type, set()).add(uuid)
+        self.by_namespace.setdefault(namespace, set()).add(uuid)
+
+    def _remove_entry(self, uuid):
+        entry = self.entries.pop(uuid, None)
+        if not entry:
+            return
+        for shape_type in entry["shapes"]:
+            self.by_shape_type.get(shape_type, set()).discard(uuid)
+        self.by_namespace.get(entry["namespace"], set()).discard(uuid)
+
+    def _index_dag_path(self, dag_path):
+        # transform 直下のシェイプタイプを収集して登録（シェイプが無ければ除外）
+        uuid = om.MFnDependencyNode(dag_path.node()).uuid().asString()
+        shape_types = set()
+        for i in range(dag_path.numberOfShapesDirectlyBelow()):
+            shape_path = om.MDagPath(dag_path)
+            shape_path.extendToShape(i)
+            shape_fn = om.MFnDagNode(shape_path)
+            if not shape_fn.isIntermediateObject:
+                shape_types.add(shape_fn.typeName)
+
+        if shape_types:
+            self._add_entry(uuid, dag_path.fullPathName(), shape_types)
+        else:
+            self._remove_entry(uuid)
+
+    def _reindex_subtree(self, node):
+        # 名前変更や親子付けでは子孫のロング名も変わるため、部分木だけ再登録する
+        iterator = om.MItDag(om.MItDag.kDepthFirst, om.MFn.kTransform)
+        iterator.reset(node, om.MItDag.kDepthFirst, om.MFn.kTransform)
+        while not iterator.isDone():
+            self._index_dag_path(iterator.getPath())
+            iterator.next()
+
+    def flush(self):
+        """コールバックで溜めた変更をインデックスへ反映する"""
+        events, self.events = self.events, []
+        for kind, value in events:
+            if kind == "remove":
+                self._remove_entry(value)
+                continue
+
+            if not value.isValid() or not value.isAlive():
+                continue
+            node = value.object()
+            if node.hasFn(om.MFn.kShape):
+                fn = om.MFnDagNode(node)
+                if fn.parentCount() == 0:
+                    continue
+                node = fn.parent(0)
+            if not node.hasFn(om.MFn.kTransform):
+                continue
+            try:
+                om.MDagPath.getAPathTo(node)
+            except RuntimeError:
+                continue  # DAG から外れている（削除済み）
+            self._reindex_subtree(node)
+
+    def query(self, shape_type=None, patterns=None, namespace=None, roots=None):
+        """メモリ上のインデックスだけでコントロールを絞り込み、ロング名のリストを返す"""
+        self.flush()
+
+        if shape_type:
+            candidates = set(self.by_shape_type.get(shape_type, ()))
+        else:
+            candidates = set(self.entries)
+
+        if namespace is not None:
+            namespace = namespace.strip(":")
+            candidates &= {
+                uuid for ns, uuids in self.by_namespace.items()
+                if ns == namespace or ns.startswith(namespace + ":")
+                for uuid in uuids
+            }
+
+        names = [self.entries[uuid] for uuid in candidates]
+
+        if roots:
+            names = [entry for entry in names if any(entry["name"] == root or entry["name"].startswith(root + "|") for root in roots)]
+
+        if patterns:
+            # ワイルドカードが無い場合は部分一致として扱う（"arm" → "*arm*"）
+            patterns = [p if any(c in p for c in "*?[") else f"*{p}*" for p in patterns]
+            patterns = [p.lower() for p in patterns]
+            names = [entry for entry in names if any(fnmatch.fnmatchcase(entry["short"].lower(), p) for p in patterns)]
+
+        return sorted(entry["name"] for entry in names)
+
+    def namespaces(self):
+        self.flush()
+        return sorted(ns for ns, uuids in self.by_namespace.items() if ns and uuids)
+
+    # ---- DAG 変更コールバック ----
+    def _on_node_added(self, node, *args):
+        self.events.append(("add", om.MObjectHandle(node)))
+
+    def _on_node_removed(self, node, *args):
+        if node.hasFn(om.MFn.kTransform):
+            self.events.append(("remove", om.MFnDependencyNode(node).uuid().asString()))
+        elif node.hasFn(om.MFn.kShape):
+            fn = om.MFnDagNode(node)
+            if fn.parentCount():
+                self.events.append(("add", om.MObjectHandle(fn.parent(0))))
+
+    def _on_name_changed(self, node, *args):
+        if node.hasFn(om.MFn.kDagNode):
+            self.events.append(("add", om.MObjectHandle(node)))
+
+    def _on_dag_changed(self, message, child, parent, *args):
+        self.events.append(("add", om.MObjectHandle(child.node())))
+
+    def register_callbacks(self):
+        self.remove_callbacks()
+        self.callback_ids = [
+            om.MDGMessage.addNodeAddedCallback(self._on_node_added, "dagNode"),
+            om.MDGMessage.addNodeRemovedCallback(self._on_node_removed, "dagNode"),
+            om.MNodeMessage.addNameChangedCallback(om.MObject(), self._on_name_changed),
+            om.MDagMessage.addAllDagChangesCallback(self._on_dag_changed),
+        ]
+
+    def remove_callbacks(self, *args):
+        if self.callback_ids:
+            om.MMessage.removeCallbacks(self.callback_ids)
+        self.callback_ids = []
+
+def get_control_index():
+    # インデックスを初回のみ構築し、以降はコールバックで差分更新する
+    global control_index
+    if control_index is None:
+        control_index = ControlIndex()
+        control_index.build()
+        control_index.register_callbacks()
+    return control_index
+
+def release_control_index(*args):
+    # ウィンドウを閉じたらコールバックを解除する
+    global control_index
+    if control_index is not None:
+        control_index.remove_callbacks()
+        control_index = None
+
+def collect_scope_controls(scope, namespace="", name_filter=""):
+    # 対象範囲（リグ全体 / ネームスペース）に応じてインデックスからコントロールを取得
+    # scope: "rig" … 選択ノードの最上位ノード以下, "namespace" … 指定ネームスペース以下
+    index = get_control_index()
+    patterns = [p for p in name_filter.replace(",", " ").split() if p]
+
+    if scope == "rig":
+        selection = cmds.ls(selection=True, long=True, type="transform") or []
+        if not selection:
+            cmds.warning("リグのいずれかのノードを選択してください。")
+            return []
+        roots = sorted({"|" + obj.split("|")[1] for obj in selection})
+        return index.query(shape_type="nurbsCurve", patterns=patterns, roots=roots)
+
+    if scope == "namespace":
+        return index.query(shape_type="nurbsCurve", patterns=patterns, namespace=namespace)
+
+    return []
+
+def reset_attributes_bulk(controls, translate_options, rotate_options):
+    # インデックスから取得したコントロールを 1 つの Undo チャンクで一括リセットする
+    # 個別の形状チェックやログ出力は行わず、結果をまとめて表示する
+    if not controls:
+        cmds.warning("対象となるコントロールが見つかりません。")
+        return
+
+    attrs = [f"translate{axis}" for axis in ['X', 'Y', 'Z'] if translate_options[axis]]
+    attrs += [f"rotate{axis}" for axis in ['X', 'Y', 'Z'] if rotate_options[axis]]
+    if not attrs:
+        cmds.warning("リセットする軸が選択されていません。")
+        return
+
+    failed = []
+    cmds.undoInfo(openChunk=True)
+    try:
+        for control in controls:
+            for attr in attrs:
+                try:
+                    cmds.setAttr(f"{control}.{attr}", 0)
+                except RuntimeError:
+                    failed.append(f"{control}.{attr}")
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    print(f"{len(controls)} 個のコントロールをリセットしました。（{', '.join(attrs)}）")
+    if failed:
+        cmds.warning(f"{len(failed)} 個の属性はロックされているか接続されているため変更できません。例: {failed[:5]}")
+
 def create_attribute_reset_gui():
     # Create GUI for resetting translation and rotation attributes.
     # 移動および回転属性をリセットするためのGUIを作成。
@@ -92,7 +335,7 @@ def create_attribute_reset_gui():
     if cmds.window("resetAttributeWindow", exists=True):
         cmds.deleteUI("resetAttributeWindow")
 
-    window = cmds.window("resetAttributeWindow", title="Reset Attributes", widthHeight=(340, 330))
+    window = cmds.window("resetAttributeWindow", title="Reset Attributes", widthHeight=(340, 440))
     cmds.columnLayout(adjustableColumn=True)
 
     cmds.text(label="0にリセットする軸を選択")
@@ -109,20 +352,53 @@ def create_attribute_reset_gui():
     for axis in ['X', 'Y', 'Z']:
         rotate_checkboxes[axis] = cmds.checkBox(label=f"Rotate {axis}")
 
+    # 対象範囲（選択 / リグ全体 / ネームスペース）
+    cmds.separator(height=10, style='in')  # 隙間
+    scope_radio = cmds.radioButtonGrp(label="対象範囲:", labelArray3=["選択", "リグ全体", "ネームスペース"], numberOfRadioButtons=3, select=1, columnWidth4=(60, 60, 70, 100))
+    namespace_field = cmds.textFieldGrp(label="ネームスペース:", text="", columnWidth2=(100, 220))
+    filter_field = cmds.textFieldGrp(label="名前フィルタ:", text="", placeholderText="例: *arm* *leg*", columnWidth2=(100, 220))
+
+    def get_scope():
+        return {1: "selection", 2: "rig", 3: "namespace"}[cmds.radioButtonGrp(scope_radio, query=True, select=True)]
+
+    def get_scope_controls():
+        namespace = cmds.textFieldGrp(namespace_field, query=True, text=True)
+        name_filter = cmds.textFieldGrp(filter_field, query=True, text=True)
+        controls = collect_scope_controls(get_scope(), namespace, name_filter)
+        print(f"対象コントロール数: {len(controls)}")
+        return controls
+
     def on_reset_button_click(*args):
-        selected_curves = cmds.ls(selection=True, type="transform")
         translate_options = {axis: cmds.checkBox(translate_checkboxes[axis], query=True, value=True) for axis in ['X', 'Y', 'Z']}
         rotate_options = {axis: cmds.checkBox(rotate_checkboxes[axis], query=True, value=True) for axis in ['X', 'Y', 'Z']}
-        reset_attributes(selected_curves, translate_options, rotate_options)
+        if get_scope() == "selection":
+            selected_curves = cmds.ls(selection=True, type="transform")
+            reset_attributes(selected_curves, translate_options, rotate_options)
+        else:
+            reset_attributes_bulk(get_scope_controls(), translate_options, rotate_options)
 
     def on_all_reset_button_click(*args):
-        selected_curves = cmds.ls(selection=True, type="transform")
-        reset_all_attributes(selected_curves)
+        if get_scope() == "selection":
+            selected_curves = cmds.ls(selection=True, type="transform")
+            reset_all_attributes(selected_curves)
+        else:
+            all_options = {axis: True for axis in ['X', 'Y', 'Z']}
+            reset_attributes_bulk(get_scope_controls(), all_options, all_options)
+
+    def on_select_scope_button_click(*args):
+        controls = get_scope_controls()
+        if controls:
+            cmds.select(controls, replace=True)
 
     cmds.separator(height=10, style='in')  # 隙間
     cmds.button(label="選択した値をリセット", command=on_reset_button_click)
     cmds.separator(height=5, style='none')  # 隙間
     cmds.button(label="値を全てリセット", command=on_all_reset_button_click)
+    cmds.separator(height=5, style='none')  # 隙間
+    cmds.button(label="対象コントロールを選択", command=on_select_scope_button_click)
+
+    # ウィンドウを閉じたらインデックスのコールバックを解除
+    cmds.scriptJob(uiDeleted=[window, release_control_index], runOnce=True)
     cmds.showWindow(window)
 
 # Call the GUI
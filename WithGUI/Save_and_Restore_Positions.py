@@ -2,9 +2,12 @@
 # ScriptName: Save_and_Restore_Positions
 # Author: Naruse,GPT-4o
 # Contents  :オブジェクトをリストに追加し移動、回転の座標を記録し、記録した座標に戻す。
+#             名前付きのポーズスナップショット（ワールド行列）の保存・差分復元、ファイルへのアーカイブにも対応。
+#             2 つのスナップショット間のブレンド（スライダー操作・フレーム範囲へのベイク）も可能。
+#             フレーム範囲のワールド行列のキャプチャ（再適用・ベイク）にも対応。
 # CreatedDate: 2024年12月02日
-# LastUpdate: 2024年12月22日
-# Version: 1.1
+# LastUpdate: 2026年10月19日
+# Version: 1.6
 #
 # 《License》
 # Copyright (c) 2024 Naruse
@@ -14,9 +17,184 @@
 
 
 import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from uuid import UUID
+import numpy as np
 
 # グローバル変数を定義
 saved_object_data = {}  # UUIDをキーとして、オブジェクト名と座標を保持
+name_index = {}  # オブジェクト名 -> UUID（リスト項目から UUID を引くための索引）
+
+
+# ---------------------------------------------------------------------------
+# Undo 対応の API 書き込み
+# MDGModifier や MAnimCurveChange による変更は Maya の Undo キューに入らないため、
+# リポジトリの plugin/mayaUtilitiesApiUndo にある小さな MPxCommand プラグイン経由で実行する（Ctrl+Z / Ctrl+Y で戻せる）
+# ---------------------------------------------------------------------------
+API_UNDO_PLUGIN = "mayaUtilitiesApiUndo"
+API_UNDO_SHARED = "mayaUtilitiesApiUndoShared"  # プラグインが run_undoable / call_without_undo を公開するモジュール名
+
+
+# プラグインを読み込み、共有モジュールを返す
+# MAYA_PLUG_IN_PATH に無い場合は、このスクリプトと同じリポジトリの plugin フォルダから読み込む
+def api_undo():
+    if not cmds.pluginInfo(API_UNDO_PLUGIN, query=True, loaded=True):
+        try:
+            cmds.loadPlugin(API_UNDO_PLUGIN, quiet=True)
+        except RuntimeError:
+            if "__file__" not in globals():
+                raise
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cmds.loadPlugin(os.path.join(root, "plugin", API_UNDO_PLUGIN, API_UNDO_PLUGIN + ".py"), quiet=True)
+    return sys.modules[API_UNDO_SHARED]
+
+
+# do_it を Undo 可能なコマンドとして実行する（Undo で undo_it、Redo で redo_it（省略時は do_it）を呼ぶ）
+def run_undoable(do_it, undo_it, redo_it=None):
+    api_undo().run_undoable(do_it, undo_it, redo_it)
+
+
+# function を Undo キューに記録せずに実行する（スライダーのドラッグ中のプレビュー用）
+def call_without_undo(function):
+    return api_undo().call_without_undo(function)
+
+
+# リスト表示用の文字列を作成する
+def format_list_item(data):
+    return f"{data['name']} || Tra: {' '.join(map(lambda x: str(int(x)), data['position']))} | Rot: {' '.join(map(lambda x: str(int(x)), data['rotation']))}"
+
+
+# 保存データの内容でリスト表示を一括更新する
+def refresh_object_list(selected_uuids=()):
+    items = [format_list_item(data) for data in saved_object_data.values()]
+    cmds.textScrollList("objectList", edit=True, removeAll=True)
+    if items:
+        cmds.textScrollList("objectList", edit=True, append=items)
+    selected_items = [format_list_item(saved_object_data[uuid]) for uuid in selected_uuids if uuid in saved_object_data]
+    if selected_items:
+        cmds.textScrollList("objectList", edit=True, selectItem=selected_items)
+
+
+# 名前インデックスを更新する（保存データの名前が変わったときに呼ぶ）
+def rename_saved_object(uuid, new_name):
+    data = saved_object_data[uuid]
+    if name_index.get(data["name"]) == uuid:
+        del name_index[data["name"]]
+    data["name"] = new_name
+    name_index[new_name] = uuid
+
+
+# UUID のリストを現在のオブジェクト名に一括変換する（見つからないものは None）
+def resolve_uuids(uuids):
+    if not uuids:
+        return []
+    names = cmds.ls(uuids) or []
+    if len(names) != len(uuids):
+        # 見つからない UUID があると順序が対応しないため、取得した名前から UUID を引き直す
+        found = dict(zip(cmds.ls(names, uuid=True) or [], names)) if names else {}
+        names = [found.get(uuid) for uuid in uuids]
+    return names
+
+
+# ワールド行列をローカルの各アトリビュート値に分解する
+# ピボット・回転軸・回転順序は現在の値を保ったまま、行列全体が一致するよう移動値で補正する
+def world_matrix_to_local_values(dag_path, world_matrix, parent_inverse=None):
+    if parent_inverse is None:
+        parent_inverse = dag_path.exclusiveMatrixInverse()
+    local_matrix = world_matrix * parent_inverse
+    current = om.MFnTransform(dag_path).transformation()
+
+    tm = om.MTransformationMatrix(local_matrix)
+    tm.reorderRotation(current.rotationOrder())
+    tm.setRotatePivot(current.rotatePivot(om.MSpace.kTransform), om.MSpace.kTransform, True)
+    tm.setScalePivot(current.scalePivot(om.MSpace.kTransform), om.MSpace.kTransform, True)
+    tm.setRotationOrientation(current.rotationOrientation(), True)
+
+    translation = tm.translation(om.MSpace.kTransform)
+    rotation = tm.rotation()
+    rotate_pivot_translation = tm.rotatePivotTranslation(om.MSpace.kTransform)
+    scale_pivot_translation = tm.scalePivotTranslation(om.MSpace.kTransform)
+    return {
+        "translate": (translation.x, translation.y, translation.z),
+        "rotate": (rotation.x, rotation.y, rotation.z),
+        "scale": tuple(tm.scale(om.MSpace.kTransform)),
+        "shear": tuple(tm.shear(om.MSpace.kTransform)),
+        "rotatePivotTranslate": (rotate_pivot_translation.x, rotate_pivot_translation.y, rotate_pivot_translation.z),
+        "scalePivotTranslate": (scale_pivot_translation.x, scale_pivot_translation.y, scale_pivot_translation.z),
+    }
+
+
+# アトリビュートごとの子プラグ名
+CHILD_SUFFIXES = {"shear": ("XY", "XZ", "YZ")}
+
+
+# 分解したローカル値をモディファイアに登録する
+def set_local_values(modifier, dag_path, values):
+    fn = om.MFnDependencyNode(dag_path.node())
+    for attr, value in values.items():
+        for axis, component in zip(CHILD_SUFFIXES.get(attr, "XYZ"), value):
+            plug = fn.findPlug(f"{attr}{axis}", False)
+            if plug.isLocked or plug.isDestination:
+                continue  # ロック・接続されたアトリビュートは変更しない
+            if attr == "rotate":
+                modifier.newPlugValueMAngle(plug, om.MAngle(component, om.MAngle.kRadians))
+            else:
+                modifier.newPlugValueDouble(plug, component)
+
+
+# 複数オブジェクトのワールド行列を 1 つの MDGModifier でまとめて適用する
+# undoable=True なら Undo 可能なコマンドとして実行する（1 回の Ctrl+Z で全体が戻る）
+# 戻り値: (適用した数, 適用できなかったオブジェクトのリスト)
+def apply_world_matrices(names, world_matrices, undoable=True):
+    selection = om.MSelectionList()
+    transform_write = TransformWrite()
+    applied = 0
+    skipped = []
+
+    for name, world_matrix in zip(names, world_matrices):
+        try:
+            selection.clear()
+            selection.add(name)
+            dag_path = selection.getDagPath(0)
+        except RuntimeError:
+            skipped.append(name)
+            continue
+
+        # ジョイントは jointOrient を含むため xform に任せる
+        if dag_path.apiType() == om.MFn.kJoint:
+            transform_write.joints.append((name, list(world_matrix), cmds.xform(name, query=True, worldSpace=True, matrix=True)))
+            applied += 1
+            continue
+
+        set_local_values(transform_write.modifier, dag_path, world_matrix_to_local_values(dag_path, world_matrix))
+        applied += 1
+
+    if undoable:
+        run_undoable(transform_write.doIt, transform_write.undoIt)
+    else:
+        transform_write.doIt()
+    return applied, skipped
+
+
+# 保存データ（ワールド座標・ワールド回転）から目標のワールド行列を作成する
+# スケール・シアーは現在の値を維持する
+def saved_world_matrix(name, data):
+    selection = om.MSelectionList()
+    selection.add(name)
+    dag_path = selection.getDagPath(0)
+    tm = om.MTransformationMatrix(dag_path.inclusiveMatrix())
+    order = om.MFnTransform(dag_path).rotationOrder() - 1  # MTransformationMatrix → MEulerRotation の順序
+    tm.setRotation(om.MEulerRotation([math.radians(r) for r in data["rotation"]], order))
+    tm.setTranslation(om.MVector(data["position"]), om.MSpace.kWorld)
+    return tm.asMatrix()
 
 
 # 選択されたオブジェクトがオブジェクトモードであるかをチェックする
@@ -52,8 +230,8 @@ def save_selected_objects_and_positions():
         if uuid in saved_object_data:
             # 名前が変更された場合、保存データも更新
             if saved_object_data[uuid]["name"] != obj:
-                saved_object_data[uuid]["name"] = obj
                 print(f"オブジェクト名が更新されました: {saved_object_data[uuid]['name']} -> {obj}")
+                rename_saved_object(uuid, obj)
 
             # 座標を上書き保存
             saved_object_data[uuid]["position"] = position
@@ -64,22 +242,15 @@ def save_selected_objects_and_positions():
         else:
             # 新規データとして保存
             saved_object_data[uuid] = {"name": obj, "position": position, "rotation": rotation}
-
-    # リスト表示を更新
-    cmds.textScrollList("objectList", edit=True, removeAll=True)
-    for data in saved_object_data.values():
-        # リスト名を変数に
-        list_item = f"{data['name']} || Tra: {' '.join(map(lambda x: str(int(x)), data['position']))} | Rot: {' '.join(map(lambda x: str(int(x)), data['rotation']))}"
-
-        cmds.textScrollList("objectList", edit=True, append=list_item)
-
-        # アイテムを選択状態にする
-        cmds.textScrollList("objectList", edit=True, selectItem=list_item)
+            name_index[obj] = uuid
 
         # 変数を出力
         print(f"オブジェクト名:{obj} | 座標:{position} | 回転:{rotation}を保存または上書きしました。")
         print(f"オブジェクト名:{obj} | UUID:{uuid}を保存または上書きしました。")
 
+    # リスト表示を更新（全項目を選択状態にする）
+    refresh_object_list(list(saved_object_data))
+
     # 上書きされたオブジェクトをログに表示
     if updated_objects:
         print(f"上書きされたオブジェクト名: {updated_objects}")
@@ -88,6 +259,7 @@ def save_selected_objects_and_positions():
 
 
 # 保存された座標に選択されたオブジェクトを移動する
+# 選択項目は名前インデックスで UUID に変換し、UUID → 現在名の解決は 1 回の ls で行う
 def restore_selected_object_position():
     global saved_object_data
 
@@ -96,47 +268,75 @@ def restore_selected_object_position():
         cmds.warning("リストからオブジェクトを選択してください。")
         return
 
+    uuids = []
     for selected_obj in selected_in_list:
         obj_name = selected_obj.split(" || ")[0]
-
-        for uuid, data in saved_object_data.items():
-            if data["name"] == obj_name:
-                # オブジェクト名で特定
-                if cmds.objExists(obj_name):
-                    cmds.xform(obj_name, worldSpace=True, translation=data["position"])
-                    cmds.xform(obj_name, worldSpace=True, rotation=data["rotation"])
-                    print(f"{obj_name} を座標 {data['position']} と回転 {data['rotation']} に移動しました。")
-                else:
-                    # UUIDでオブジェクトを特定
-                    new_obj_name = cmds.ls(uuid)
-                    if new_obj_name:
-                        print(f"UUID: {uuid} から取得したオブジェクト名: {new_obj_name[0]}")
-                        cmds.xform(new_obj_name[0], worldSpace=True, translation=data["position"])
-                        cmds.xform(new_obj_name[0], worldSpace=True, rotation=data["rotation"])
-                        print(f"UUIDを使用して {new_obj_name[0]} を座標 {data['position']} と回転 {data['rotation']} に移動しました。")
-
-                        # 名前を更新し、リストの表示も置き換え
-                        obj_name = new_obj_name[0]  # 名前を更新
-                        data["name"] = obj_name
-
-                        # リストアイテムを置き換える
-                        all_items = cmds.textScrollList("objectList", query=True, allItems=True)
-                        if all_items:
-                            for i, item in enumerate(all_items):
-                                if selected_obj == item:
-                                    new_item = f"{obj_name} || Tra: {' '.join(map(lambda x: str(int(x)), data['position']))} | Rot: {' '.join(map(lambda x: str(int(x)), data['rotation']))}"
-                                    cmds.textScrollList("objectList", edit=True, removeIndexedItem=(i + 1))  # 古い項目を削除
-                                    cmds.textScrollList("objectList", edit=True, appendPosition=[i + 1, new_item])  # 新しい項目を挿入
-                                    print(f"UUID: {uuid} | オブジェクト名: {obj_name} | リスト内のオブジェクト名を {obj_name} に変更しました")
-
-                                    # 新しいアイテムを選択状態にする
-                                    cmds.textScrollList("objectList", edit=True, selectItem=new_item)
-                                    break
-                    else:
-                        print(f"UUID: {uuid} に対応するオブジェクトが見つかりません。")
-                break
-        else:
+        uuid = name_index.get(obj_name)
+        if uuid is None:
             cmds.warning(f"{obj_name} は保存リストに存在しません。")
+            continue
+        uuids.append(uuid)
+
+    current_names = resolve_uuids(uuids)
+
+    targets = []
+    renamed = False
+    for uuid, name in zip(uuids, current_names):
+        data = saved_object_data[uuid]
+        if name is None:
+            print(f"UUID: {uuid} に対応するオブジェクトが見つかりません。")
+            continue
+        if name != data["name"]:
+            print(f"UUID: {uuid} | オブジェクト名: {data['name']} -> {name} に変更しました")
+            rename_saved_object(uuid, name)
+            renamed = True
+        targets.append((name, data))
+
+    if not targets:
+        return
+
+    world_matrices = [saved_world_matrix(name, data) for name, data in targets]
+    applied, skipped = apply_world_matrices([name for name, _ in targets], world_matrices)
+    print(f"{applied} 個のオブジェクトを保存した座標と回転に移動しました。")
+    if skipped:
+        cmds.warning(f"移動できなかったオブジェクト: {skipped}")
+
+    # 名前が変わった場合のみリストを 1 回で作り直す
+    if renamed:
+        refresh_object_list(uuids)
+
+
+# 復元処理の計測（count 個の transform を作成して保存 → 移動 → 復元 の時間を表示）
+def benchmark_restore(count=50000):
+    global saved_object_data, name_index
+
+    dag_modifier = om.MDagModifier()
+    nodes = [dag_modifier.createNode("transform") for _ in range(count)]
+    dag_modifier.doIt()
+    names = [om.MFnDagNode(node).partialPathName() for node in nodes]
+
+    backup = (saved_object_data, name_index)
+    saved_object_data, name_index = {}, {}
+    try:
+        for i, node in enumerate(nodes):
+            fn = om.MFnTransform(node)
+            fn.setTranslation(om.MVector(i % 100, i // 100 % 100, i // 10000), om.MSpace.kTransform)
+            uuid = fn.uuid().asString()
+            saved_object_data[uuid] = {"name": names[i], "position": [i % 100, i // 100 % 100, i // 10000], "rotation": [0.0, 0.0, 0.0]}
+            name_index[names[i]] = uuid
+            fn.setTranslation(om.MVector(0, 0, 0), om.MSpace.kTransform)
+
+        start = time.perf_counter()
+        uuids = [name_index[name] for name in names]
+        current_names = resolve_uuids(uuids)
+        world_matrices = [saved_world_matrix(name, saved_object_data[uuid]) for uuid, name in zip(uuids, current_names)]
+        # 作成したノードは最後に削除するため、Undo キューには積まない
+        applied, _ = apply_world_matrices(current_names, world_matrices, undoable=False)
+        elapsed = time.perf_counter() - start
+        print(f"復元ベンチマーク: {applied} 個のオブジェクトを {elapsed:.2f} 秒で復元しました。")
+    finally:
+        saved_object_data, name_index = backup
+        dag_modifier.undoIt()
 
 
 # リストから選択されたオブジェクトを削除する
@@ -151,22 +351,932 @@ def delete_selected_from_list():
     for selected_obj in selected_in_list:
         obj_name = selected_obj.split(" || ")[0]
 
-        for uuid, data in list(saved_object_data.items()):
-            if data["name"] == obj_name:
-                saved_object_data.pop(uuid)
-                cmds.textScrollList("objectList", edit=True, removeItem=selected_obj)
-                print(f"{obj_name} をリストから削除しました。")
-                break
+        uuid = name_index.pop(obj_name, None)
+        if uuid is not None:
+            saved_object_data.pop(uuid)
+            cmds.textScrollList("objectList", edit=True, removeItem=selected_obj)
+            print(f"{obj_name} をリストから削除しました。")
         else:
             cmds.warning(f"{obj_name} は保存リストに存在しません。")
 
+# ---------------------------------------------------------------------------
+# ポーズスナップショット
+# 複数オブジェクトのワールド行列を N×16 の float64 配列として名前付きで保持する。
+# UUID はソート済みの固定長バイト配列で持ち、searchsorted で行を引く。
+# ---------------------------------------------------------------------------
+pose_snapshots = {}  # スナップショット名 -> PoseSnapshot
+
+
+class PoseSnapshot:
+    def __init__(self, name, uuids, matrices, created=None):
+        uuids = np.asarray(uuids, dtype="S36")
+        order = np.argsort(uuids)
+        self.name = name
+        self.uuids = uuids[order]
+        self.matrices = np.ascontiguousarray(np.asarray(matrices, dtype=np.float64).reshape(-1, 16)[order])
+        self.created = created if created is not None else time.time()
+
+    def __len__(self):
+        return len(self.uuids)
+
+    @property
+    def nbytes(self):
+        return self.uuids.nbytes + self.matrices.nbytes
+
+    def uuid_strings(self):
+        return [uuid.decode("ascii") for uuid in self.uuids]
+
+    def rows(self, uuids):
+        # UUID のリストに対応する行番号を返す（存在しないものは -1）
+        query = np.asarray(uuids, dtype="S36")
+        if not len(self.uuids):
+            return np.full(len(query), -1, dtype=np.int64)
+        rows = np.minimum(np.searchsorted(self.uuids, query), len(self.uuids) - 1)
+        return np.where(self.uuids[rows] == query, rows, -1)
+
+
+# オブジェクトのワールド行列と UUID を API で一括取得する
+def capture_world_matrices(names):
+    selection = om.MSelectionList()
+    for name in names:
+        selection.add(name)
+
+    uuids = []
+    matrices = np.empty((selection.length(), 16), dtype=np.float64)
+    for i in range(selection.length()):
+        dag_path = selection.getDagPath(i)
+        uuids.append(om.MFnDependencyNode(dag_path.node()).uuid().asString())
+        matrices[i] = list(dag_path.inclusiveMatrix())
+    return uuids, matrices
+
+
+# 選択中のオブジェクトの現在のワールド行列を名前付きスナップショットとして保存する
+def save_pose_snapshot(snapshot_name, objects=None):
+    if objects is None:
+        objects = cmds.ls(selection=True, type="transform", long=True) or []
+    if not objects:
+        cmds.warning("オブジェクトが選択されていません。")
+        return None
+    if not snapshot_name:
+        cmds.warning("スナップショット名を入力してください。")
+        return None
+
+    uuids, matrices = capture_world_matrices(objects)
+    snapshot = PoseSnapshot(snapshot_name, uuids, matrices)
+    pose_snapshots[snapshot_name] = snapshot
+    print(f"スナップショット '{snapshot_name}' を保存しました（{len(snapshot)} オブジェクト, {snapshot.nbytes / 1024:.1f} KB）")
+    return snapshot
+
+
+# 保存した行列と現在のワールド行列を比較し、変化したオブジェクトの行番号を返す
+def changed_rows(names, matrices, tolerance=1e-6):
+    _, current = capture_world_matrices(names)
+    return np.flatnonzero(np.any(np.abs(current - matrices) > tolerance, axis=1))
+
+
+# UUID と行列の組を現在のシーンに適用する（changed_only=True なら変化したオブジェクトのみ）
+# 戻り値: 更新したオブジェクト数
+def restore_matrices(uuid_strings, matrices, changed_only=True):
+    names = resolve_uuids(uuid_strings)
+    rows = [i for i, name in enumerate(names) if name is not None]
+    missing = len(names) - len(rows)
+    if missing:
+        cmds.warning(f"{missing} 個のオブジェクトがシーンに見つかりません。")
+    if not rows:
+        return 0
+
+    names = [names[i] for i in rows]
+    matrices = matrices[rows]
+    if changed_only:
+        changed = changed_rows(names, matrices)
+        names = [names[i] for i in changed]
+        matrices = matrices[changed]
+    if not names:
+        return 0
+
+    applied, skipped = apply_world_matrices(names, [om.MMatrix(row.tolist()) for row in matrices])
+    if skipped:
+        cmds.warning(f"移動できなかったオブジェクト: {skipped}")
+    return applied
+
+
+# スナップショットを復元する（changed_only=True なら変化したオブジェクトのみ）
+def restore_pose_snapshot(snapshot_name, changed_only=True):
+    snapshot = pose_snapshots.get(snapshot_name)
+    if snapshot is None:
+        cmds.warning(f"スナップショット '{snapshot_name}' が存在しません。")
+        return
+
+    applied = restore_matrices(snapshot.uuid_strings(), snapshot.matrices, changed_only)
+    print(f"スナップショット '{snapshot_name}' を復元しました（{applied} / {len(snapshot)} オブジェクトを更新）")
+
+
+# スナップショットのメモリ使用量を従来の辞書形式と比較して表示する
+def print_snapshot_memory_report():
+    for snapshot in pose_snapshots.values():
+        # 従来形式: UUID -> {"name", "position": [3], "rotation": [3]}
+        sample = {"name": "pCube1", "position": [0.0, 0.0, 0.0], "rotation": [0.0, 0.0, 0.0]}
+        per_object = (sys.getsizeof(sample) + sys.getsizeof(sample["name"]) + sys.getsizeof("0" * 36)
+                      + 2 * (sys.getsizeof(sample["position"]) + 3 * sys.getsizeof(0.0)) + 100)  # 100: 外側の辞書のエントリ分
+        print(f"{snapshot.name}: {len(snapshot)} オブジェクト | 配列 {snapshot.nbytes / 1024:.1f} KB"
+              f" | 辞書形式の推定 {per_object * len(snapshot) / 1024:.1f} KB（移動・回転のみ）")
+
+
+# スナップショットリストの表示を更新する
+def refresh_snapshot_list():
+    cmds.textScrollList("snapshotList", edit=True, removeAll=True)
+    items = [f"{name} ({len(snapshot)})" for name, snapshot in pose_snapshots.items()]
+    if items:
+        cmds.textScrollList("snapshotList", edit=True, append=items)
+
+    # ブレンド用のメニューも同じ内容で作り直す（選択は可能な限り維持）
+    for menu in ("blendSourceMenu", "blendTargetMenu"):
+        if not cmds.optionMenu(menu, exists=True):
+            continue
+        current = cmds.optionMenu(menu, query=True, value=True)
+        for item in cmds.optionMenu(menu, query=True, itemListLong=True) or []:
+            cmds.deleteUI(item)
+        for name in pose_snapshots:
+            cmds.menuItem(label=name, parent=menu)
+        if current in pose_snapshots:
+            cmds.optionMenu(menu, edit=True, value=current)
+
+
+def selected_snapshot_name():
+    selected = cmds.textScrollList("snapshotList", query=True, selectItem=True)
+    if not selected:
+        cmds.warning("スナップショットを選択してください。")
+        return None
+    return selected[0].rsplit(" (", 1)[0]
+
+
+def delete_pose_snapshot(snapshot_name):
+    if pose_snapshots.pop(snapshot_name, None) is not None:
+        print(f"スナップショット '{snapshot_name}' を削除しました。")
+
+
+# ---------------------------------------------------------------------------
+# 行列の分解・合成（NumPy でまとめて処理する）
+# Maya の行列は行ベクトル形式（行 0〜2 が各軸、行 3 が移動）
+# ---------------------------------------------------------------------------
+ROTATE_ORDER_AXES = [(0, 1, 2), (1, 2, 0), (2, 0, 1), (0, 2, 1), (1, 0, 2), (2, 1, 0)]  # rotateOrder 0〜5 の回転適用順
+
+
+def decompose_matrices(matrices):
+    # N×16 → 移動 (N×3), スケール (N×3), 回転行列 (N×3×3)
+    m = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+    translation = m[:, 3, :3].copy()
+    axes = m[:, :3, :3]
+    scale = np.linalg.norm(axes, axis=2)
+    # 反転（負の行列式）は X スケールの符号で表す
+    scale[np.linalg.det(axes) < 0, 0] *= -1.0
+    rotation = axes / np.where(scale == 0.0, 1.0, scale)[:, :, None]
+    return translation, scale, rotation
+
+
+def rotation_to_quaternion(rotation):
+    # 回転行列 (N×3×3, 行ベクトル形式) → クォータニオン (N×4, x y z w)
+    c = np.swapaxes(rotation, 1, 2)  # 列ベクトル形式
+    trace = np.stack([
+        1.0 + c[:, 0, 0] - c[:, 1, 1] - c[:, 2, 2],
+        1.0 - c[:, 0, 0] + c[:, 1, 1] - c[:, 2, 2],
+        1.0 - c[:, 0, 0] - c[:, 1, 1] + c[:, 2, 2],
+        1.0 + c[:, 0, 0] + c[:, 1, 1] + c[:, 2, 2],
+    ], axis=1)
+    q = np.sqrt(np.maximum(trace, 0.0)) * 0.5
+    q[:, 0] = np.copysign(q[:, 0], c[:, 2, 1] - c[:, 1, 2])
+    q[:, 1] = np.copysign(q[:, 1], c[:, 0, 2] - c[:, 2, 0])
+    q[:, 2] = np.copysign(q[:, 2], c[:, 1, 0] - c[:, 0, 1])
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def quaternion_to_rotation(q):
+    # クォータニオン (N×4) → 回転行列 (N×3×3, 行ベクトル形式)
+    x, y, z, w = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    c = np.empty((len(q), 3, 3))
+    c[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    c[:, 0, 1] = 2 * (x * y - z * w)
+    c[:, 0, 2] = 2 * (x * z + y * w)
+    c[:, 1, 0] = 2 * (x * y + z * w)
+    c[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    c[:, 1, 2] = 2 * (y * z - x * w)
+    c[:, 2, 0] = 2 * (x * z - y * w)
+    c[:, 2, 1] = 2 * (y * z + x * w)
+    c[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    return np.swapaxes(c, 1, 2)
+
+
+def slerp(q0, q1, weight):
+    # 球面線形補間（全オブジェクト同時）
+    dot = np.sum(q0 * q1, axis=1)
+    q1 = np.where(dot[:, None] < 0.0, -q1, q1)  # 短い経路を通る
+    dot = np.abs(dot)
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_theta = np.sin(theta)
+    near = sin_theta < 1e-6  # ほぼ同じ向きは線形補間
+    safe = np.where(near, 1.0, sin_theta)
+    w0 = np.where(near, 1.0 - weight, np.sin((1.0 - weight) * theta) / safe)
+    w1 = np.where(near, weight, np.sin(weight * theta) / safe)
+    q = w0[:, None] * q0 + w1[:, None] * q1
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+
+def compose_matrices(translation, scale, rotation):
+    m = np.zeros((len(translation), 4, 4))
+    m[:, :3, :3] = rotation * scale[:, :, None]
+    m[:, 3, :3] = translation
+    m[:, 3, 3] = 1.0
+    return m.reshape(-1, 16)
+
+
+def rotation_to_euler(rotation, order):
+    # 回転行列 (N×3×3) → オイラー角（ラジアン, X Y Z の順に格納）
+    axes = ROTATE_ORDER_AXES[order]
+    c = np.swapaxes(rotation, 1, 2)[:, axes][:, :, axes]
+    sign = 1.0 if order < 3 else -1.0  # 奇置換の回転順序は角度が反転する
+    second = np.arcsin(np.clip(-c[:, 2, 0], -1.0, 1.0))
+    locked = np.abs(c[:, 2, 0]) > 1.0 - 1e-9  # ジンバルロック
+    first = np.where(locked, 0.0, np.arctan2(c[:, 2, 1], c[:, 2, 2]))
+    third = np.where(locked, np.arctan2(-c[:, 0, 1], c[:, 1, 1]), np.arctan2(c[:, 1, 0], c[:, 0, 0]))
+    euler = np.empty((len(rotation), 3))
+    euler[:, axes[0]] = first * sign
+    euler[:, axes[1]] = second * sign
+    euler[:, axes[2]] = third * sign
+    return euler
+
+
+# ---------------------------------------------------------------------------
+# ワールド行列の一括書き込み
+# 対象オブジェクトのプラグ・回転順序・親の逆行列をキャッシュし、
+# ピボットや回転軸を持たない transform は NumPy でまとめてローカル値に分解する。
+# それ以外（ジョイント・ピボット付き）は MTransformationMatrix で個別に分解する。
+# ---------------------------------------------------------------------------
+class TransformWriter:
+    ATTRS = ("translate", "rotate", "scale")
+
+    def __init__(self, dag_paths):
+        self.dag_paths = list(dag_paths)
+        count = len(self.dag_paths)
+        self.rotate_orders = np.zeros(count, dtype=np.int64)
+        self.parent_inverse = np.empty((count, 16))
+        self.vectorized = np.zeros(count, dtype=bool)
+        self.plugs = []
+
+        for i, dag_path in enumerate(self.dag_paths):
+            fn = om.MFnDependencyNode(dag_path.node())
+            self.parent_inverse[i] = list(dag_path.exclusiveMatrixInverse())
+            self.plugs.append({f"{attr}{axis}": fn.findPlug(f"{attr}{axis}", False) for attr in self.ATTRS for axis in "XYZ"})
+            if dag_path.apiType() == om.MFn.kJoint:
+                continue
+            current = om.MFnTransform(dag_path).transformation()
+            self.rotate_orders[i] = current.rotationOrder() - 1
+            self.vectorized[i] = (
+                current.rotatePivot(om.MSpace.kTransform).isEquivalent(om.MPoint.kOrigin)
+                and current.scalePivot(om.MSpace.kTransform).isEquivalent(om.MPoint.kOrigin)
+                and current.rotatePivotTranslation(om.MSpace.kTransform).isEquivalent(om.MVector.kZeroVector)
+                and current.scalePivotTranslation(om.MSpace.kTransform).isEquivalent(om.MVector.kZeroVector)
+                and current.rotationOrientation().isEquivalent(om.MQuaternion.kIdentity)
+            )
+
+    @classmethod
+    def from_names(cls, names):
+        selection = om.MSelectionList()
+        for name in names:
+            selection.add(name)
+        return cls(selection.getDagPath(i) for i in range(selection.length()))
+
+    def local_values(self, world_matrices, parent_inverse=None):
+        # ワールド行列 (N×16) → {プラグ名: 値の配列 (N)}（回転はラジアン）
+        # ピボット付きのオブジェクトは rotatePivotTranslate 等も含む個別の辞書で返す
+        world = np.asarray(world_matrices, dtype=np.float64).reshape(-1, 4, 4)
+        parent = (self.parent_inverse if parent_inverse is None else np.asarray(parent_inverse)).reshape(-1, 4, 4)
+        local = np.matmul(world, parent)
+
+        translation, scale, rotation = decompose_matrices(local.reshape(-1, 16))
+        euler = np.empty_like(translation)
+        for order in np.unique(self.rotate_orders):
+            rows = self.rotate_orders == order
+            euler[rows] = rotation_to_euler(rotation[rows], order)
+
+        values = {}
+        for attr, data in (("translate", translation), ("rotate", euler), ("scale", scale)):
+            for axis_index, axis in enumerate("XYZ"):
+                values[f"{attr}{axis}"] = data[:, axis_index]
+
+        individual = {}
+        for i in np.flatnonzero(~self.vectorized):
+            world_matrix = om.MMatrix(world[i].ravel().tolist())
+            if self.dag_paths[i].apiType() == om.MFn.kJoint:
+                individual[i] = None  # ジョイントは xform で書き込む
+            else:
+                individual[i] = world_matrix_to_local_values(self.dag_paths[i], world_matrix, om.MMatrix(parent[i].ravel().tolist()))
+        return values, individual
+
+    def prepare(self, world_matrices):
+        # 全オブジェクトのワールド行列を 1 つの MDGModifier にまとめる（まだ書き込まない）
+        # ジョイントは xform で書き込むため、取り消し用に現在のワールド行列を控えておく
+        world = np.asarray(world_matrices, dtype=np.float64).reshape(-1, 16)
+        values, individual = self.local_values(world)
+        transform_write = TransformWrite()
+        modifier = transform_write.modifier
+
+        for i, plugs in enumerate(self.plugs):
+            if i in individual:
+                if individual[i] is None:
+                    name = self.dag_paths[i].fullPathName()
+                    previous = cmds.xform(name, query=True, worldSpace=True, matrix=True)
+                    transform_write.joints.append((name, world[i].tolist(), previous))
+                else:
+                    set_local_values(modifier, self.dag_paths[i], individual[i])
+                continue
+            for plug_name, plug in plugs.items():
+                if plug.isLocked or plug.isDestination:
+                    continue
+                if plug_name.startswith("rotate"):
+                    modifier.newPlugValueMAngle(plug, om.MAngle(float(values[plug_name][i]), om.MAngle.kRadians))
+                else:
+                    modifier.newPlugValueDouble(plug, float(values[plug_name][i]))
+        return transform_write
+
+    def write(self, world_matrices, undoable=True):
+        # undoable=True なら Undo 可能なコマンドとして書き込む（1 回の Ctrl+Z で全体が戻る）
+        transform_write = self.prepare(world_matrices)
+        if undoable:
+            run_undoable(transform_write.doIt, transform_write.undoIt)
+        else:
+            transform_write.doIt()
+        return transform_write
+
+    def bake(self, frames, world_matrices, parent_inverse=None):
+        # フレームごとのワールド行列 (F×N×16) をアニメーションカーブとして書き込む
+        # 新規カーブの作成は 1 つの MDGModifier で行い、キーは MFnAnimCurve.addKeys でまとめて追加する
+        # 書き込みは Undo 可能なコマンドとして実行する
+        world = np.asarray(world_matrices, dtype=np.float64).reshape(len(frames), len(self.dag_paths), 16)
+        per_frame = [
+            self.local_values(world[f], None if parent_inverse is None else parent_inverse[f])
+            for f in range(len(frames))
+        ]
+
+        # プラグごとの値の列 (F) を作る
+        curves = {}
+        for i, plugs in enumerate(self.plugs):
+            for plug_name, plug in plugs.items():
+                if plug.isLocked:
+                    continue
+                column = []
+                for values, individual in per_frame:
+                    if i in individual:
+                        local = individual[i]
+                        if local is None:
+                            break  # ジョイントは対象外
+                        attr, axis = plug_name[:-1], "XYZ".index(plug_name[-1])
+                        column.append(local[attr][axis])
+                    else:
+                        column.append(values[plug_name][i])
+                else:
+                    column = np.asarray(column)
+                    if plug_name.startswith("rotate"):
+                        column = np.unwrap(column)  # オイラーフィルター
+                    curves[(i, plug_name)] = (plug, column)
+
+        times = om.MTimeArray([om.MTime(float(frame), om.MTime.uiUnit()) for frame in frames])
+        modifier = om.MDGModifier()
+        change = oma.MAnimCurveChange()
+        pending = []
+        for (i, plug_name), (plug, column) in curves.items():
+            curve_fn = oma.MFnAnimCurve()
+            source = plug.source()
+            if not source.isNull and source.node().hasFn(om.MFn.kAnimCurve):
+                curve_fn.setObject(source.node())
+            elif plug.isDestination:
+                continue  # アニメーションカーブ以外が接続されている
+            else:
+                curve_type = oma.MFnAnimCurve.kAnimCurveTA if plug_name.startswith("rotate") else (
+                    oma.MFnAnimCurve.kAnimCurveTL if plug_name.startswith("translate") else oma.MFnAnimCurve.kAnimCurveTU)
+                curve_fn.create(plug, curve_type, modifier)
+            pending.append((curve_fn, column))
+
+        def do_it():
+            modifier.doIt()
+            for curve_fn, column in pending:
+                curve_fn.addKeys(times, om.MDoubleArray(column.tolist()), keepExistingKeys=True, change=change)
+
+        bake_undo = BakeUndo(modifier, change)
+        run_undoable(do_it, bake_undo.undoIt, bake_undo.redoIt)
+        return bake_undo
+
+
+# TransformWriter.prepare の書き込み内容（MDGModifier と xform で書き込むジョイント）
+class TransformWrite:
+    def __init__(self):
+        self.modifier = om.MDGModifier()
+        self.joints = []  # [(ジョイント名, 目標のワールド行列, 変更前のワールド行列)]
+
+    def doIt(self):
+        self.modifier.doIt()
+        for name, target, _ in self.joints:
+            cmds.xform(name, worldSpace=True, matrix=target)
+
+    def undoIt(self):
+        self.modifier.undoIt()
+        for name, _, previous in self.joints:
+            cmds.xform(name, worldSpace=True, matrix=previous)
+
+
+# ベイクの取り消し・やり直し用（追加したキー → 作成したカーブの順に戻す）
+class BakeUndo:
+    def __init__(self, modifier, change):
+        self.modifier = modifier
+        self.change = change
+
+    def undoIt(self):
+        self.change.undoIt()
+        self.modifier.undoIt()
+
+    def redoIt(self):
+        self.modifier.doIt()
+        self.change.redoIt()
+
+
+# ---------------------------------------------------------------------------
+# スナップショット間のブレンド
+# 2 つのスナップショットに共通するオブジェクトを事前に分解しておき、
+# スライダー操作ごとに補間 → 合成 → 一括書き込みのみを行う
+# ドラッグ中の書き込みは Undo キューに記録せず、離したときにドラッグ開始前からの変更を 1 回の Undo として記録する
+# ---------------------------------------------------------------------------
+class PoseBlender:
+    def __init__(self, snapshot_a, snapshot_b):
+        rows_b = snapshot_b.rows(snapshot_a.uuid_strings())
+        common_a = np.flatnonzero(rows_b >= 0)
+        rows_b = rows_b[common_a]
+
+        names = resolve_uuids([snapshot_a.uuid_strings()[i] for i in common_a])
+        found = np.array([name is not None for name in names], dtype=bool)
+        self.names = [name for name in names if name is not None]
+        self.skipped = len(snapshot_a) + len(snapshot_b) - 2 * len(common_a) + int((~found).sum())
+
+        self.translation_a, self.scale_a, rotation_a = decompose_matrices(snapshot_a.matrices[common_a[found]])
+        self.translation_b, self.scale_b, rotation_b = decompose_matrices(snapshot_b.matrices[rows_b[found]])
+        self.quaternion_a = rotation_to_quaternion(rotation_a)
+        self.quaternion_b = rotation_to_quaternion(rotation_b)
+        self.writer = TransformWriter.from_names(self.names) if self.names else None
+        self.drag_start = None  # ドラッグ最初の書き込み（undoIt でドラッグ開始前の状態に戻せる）
+
+    def __len__(self):
+        return len(self.names)
+
+    def matrices(self, weight):
+        # ブレンド率 weight (0〜1) のワールド行列 (N×16)
+        translation = self.translation_a + (self.translation_b - self.translation_a) * weight
+        scale = self.scale_a + (self.scale_b - self.scale_a) * weight
+        quaternion = slerp(self.quaternion_a, self.quaternion_b, weight)
+        return compose_matrices(translation, scale, quaternion_to_rotation(quaternion))
+
+    def drag(self, weight):
+        # ドラッグ中のプレビュー（Undo キューには記録しない）
+        if self.writer is None:
+            return
+        transform_write = self.writer.prepare(self.matrices(weight))
+        call_without_undo(transform_write.doIt)
+        if self.drag_start is None:
+            self.drag_start = transform_write
+
+    def apply(self, weight):
+        # ドラッグ中のプレビューを開始前の状態に戻してから、最終的な値を Undo 可能なコマンドとして書き込む
+        if self.writer is None:
+            return
+        if self.drag_start is not None:
+            call_without_undo(self.drag_start.undoIt)
+            self.drag_start = None
+        self.writer.write(self.matrices(weight))
+
+    def bake(self, start_frame, end_frame):
+        # 開始フレームで A、終了フレームで B になるようにキーを打つ
+        if self.writer is None:
+            return
+        frames = list(range(int(start_frame), int(end_frame) + 1))
+        span = max(1, frames[-1] - frames[0])
+        world = np.stack([self.matrices((frame - frames[0]) / span) for frame in frames])
+        self.writer.bake(frames, world)
+
+
+pose_blender = None
+pose_blender_key = None  # pose_blender を作成したスナップショット名の組 (A, B)
+
+
+def start_pose_blend(snapshot_name_a, snapshot_name_b):
+    global pose_blender, pose_blender_key
+    pose_blender_key = (snapshot_name_a, snapshot_name_b)
+    snapshot_a = pose_snapshots.get(snapshot_name_a)
+    snapshot_b = pose_snapshots.get(snapshot_name_b)
+    if snapshot_a is None or snapshot_b is None:
+        cmds.warning("ブレンドする 2 つのスナップショットを選択してください。")
+        pose_blender = None
+        return None
+    pose_blender = PoseBlender(snapshot_a, snapshot_b)
+    print(f"ブレンド: '{snapshot_name_a}' → '{snapshot_name_b}'（{len(pose_blender)} オブジェクト）")
+    if pose_blender.skipped:
+        cmds.warning(f"{pose_blender.skipped} 個のオブジェクトは片方のスナップショットにしか無いか、シーンに見つからないため除外しました。")
+    return pose_blender
+
+
+# ---------------------------------------------------------------------------
+# 時間範囲のキャプチャ
+# currentTime を動かさずに MDGContext でフレームごとに評価するため、ビューポートは更新されない。
+# 結果はフレーム × オブジェクト × 16 の配列で保持し、現在フレームへの再適用・ベイクに使う。
+# ---------------------------------------------------------------------------
+class RangeCapture:
+    def __init__(self, uuids, frames, world_matrices, parent_inverse):
+        self.uuids = list(uuids)
+        self.frames = np.asarray(frames, dtype=np.float64)
+        self.world_matrices = world_matrices      # F×N×16
+        self.parent_inverse = parent_inverse      # F×N×16（親のアニメーションも含めてベイクするため）
+
+    @property
+    def nbytes(self):
+        return self.world_matrices.nbytes + self.parent_inverse.nbytes
+
+    def frame_row(self, frame):
+        # 指定フレームに最も近いキャプチャ済みフレームの行番号
+        return int(np.abs(self.frames - frame).argmin())
+
+
+range_capture = None  # 直前の時間範囲キャプチャ
+
+
+# オブジェクトのワールド行列と親の逆行列を frames の各フレームで評価する
+def capture_transform_range(names, frames):
+    selection = om.MSelectionList()
+    for name in names:
+        selection.add(name)
+
+    uuids = []
+    world_plugs = []
+    parent_plugs = []
+    for i in range(selection.length()):
+        fn = om.MFnDependencyNode(selection.getDependNode(i))
+        uuids.append(fn.uuid().asString())
+        world_plugs.append(fn.findPlug("worldMatrix", False).elementByLogicalIndex(0))
+        parent_plugs.append(fn.findPlug("parentInverseMatrix", False).elementByLogicalIndex(0))
+
+    world = np.empty((len(frames), len(uuids), 16), dtype=np.float64)
+    parent_inverse = np.empty_like(world)
+    unit = om.MTime.uiUnit()
+    for f, frame in enumerate(frames):
+        context = om.MDGContext(om.MTime(float(frame), unit))
+        previous = context.makeCurrent()
+        try:
+            for i in range(len(uuids)):
+                world[f, i] = list(om.MFnMatrixData(world_plugs[i].asMObject()).matrix())
+                parent_inverse[f, i] = list(om.MFnMatrixData(parent_plugs[i].asMObject()).matrix())
+        finally:
+            previous.makeCurrent()
+    return RangeCapture(uuids, frames, world, parent_inverse)
+
+
+# 選択中のオブジェクトを start〜end フレームの範囲でキャプチャする
+def capture_selected_range(start_frame, end_frame, step=1):
+    global range_capture
+    objects = cmds.ls(selection=True, type="transform", long=True) or []
+    if not objects:
+        cmds.warning("オブジェクトが選択されていません。")
+        return None
+    if end_frame < start_frame:
+        cmds.warning("終了フレームは開始フレーム以降にしてください。")
+        return None
+
+    frames = np.arange(start_frame, end_frame + step * 0.5, step)
+    start = time.perf_counter()
+    range_capture = capture_transform_range(objects, frames)
+    elapsed = time.perf_counter() - start
+    print(f"{len(objects)} オブジェクト × {len(frames)} フレームをキャプチャしました"
+          f"（{elapsed:.2f} 秒, {range_capture.nbytes / 1024 / 1024:.1f} MB）")
+    return range_capture
+
+
+# キャプチャのうちシーンに存在するオブジェクトの名前と列番号を返す
+def resolve_range_capture(capture):
+    names = resolve_uuids(capture.uuids)
+    columns = [i for i, name in enumerate(names) if name is not None]
+    missing = len(names) - len(columns)
+    if missing:
+        cmds.warning(f"{missing} 個のオブジェクトがシーンに見つかりません。")
+    return [names[i] for i in columns], columns
+
+
+# 現在フレームに対応するキャプチャ結果をオブジェクトに適用する
+def apply_range_capture_frame(frame=None):
+    if range_capture is None:
+        cmds.warning("時間範囲のキャプチャがありません。")
+        return
+    if frame is None:
+        frame = cmds.currentTime(query=True)
+
+    names, columns = resolve_range_capture(range_capture)
+    if not names:
+        return
+    row = range_capture.frame_row(frame)
+    TransformWriter.from_names(names).write(range_capture.world_matrices[row, columns])
+    print(f"フレーム {range_capture.frames[row]:g} のキャプチャを {len(names)} オブジェクトに適用しました。")
+
+
+# キャプチャ結果をアニメーションカーブとしてベイクする
+def bake_range_capture():
+    if range_capture is None:
+        cmds.warning("時間範囲のキャプチャがありません。")
+        return
+
+    names, columns = resolve_range_capture(range_capture)
+    if not names:
+        return
+    writer = TransformWriter.from_names(names)
+    writer.bake(range_capture.frames.tolist(),
+                range_capture.world_matrices[:, columns],
+                range_capture.parent_inverse[:, columns])
+    print(f"{len(names)} オブジェクト × {len(range_capture.frames)} フレームをベイクしました。")
+
+
+# キャプチャの計測（MDGContext による評価と、currentTime を動かして xform で取得する方法を比較する）
+# スクラブ方式は scrub_frames フレーム分だけ実行し、全フレーム分に換算して表示する
+def benchmark_range_capture(count=500, frame_count=1000, scrub_frames=50):
+    dag_modifier = om.MDagModifier()
+    nodes = [dag_modifier.createNode("transform") for _ in range(count)]
+    dag_modifier.doIt()
+    names = [om.MFnDagNode(node).partialPathName() for node in nodes]
+    original_time = cmds.currentTime(query=True)
+
+    try:
+        cmds.setKeyframe(names, attribute="translateX", time=1, value=0)
+        cmds.setKeyframe(names, attribute="translateX", time=frame_count, value=10)
+        cmds.setKeyframe(names, attribute="rotateY", time=1, value=0)
+        cmds.setKeyframe(names, attribute="rotateY", time=frame_count, value=360)
+
+        start = time.perf_counter()
+        capture_transform_range(names, np.arange(1, frame_count + 1))
+        context_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for frame in range(1, scrub_frames + 1):
+            cmds.currentTime(frame)
+            for name in names:
+                cmds.xform(name, query=True, worldSpace=True, matrix=True)
+        scrub_elapsed = (time.perf_counter() - start) * frame_count / scrub_frames
+
+        print(f"時間範囲キャプチャ（{count} オブジェクト × {frame_count} フレーム）: "
+              f"MDGContext {context_elapsed:.2f} 秒 | currentTime + xform（推定）{scrub_elapsed:.2f} 秒")
+    finally:
+        cmds.currentTime(original_time)
+        cmds.delete(names)
+
+
+# ---------------------------------------------------------------------------
+# スナップショットアーカイブ
+# ファイル構成: ファイルヘッダー + レコードの追記のみ
+#   レコード = レコードヘッダー / 名前（8 バイト境界に揃える）/ UUID テーブル（16 バイト×N, ソート済み）/ 行列ブロック（float64×16×N）
+# 読み込みは mmap で行い、一覧表示はヘッダーのみ、部分復元は必要な行のみを参照する。
+# ---------------------------------------------------------------------------
+ARCHIVE_FILE_HEADER = struct.Struct("<4sHH")     # マジック, バージョン, 予約
+ARCHIVE_RECORD_HEADER = struct.Struct("<4sIdII")  # マジック, 名前の長さ, 作成時刻, オブジェクト数, 予約
+ARCHIVE_MAGIC = b"SRPA"
+ARCHIVE_RECORD_MAGIC = b"SNAP"
+ARCHIVE_VERSION = 1
+
+autosave_stop = None  # 自動保存の実行ごとの停止イベント（停止直後に再開しても古いスレッドは必ず終了する）
+
+
+class ArchiveRecord:
+    def __init__(self, name, created, count, uuid_offset, matrix_offset):
+        self.name = name
+        self.created = created
+        self.count = count
+        self.uuid_offset = uuid_offset
+        self.matrix_offset = matrix_offset
+
+
+class SnapshotArchive:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.map = None
+        self.mapped_size = 0
+        self.cached_records = []
+
+    def append(self, snapshot):
+        # レコードを末尾に追記する（既存データは書き換えない）
+        # 書き込み途中で中断したレコードが末尾に残っている場合は、最後の有効なレコードの終端で切り詰めてから書く
+        _, valid_end = self.scan()
+        self.close()  # Windows では mmap 中のファイルを伸ばせないため一旦閉じる
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        name = snapshot.name.encode("utf-8")
+        padding = (-(ARCHIVE_RECORD_HEADER.size + len(name))) % 8
+        uuid_table = b"".join(UUID(u.decode("ascii")).bytes for u in snapshot.uuids)
+
+        with open(self.path, "r+b" if os.path.exists(self.path) else "wb") as f:
+            f.truncate(valid_end)
+            f.seek(valid_end)
+            if valid_end == 0:
+                f.write(ARCHIVE_FILE_HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, 0))
+            f.write(ARCHIVE_RECORD_HEADER.pack(ARCHIVE_RECORD_MAGIC, len(name), snapshot.created, len(snapshot), 0))
+            f.write(name + b"\0" * padding)
+            f.write(uuid_table)
+            f.write(snapshot.matrices.astype("<f8", copy=False).tobytes())
+
+    def open(self):
+        # ファイルが伸びていれば mmap し直す
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if self.map is not None and size == self.mapped_size:
+            return self.map
+        self.close()
+        if size <= ARCHIVE_FILE_HEADER.size:
+            return None
+
+        self.file = open(self.path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.mapped_size = size
+        magic, version, _ = ARCHIVE_FILE_HEADER.unpack_from(self.map, 0)
+        if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+            self.close()
+            raise IOError(f"スナップショットアーカイブの形式が不正です: {self.path}")
+        return self.map
+
+    def records(self):
+        records, _ = self.scan()
+        self.cached_records = records
+        return records
+
+    def scan(self):
+        # レコードヘッダーだけを辿って一覧を作る（行列ブロックは読まない）
+        # 戻り値: (レコードのリスト, 最後の有効なレコードの終端位置。ヘッダーも無ければ 0)
+        archive_map = self.open()
+        if archive_map is None:
+            return [], 0
+
+        records = []
+        offset = ARCHIVE_FILE_HEADER.size
+        while offset + ARCHIVE_RECORD_HEADER.size <= self.mapped_size:
+            magic, name_length, created, count, _ = ARCHIVE_RECORD_HEADER.unpack_from(archive_map, offset)
+            if magic != ARCHIVE_RECORD_MAGIC:
+                break
+            name_start = offset + ARCHIVE_RECORD_HEADER.size
+            uuid_offset = name_start + name_length + (-(ARCHIVE_RECORD_HEADER.size + name_length)) % 8
+            matrix_offset = uuid_offset + 16 * count
+            end = matrix_offset + 128 * count
+            if end > self.mapped_size:
+                break  # 書き込み途中のレコード
+            name = archive_map[name_start:name_start + name_length].decode("utf-8")
+            records.append(ArchiveRecord(name, created, count, uuid_offset, matrix_offset))
+            offset = end
+        return records, offset
+
+    def uuid_table(self, record):
+        return np.frombuffer(self.open(), dtype="S16", count=record.count, offset=record.uuid_offset)
+
+    def load(self, record, uuids=None):
+        # uuids を指定した場合は該当する行だけを読む。戻り値: (UUID 文字列のリスト, 行列)
+        table = self.uuid_table(record)
+        matrices = np.frombuffer(self.open(), dtype="<f8", count=record.count * 16, offset=record.matrix_offset).reshape(-1, 16)
+
+        if uuids is None:
+            rows = np.arange(record.count)
+        else:
+            query = np.asarray([UUID(u).bytes for u in uuids], dtype="S16")
+            rows = np.minimum(np.searchsorted(table, query), max(record.count - 1, 0))
+            rows = np.unique(rows[table[rows] == query]) if record.count else rows[:0]
+
+        uuid_strings = [str(UUID(bytes=bytes(table[i]).ljust(16, b"\0"))).upper() for i in rows]
+        return uuid_strings, np.array(matrices[rows])
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.mapped_size = 0
+
+
+snapshot_archive = None
+
+
+def get_snapshot_archive():
+    # プロジェクトの data フォルダにアーカイブを置く
+    global snapshot_archive
+    path = os.path.join(cmds.workspace(query=True, rootDirectory=True), "data", "pose_snapshots.srpa")
+    if snapshot_archive is None or snapshot_archive.path != path:
+        if snapshot_archive is not None:
+            snapshot_archive.close()
+        snapshot_archive = SnapshotArchive(path)
+    return snapshot_archive
+
+
+# スナップショットをアーカイブへ追記する
+def archive_pose_snapshot(snapshot_name):
+    snapshot = pose_snapshots.get(snapshot_name)
+    if snapshot is None:
+        cmds.warning(f"スナップショット '{snapshot_name}' が存在しません。")
+        return
+    archive = get_snapshot_archive()
+    archive.append(snapshot)
+    print(f"スナップショット '{snapshot_name}' をアーカイブに保存しました: {archive.path}")
+
+
+# アーカイブのレコードを復元する（シーンで選択中のオブジェクトがあればそれだけを読む）
+def restore_archived_snapshot(record_index, changed_only=True):
+    archive = get_snapshot_archive()
+    records = archive.records()
+    if not 0 <= record_index < len(records):
+        cmds.warning("アーカイブのレコードが見つかりません。")
+        return
+    record = records[record_index]
+
+    selected = cmds.ls(selection=True, type="transform", long=True) or []
+    uuids = cmds.ls(selected, uuid=True) if selected else None
+    uuid_strings, matrices = archive.load(record, uuids)
+    applied = restore_matrices(uuid_strings, matrices, changed_only)
+    print(f"アーカイブ '{record.name}' を復元しました（{applied} / {len(uuid_strings)} オブジェクトを更新）")
+
+
+# アーカイブのレコードをスナップショットとして読み込む
+def load_archived_snapshot(record_index):
+    archive = get_snapshot_archive()
+    records = archive.records()
+    if not 0 <= record_index < len(records):
+        cmds.warning("アーカイブのレコードが見つかりません。")
+        return None
+    record = records[record_index]
+    uuid_strings, matrices = archive.load(record)
+    snapshot = PoseSnapshot(record.name, uuid_strings, matrices, record.created)
+    pose_snapshots[record.name] = snapshot
+    return snapshot
+
+
+# 自動保存: リストに登録したオブジェクトのスナップショットを一定間隔でアーカイブに追記する
+def autosave_pose_snapshot():
+    if not saved_object_data:
+        return
+    names = [name for name in resolve_uuids(list(saved_object_data)) if name is not None]
+    if not names:
+        return
+    uuids, matrices = capture_world_matrices(names)
+    snapshot = PoseSnapshot(time.strftime("autosave_%Y%m%d_%H%M%S"), uuids, matrices)
+    get_snapshot_archive().append(snapshot)
+    print(f"[{time.strftime('%H:%M:%S')}] 自動保存しました（{len(snapshot)} オブジェクト）")
+    if cmds.textScrollList("archiveList", exists=True):
+        refresh_archive_list()
+
+
+def autosave_loop(interval, stop_event):
+    while not stop_event.wait(interval):
+        cmds.evalDeferred(autosave_pose_snapshot)
+
+
+def autosave_enabled():
+    return autosave_stop is not None and not autosave_stop.is_set()
+
+
+def set_autosave(enabled, interval_minutes=5):
+    global autosave_stop
+    if enabled and not autosave_enabled():
+        autosave_stop = threading.Event()
+        threading.Thread(target=autosave_loop, args=(max(1, int(interval_minutes * 60)), autosave_stop), daemon=True).start()
+        print(f"自動保存を開始しました（{interval_minutes} 分ごと）")
+    elif not enabled and autosave_enabled():
+        autosave_stop.set()
+        print("自動保存を停止しました。")
+
+
+# アーカイブリストの表示を更新する
+def refresh_archive_list():
+    cmds.textScrollList("archiveList", edit=True, removeAll=True)
+    try:
+        records = get_snapshot_archive().records()
+    except IOError as e:
+        cmds.warning(str(e))
+        return
+    items = [f"{i + 1}: {record.name} ({record.count}) {time.strftime('%m/%d %H:%M', time.localtime(record.created))}" for i, record in enumerate(records)]
+    if items:
+        cmds.textScrollList("archiveList", edit=True, append=items)
+
+
+def selected_archive_index():
+    selected = cmds.textScrollList("archiveList", query=True, selectIndexedItem=True)
+    if not selected:
+        cmds.warning("アーカイブのレコードを選択してください。")
+        return None
+    return selected[0] - 1
+
+
 # ここからGUI
 # Save and Restore Positions GUI
 def create_gui():
     if cmds.window("saveRestoreWindow", exists=True):
         cmds.deleteUI("saveRestoreWindow")
 
-    window = cmds.window("saveRestoreWindow", title="Save and Restore Positions", widthHeight=(300, 400))
+    window = cmds.window("saveRestoreWindow", title="Save and Restore Positions", widthHeight=(300, 1090))
     cmds.columnLayout(adjustableColumn=True)
 
     cmds.textScrollList("objectList", allowMultiSelection=True, height=200)
@@ -179,10 +1289,140 @@ def create_gui():
 
     cmds.button(label="Restore Selected Positions", command=lambda x: restore_selected_object_position())
 
+    cmds.separator(height=3, style='none')  # 隙間
+
     cmds.separator(height=10, style='in')  # 仕切り
 
     cmds.button(label="Delete Selected from List", command=lambda x: delete_selected_from_list(), backgroundColor=(0.8, 0.3, 0.3))
 
+    # ポーズスナップショット
+    cmds.separator(height=10, style='in')  # 仕切り
+    cmds.text(label="Pose Snapshots")
+    snapshot_name_field = cmds.textField(text="pose_1")
+    cmds.textScrollList("snapshotList", allowMultiSelection=False, height=100)
+    changed_only_checkbox = cmds.checkBox(label="変化したオブジェクトのみ復元", value=True)
+
+    def on_save_snapshot(*args):
+        if save_pose_snapshot(cmds.textField(snapshot_name_field, query=True, text=True)):
+            refresh_snapshot_list()
+
+    def on_restore_snapshot(*args):
+        snapshot_name = selected_snapshot_name()
+        if snapshot_name:
+            restore_pose_snapshot(snapshot_name, cmds.checkBox(changed_only_checkbox, query=True, value=True))
+
+    def on_delete_snapshot(*args):
+        snapshot_name = selected_snapshot_name()
+        if snapshot_name:
+            delete_pose_snapshot(snapshot_name)
+            refresh_snapshot_list()
+
+    cmds.button(label="Save Snapshot", command=on_save_snapshot)
+    cmds.separator(height=3, style='none')  # 隙間
+    cmds.button(label="Restore Snapshot", command=on_restore_snapshot)
+    cmds.separator(height=3, style='none')  # 隙間
+    cmds.button(label="Delete Snapshot", command=on_delete_snapshot, backgroundColor=(0.8, 0.3, 0.3))
+
+    # スナップショット間のブレンド
+    cmds.separator(height=10, style='in')  # 仕切り
+    cmds.text(label="Pose Blend")
+    cmds.optionMenu("blendSourceMenu", label="A")
+    cmds.optionMenu("blendTargetMenu", label="B")
+
+    def current_blender():
+        # A・B の組み合わせが変わったときだけ分解をやり直す
+        source = cmds.optionMenu("blendSourceMenu", query=True, value=True)
+        target = cmds.optionMenu("blendTargetMenu", query=True, value=True)
+        if pose_blender is None or pose_blender_key != (source, target):
+            return start_pose_blend(source, target)
+        return pose_blender
+
+    def on_blend_drag(*args):
+        blender = current_blender()
+        if blender is not None:
+            blender.drag(cmds.floatSliderGrp(blend_slider, query=True, value=True))
+
+    def on_blend_change(*args):
+        blender = current_blender()
+        if blender is not None:
+            blender.apply(cmds.floatSliderGrp(blend_slider, query=True, value=True))
+
+    def on_blend_bake(*args):
+        blender = current_blender()
+        if blender is not None:
+            start_frame = cmds.intField(bake_start_field, query=True, value=True)
+            end_frame = cmds.intField(bake_end_field, query=True, value=True)
+            blender.bake(start_frame, end_frame)
+            print(f"ブレンドをベイクしました（{start_frame}〜{end_frame} フレーム, {len(blender)} オブジェクト）")
+
+    blend_slider = cmds.floatSliderGrp(label="Blend", field=True, minValue=0.0, maxValue=1.0, value=0.0,
+                                       columnWidth3=(40, 50, 200), dragCommand=on_blend_drag, changeCommand=on_blend_change)
+    cmds.rowLayout(numberOfColumns=4)
+    cmds.text(label="ベイク範囲")
+    bake_start_field = cmds.intField(value=int(cmds.playbackOptions(query=True, minTime=True)), width=50)
+    bake_end_field = cmds.intField(value=int(cmds.playbackOptions(query=True, maxTime=True)), width=50)
+    cmds.button(label="Bake Blend", command=on_blend_bake)
+    cmds.setParent("..")
+
+    # 時間範囲のキャプチャ
+    cmds.separator(height=10, style='in')  # 仕切り
+    cmds.text(label="Time Range Capture")
+    cmds.rowLayout(numberOfColumns=4)
+    cmds.text(label="範囲")
+    capture_start_field = cmds.intField(value=int(cmds.playbackOptions(query=True, minTime=True)), width=50)
+    capture_end_field = cmds.intField(value=int(cmds.playbackOptions(query=True, maxTime=True)), width=50)
+    capture_step_field = cmds.intField(value=1, minValue=1, width=30)
+    cmds.setParent("..")
+
+    def on_capture_range(*args):
+        capture_selected_range(cmds.intField(capture_start_field, query=True, value=True),
+                               cmds.intField(capture_end_field, query=True, value=True),
+                               cmds.intField(capture_step_field, query=True, value=True))
+
+    cmds.button(label="Capture Selected over Range", command=on_capture_range)
+    cmds.separator(height=3, style='none')  # 隙間
+    cmds.button(label="Apply Capture at Current Frame", command=lambda x: apply_range_capture_frame())
+    cmds.separator(height=3, style='none')  # 隙間
+    cmds.button(label="Bake Capture", command=lambda x: bake_range_capture())
+
+    # アーカイブ（ファイルへの保存）
+    cmds.separator(height=10, style='in')  # 仕切り
+    cmds.text(label="Snapshot Archive")
+    cmds.textScrollList("archiveList", allowMultiSelection=False, height=100)
+
+    def on_archive_snapshot(*args):
+        snapshot_name = selected_snapshot_name()
+        if snapshot_name:
+            archive_pose_snapshot(snapshot_name)
+            refresh_archive_list()
+
+    def on_restore_archive(*args):
+        index = selected_archive_index()
+        if index is not None:
+            restore_archived_snapshot(index, cmds.checkBox(changed_only_checkbox, query=True, value=True))
+
+    def on_load_archive(*args):
+        index = selected_archive_index()
+        if index is not None and load_archived_snapshot(index):
+            refresh_snapshot_list()
+
+    def on_autosave_change(*args):
+        set_autosave(cmds.checkBox(autosave_checkbox, query=True, value=True), cmds.intField(autosave_interval_field, query=True, value=True))
+
+    cmds.button(label="Save Snapshot to Archive", command=on_archive_snapshot)
+    cmds.separator(height=3, style='none')  # 隙間
+    cmds.button(label="Restore from Archive (selected objects only)", command=on_restore_archive)
+    cmds.separator(height=3, style='none')  # 隙間
+    cmds.button(label="Load Archive into Snapshots", command=on_load_archive)
+    cmds.rowLayout(numberOfColumns=3)
+    autosave_checkbox = cmds.checkBox(label="リストを自動保存", value=autosave_enabled(), changeCommand=on_autosave_change)
+    autosave_interval_field = cmds.intField(value=5, minValue=1, width=40)
+    cmds.text(label="分ごと")
+    cmds.setParent("..")
+
+    refresh_snapshot_list()
+    refresh_archive_list()
+
     cmds.showWindow(window)
 
 # GUI表示
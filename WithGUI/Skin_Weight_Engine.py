@@ -0,0 +1,832 @@
+# --------------------------------------------------------------------------
+# ScriptName: Skin Weight Engine
+# Author: Naruse
+# Contents: skinCluster のウェイトを NumPy で一括編集するスクリプト（SkinValueTool の補助）
+#           ウェイト行列は getWeights で 1 回だけ読み込み、選択頂点に対して
+#           設定・スケール・正規化・しきい値以下の削除・最大インフルエンス数の制限を行い、
+#           変更のあったインフルエンスだけを setWeights 1 回で書き戻す
+#           ウェイトは疎行列（CSR 形式）のバイナリで書き出し、mmap で必要な頂点だけを読み込める
+# CreatedDate: 2026年10月19日
+# LastUpdate: 2026年10月19日
+# Version:0.2
+#
+# 《License》
+# Copyright (c) 2025 Naruse
+# Released under the MIT license
+# https://opensource.org/licenses/mit-license.php
+# --------------------------------------------------------------------------
+
+import maya.cmds as cmds
+import maya.mel as mel
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+import numpy as np
+
+WINDOW_NAME = "SkinWeightEngineUI"
+WEIGHT_EPSILON = 1e-9  # これ以下の合計は 0 とみなす
+
+WEIGHT_FILE_FILTER = "Skin Weights (*.skw)"
+WEIGHT_FILE_MAGIC = b"SKWT"
+WEIGHT_FILE_VERSION = 1
+# マジック, バージョン, 予約, 頂点数, インフルエンス数, 非ゼロ要素数
+WEIGHT_FILE_HEADER = struct.Struct("<4sHHIIQ")
+IMPORT_CHUNK_ROWS = 65536  # 読み込み時に 1 回で密行列に展開する頂点数
+WRITE_CHUNK_VALUES = 1 << 20  # setWeights 1 回で渡す値の数（MDoubleArray に変換する一時リストの大きさを抑える）
+
+
+# ---------------------------------------------------------------------------
+# Undo 対応の API 書き込み
+# MFnSkinCluster.setWeights など API による変更は Maya の Undo キューに入らないため、
+# リポジトリの plugin/mayaUtilitiesApiUndo にある小さな MPxCommand プラグイン経由で実行する（Ctrl+Z / Ctrl+Y で戻せる）
+# ---------------------------------------------------------------------------
+API_UNDO_PLUGIN = "mayaUtilitiesApiUndo"
+API_UNDO_SHARED = "mayaUtilitiesApiUndoShared"  # プラグインが run_undoable / call_without_undo を公開するモジュール名
+
+
+# プラグインを読み込み、共有モジュールを返す
+# MAYA_PLUG_IN_PATH に無い場合は、このスクリプトと同じリポジトリの plugin フォルダから読み込む
+def api_undo():
+    if not cmds.pluginInfo(API_UNDO_PLUGIN, query=True, loaded=True):
+        try:
+            cmds.loadPlugin(API_UNDO_PLUGIN, quiet=True)
+        except RuntimeError:
+            if "__file__" not in globals():
+                raise
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cmds.loadPlugin(os.path.join(root, "plugin", API_UNDO_PLUGIN, API_UNDO_PLUGIN + ".py"), quiet=True)
+    return sys.modules[API_UNDO_SHARED]
+
+
+# do_it を Undo 可能なコマンドとして実行する（Undo で undo_it、Redo で redo_it（省略時は do_it）を呼ぶ）
+def run_undoable(do_it, undo_it, redo_it=None):
+    api_undo().run_undoable(do_it, undo_it, redo_it)
+
+
+# ---------------------------------------------------------------------------
+# ウェイト演算（Maya に依存しない）
+# weights は (頂点数, インフルエンス数) の配列で、結果は新しい配列として返す
+# locked はロックされたインフルエンス（lockInfluenceWeights）の列のマスクで、その列の値は変更しない
+# ---------------------------------------------------------------------------
+def normalize_rows(weights, locked=None):
+    """各行の合計を 1 にする（合計が 0 の行はそのまま）。ロックされた列は変えず、残りの列で 1 に合わせる"""
+    if locked is None or not locked.any():
+        totals = weights.sum(axis=1, keepdims=True)
+        return np.divide(weights, totals, out=weights.copy(), where=totals > WEIGHT_EPSILON)
+
+    free = ~locked
+    free_total = weights[:, free].sum(axis=1)
+    target = np.clip(1.0 - weights[:, locked].sum(axis=1), 0.0, None)
+    scale = np.divide(target, free_total, out=np.ones_like(target), where=free_total > WEIGHT_EPSILON)
+    result = weights.copy()
+    result[:, free] *= scale[:, None]
+    return result
+
+
+def redistribute(weights, column, target, locked=None):
+    """column を target（行ごとの値）にし、残り 1 - target を他のインフルエンスへ比率を保って配分する
+    ロックされた列には配分せず、target はロックされた列の合計を除いた残りまでに制限する"""
+    others = np.ones(weights.shape[1], dtype=bool) if locked is None else ~locked
+    others[column] = False
+    fixed = np.zeros(weights.shape[1], dtype=bool) if locked is None else locked.copy()
+    fixed[column] = False
+
+    result = weights.copy()
+    available = np.clip(1.0 - weights[:, fixed].sum(axis=1), 0.0, None)
+    target = np.minimum(target, available)
+    others_total = weights[:, others].sum(axis=1)
+    remaining = available - target
+    scale = np.divide(remaining, others_total, out=np.zeros_like(remaining), where=others_total > WEIGHT_EPSILON)
+    result[:, others] *= scale[:, None]
+    result[:, column] = target
+    # 配分先が無い行は合計を 1 に保つため指定インフルエンスに残りをすべて残す
+    no_others = others_total <= WEIGHT_EPSILON
+    result[no_others, column] = available[no_others]
+    return result
+
+
+def set_influence_weight(weights, column, value, locked=None):
+    """指定インフルエンスのウェイトを value にする"""
+    target = np.full(len(weights), float(np.clip(value, 0.0, 1.0)))
+    return redistribute(weights, column, target, locked)
+
+
+def scale_influence_weight(weights, column, factor, locked=None):
+    """指定インフルエンスのウェイトを factor 倍する（0 ～ 1 にクランプ）"""
+    target = np.clip(weights[:, column] * float(factor), 0.0, 1.0)
+    return redistribute(weights, column, target, locked)
+
+
+def unlocked_ranking(weights, locked):
+    """大きい順に選ぶための値（ロックされた列は選ばれないよう -inf にする）"""
+    return weights if locked is None else np.where(locked, -np.inf, weights)
+
+
+def prune_weights(weights, threshold, locked=None):
+    """threshold 未満のウェイトを 0 にして正規化する（各行のロックされていない最大のウェイトとロックされた列は必ず残す）"""
+    keep = weights >= threshold
+    keep[np.arange(len(weights)), np.argmax(unlocked_ranking(weights, locked), axis=1)] = True
+    if locked is not None:
+        keep[:, locked] = True
+    return normalize_rows(np.where(keep, weights, 0.0), locked)
+
+
+def limit_influences(weights, max_count, locked=None):
+    """各行のロックされていないウェイトを大きい順に max_count 個だけ残して正規化する（ロックされた列は数に関係なく残す）"""
+    max_count = min(max(1, int(max_count)), weights.shape[1] - (0 if locked is None else int(locked.sum())))
+    if max_count >= weights.shape[1] or max_count < 1:
+        return normalize_rows(weights, locked)
+    top = np.argpartition(-unlocked_ranking(weights, locked), max_count - 1, axis=1)[:, :max_count]
+    keep = np.zeros(weights.shape, dtype=bool)
+    keep[np.arange(len(weights))[:, None], top] = True
+    if locked is not None:
+        keep[:, locked] = True
+    return normalize_rows(np.where(keep, weights, 0.0), locked)
+
+
+def benchmark_weight_operations(vertex_count=500000, influence_count=100, active_count=8, skin_cluster=None):
+    """各演算の速度を計測する（Maya 不要。各頂点に active_count 個のインフルエンスを持たせる）
+    skin_cluster を指定した場合は、その skinCluster の読み込み（getWeights）と書き込み（setWeights）も計測する"""
+    rng = np.random.default_rng(0)
+    weights = np.zeros((vertex_count, influence_count))
+    rows = np.arange(vertex_count)[:, None]
+    weights[rows, rng.integers(0, influence_count, (vertex_count, active_count))] = rng.random((vertex_count, active_count))
+    weights = normalize_rows(weights)
+
+    operations = [
+        ("設定", lambda w: set_influence_weight(w, 0, 0.5)),
+        ("スケール", lambda w: scale_influence_weight(w, 0, 1.5)),
+        ("正規化", normalize_rows),
+        ("しきい値以下を削除", lambda w: prune_weights(w, 0.05)),
+        ("最大インフルエンス数", lambda w: limit_influences(w, 4)),
+    ]
+    for label, operation in operations:
+        start = time.perf_counter()
+        operation(weights)
+        print(f"{label}: {vertex_count:,} 頂点 × {influence_count} インフルエンス / {time.perf_counter() - start:.3f} 秒")
+
+    if skin_cluster is None:
+        return
+    weight_matrix = get_weight_matrix(skin_cluster)
+    start = time.perf_counter()
+    weight_matrix.read()
+    vertex_count, influence_count = weight_matrix.weights.shape
+    print(f"読み込み: {vertex_count:,} 頂点 × {influence_count} インフルエンス / {time.perf_counter() - start:.3f} 秒")
+
+    # 先頭のインフルエンスをスケールした結果を書き込み、計測後に元の値へ戻す（Undo には記録しない）
+    edit = weight_matrix.diff(np.arange(vertex_count), scale_influence_weight(weight_matrix.weights, 0, 1.5))
+    if edit is None:
+        print("書き込み: 先頭のインフルエンスにウェイトが無いため計測しません。")
+        return
+    rows, columns, index, old_values, new_values = edit
+    start = time.perf_counter()
+    weight_matrix.write_columns(rows, columns, index, new_values)
+    elapsed = time.perf_counter() - start
+    weight_matrix.write_columns(rows, columns, index, old_values)
+    print(f"書き込み: {len(rows):,} 頂点 × {len(columns)} インフルエンス（変更 {len(index):,} 要素）/ {elapsed:.3f} 秒")
+
+
+# ---------------------------------------------------------------------------
+# ウェイトファイル（CSR 形式のバイナリ）
+# ヘッダー / インフルエンス名の表（長さ uint16 + UTF-8）/ 8 バイト境界まで詰め物 /
+# 頂点ごとの開始位置 int64 (頂点数 + 1) / インフルエンス番号 uint16 / 4 バイト境界まで詰め物 / ウェイト float32
+# 頂点 v のウェイトは [offsets[v], offsets[v + 1]) の範囲にある。0 のウェイトは保存しない
+# ---------------------------------------------------------------------------
+def padding(position, alignment):
+    return b"\0" * (-position % alignment)
+
+
+def write_weight_file(path, influences, weights):
+    """(頂点数, インフルエンス数) のウェイトを疎行列として書き出し、ファイルサイズを返す"""
+    if len(influences) > np.iinfo(np.uint16).max:
+        raise ValueError("インフルエンス数が多すぎます。")
+    rows, columns = np.nonzero(weights > 0.0)
+    counts = np.bincount(rows, minlength=len(weights))
+    offsets = np.zeros(len(weights) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    with open(path, "wb") as f:
+        f.write(WEIGHT_FILE_HEADER.pack(
+            WEIGHT_FILE_MAGIC, WEIGHT_FILE_VERSION, 0, len(weights), len(influences), len(rows)
+        ))
+        for name in influences:
+            encoded = name.encode("utf-8")
+            f.write(struct.pack("<H", len(encoded)) + encoded)
+        f.write(padding(f.tell(), 8))
+        offsets.tofile(f)
+        columns.astype(np.uint16).tofile(f)
+        f.write(padding(f.tell(), 4))
+        weights[rows, columns].astype(np.float32).tofile(f)
+        return f.tell()
+
+
+class WeightFile:
+    """ウェイトファイルを mmap で開く。配列はファイルのビューなので、参照した頂点の範囲だけが読み込まれる"""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self.vertex_count, influence_count, nonzero = WEIGHT_FILE_HEADER.unpack_from(self.buffer, 0)
+        if magic != WEIGHT_FILE_MAGIC or version != WEIGHT_FILE_VERSION:
+            self.close()
+            raise ValueError(f"{path} はウェイトファイルではないか、未対応のバージョンです。")
+
+        position = WEIGHT_FILE_HEADER.size
+        self.influences = []
+        for _ in range(influence_count):
+            (length,) = struct.unpack_from("<H", self.buffer, position)
+            position += 2
+            self.influences.append(self.buffer[position:position + length].decode("utf-8"))
+            position += length
+        position += -position % 8
+        self.offsets = np.frombuffer(self.buffer, dtype=np.int64, count=self.vertex_count + 1, offset=position)
+        position += self.offsets.nbytes
+        self.indices = np.frombuffer(self.buffer, dtype=np.uint16, count=nonzero, offset=position)
+        position += self.indices.nbytes
+        position += -position % 4
+        self.values = np.frombuffer(self.buffer, dtype=np.float32, count=nonzero, offset=position)
+
+    def close(self):
+        # ビューを破棄してから mmap を閉じる
+        self.offsets = self.indices = self.values = None
+        self.buffer.close()
+        self.file.close()
+
+    def rows(self, vertex_ids, columns=None, column_count=None):
+        """vertex_ids の行を密行列で返す。columns はファイルのインフルエンス番号 -> 出力の列番号（-1 は捨てる）
+        複数のインフルエンスが同じ列に対応する場合は合計する"""
+        vertex_ids = np.asarray(vertex_ids, dtype=np.int64)
+        starts = self.offsets[vertex_ids]
+        lengths = self.offsets[vertex_ids + 1] - starts
+        total = int(lengths.sum())
+        # 各要素のファイル上の位置 = 行の開始位置 + 行内の番号
+        row_of = np.repeat(np.arange(len(vertex_ids)), lengths)
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        indices = self.indices[positions].astype(np.int64)
+        values = self.values[positions].astype(np.float64)
+
+        if columns is None:
+            result = np.zeros((len(vertex_ids), len(self.influences)))
+            result[row_of, indices] = values
+            return result
+
+        indices = columns[indices]
+        keep = indices >= 0
+        flat = row_of[keep] * column_count + indices[keep]
+        return np.bincount(flat, weights=values[keep], minlength=len(vertex_ids) * column_count).reshape(-1, column_count)
+
+
+def benchmark_weight_file(vertex_count=1000000, influence_count=100, active_count=4, partial_count=10000):
+    """書き出し・全体読み込み・一部の頂点の読み込みの速度を計測する（Maya 不要）"""
+    rng = np.random.default_rng(0)
+    weights = np.zeros((vertex_count, influence_count))
+    rows = np.arange(vertex_count)[:, None]
+    weights[rows, rng.integers(0, influence_count, (vertex_count, active_count))] = rng.random((vertex_count, active_count))
+    weights = normalize_rows(weights)
+    influences = [f"joint{i}" for i in range(influence_count)]
+
+    path = os.path.join(tempfile.gettempdir(), "skin_weight_benchmark.skw")
+    try:
+        start = time.perf_counter()
+        size = write_weight_file(path, influences, weights)
+        print(f"書き出し: {time.perf_counter() - start:.2f} 秒 / {size / 1024 / 1024:.1f} MB")
+
+        start = time.perf_counter()
+        weight_file = WeightFile(path)
+        restored = weight_file.rows(np.arange(vertex_count))
+        print(f"全体の読み込み: {time.perf_counter() - start:.2f} 秒（最大誤差 {np.abs(restored - weights).max():.2e}）")
+
+        start = time.perf_counter()
+        weight_file.rows(np.sort(rng.choice(vertex_count, partial_count, replace=False)))
+        print(f"{partial_count} 頂点の読み込み: {time.perf_counter() - start:.3f} 秒")
+        del restored
+        weight_file.close()
+    finally:
+        os.remove(path)
+
+
+# ---------------------------------------------------------------------------
+# ウェイト行列のキャッシュ
+# skinCluster ごとに全頂点のウェイトを 1 回だけ読み込み、以降はメモリ上の行列を編集する。
+# ペイントなど外部でウェイトやインフルエンスが変わった場合はコールバックで古いと判断して読み直す。
+# シーンの新規作成・読み込みの前にキャッシュを破棄し、削除・作り直されたノードは MObjectHandle で検出する。
+# 書き込みは Undo 可能なコマンドとして行う（変更前と変更後の値を保持する）。
+# ---------------------------------------------------------------------------
+class SkinWeightMatrix:
+    def __init__(self, skin_cluster):
+        self.skin_cluster = skin_cluster
+        selection = om.MSelectionList()
+        selection.add(skin_cluster)
+        self.skin_object = selection.getDependNode(0)
+        self.handle = om.MObjectHandle(self.skin_object)
+        self.skin_fn = oma.MFnSkinCluster(self.skin_object)
+        self.dag_path = None     # 変形結果のメッシュ
+        self.influences = []     # インフルエンス名（getWeights の列の順）
+        self.weights = None      # (頂点数, インフルエンス数) の配列
+        self.stale = True
+        self.writing = False     # 自分の書き込みによるコールバックは無視する
+        self.callback_ids = [
+            om.MNodeMessage.addAttributeChangedCallback(self.skin_object, self._on_attribute_changed)
+        ]
+
+    def _on_attribute_changed(self, message, plug, other_plug, *args):
+        if self.writing:
+            return
+        # ウェイトの変更、またはインフルエンスの追加・削除（matrix の接続）があれば読み直す
+        if om.MFnAttribute(plug.attribute()).name in ("weights", "weightList", "matrix"):
+            self.stale = True
+
+    def is_valid(self):
+        """ノードが生きていて、名前が同じ skinCluster を指しているか"""
+        return (self.handle.isValid() and self.handle.isAlive()
+                and om.MFnDependencyNode(self.skin_object).name() == self.skin_cluster)
+
+    def remove_callbacks(self):
+        for callback_id in self.callback_ids:
+            om.MMessage.removeCallback(callback_id)
+        self.callback_ids = []
+
+    def _component(self, rows=None):
+        component_fn = om.MFnSingleIndexedComponent()
+        component = component_fn.create(om.MFn.kMeshVertComponent)
+        if rows is None:
+            component_fn.setCompleteData(om.MFnMesh(self.dag_path).numVertices)
+        else:
+            component_fn.addElements(rows.tolist())
+        return component
+
+    def read(self):
+        self.dag_path = self.skin_fn.getPathAtIndex(0)
+        self.influences = [path.partialPathName() for path in self.skin_fn.influenceObjects()]
+        values, influence_count = self.skin_fn.getWeights(self.dag_path, self._component())
+        self.weights = np.fromiter(values, dtype=np.float64, count=len(values)).reshape(-1, influence_count)
+        self.stale = False
+
+    def matrix(self):
+        """最新のウェイト行列（古い場合やトポロジーが変わった場合は読み直す）"""
+        if self.stale or self.weights is None or len(self.weights) != om.MFnMesh(self.dag_path).numVertices:
+            self.read()
+        return self.weights
+
+    def locked_columns(self):
+        """lockInfluenceWeights がオンのインフルエンスの列のマスク"""
+        return np.array([
+            cmds.attributeQuery("lockInfluenceWeights", node=influence, exists=True)
+            and bool(cmds.getAttr(f"{influence}.lockInfluenceWeights"))
+            for influence in self.influences
+        ], dtype=bool)
+
+    def diff(self, rows, new_weights):
+        """rows の行を new_weights にするための変更 (行, 列, 位置, 変更前の値, 変更後の値) を返す（変更が無ければ None）
+        行と列は値が変わったものだけに絞り、値は (行, 列) のブロック内で変わった要素（平坦化した位置）だけを持つ"""
+        old_weights = self.weights[rows]
+        changed = new_weights != old_weights
+        changed_rows = np.flatnonzero(changed.any(axis=1))
+        if not changed_rows.size:
+            return None
+        columns = np.flatnonzero(changed[changed_rows].any(axis=0))
+        index = np.flatnonzero(changed[changed_rows[:, None], columns])
+        block_rows, block_columns = np.divmod(index, len(columns))
+        source_rows, source_columns = changed_rows[block_rows], columns[block_columns]
+        return (rows[changed_rows], columns, index,
+                old_weights[source_rows, source_columns], new_weights[source_rows, source_columns])
+
+    def write_columns(self, rows, columns, index, values):
+        """rows × columns のブロックのうち index の要素を values にして書き込む（他の要素はキャッシュの値のまま）"""
+        # MDoubleArray は NumPy の配列から直接作れないため、一時リストが大きくならないよう行を分けて書き込む
+        chunk_rows = max(1, WRITE_CHUNK_VALUES // len(columns))
+        influence_indices = om.MIntArray(columns.tolist())
+        self.writing = True
+        try:
+            for chunk_start in range(0, len(rows), chunk_rows):
+                chunk = rows[chunk_start:chunk_start + chunk_rows]
+                first, last = np.searchsorted(index, [chunk_start * len(columns), (chunk_start + len(chunk)) * len(columns)])
+                block = self.weights[np.ix_(chunk, columns)]
+                block.flat[index[first:last] - chunk_start * len(columns)] = values[first:last]
+                self.skin_fn.setWeights(
+                    self.dag_path, self._component(chunk),
+                    influence_indices, om.MDoubleArray(block.ravel().tolist()), False
+                )
+                self.weights[np.ix_(chunk, columns)] = block
+        finally:
+            self.writing = False
+
+
+weight_matrices = {}    # skinCluster -> SkinWeightMatrix
+scene_callback_ids = []  # シーンの新規作成・読み込み前にキャッシュを破棄するコールバック
+
+
+def get_weight_matrix(skin_cluster):
+    weight_matrix = weight_matrices.get(skin_cluster)
+    if weight_matrix is not None and not weight_matrix.is_valid():
+        # 削除された、または同じ名前の別のノードに置き換わった
+        weight_matrix.remove_callbacks()
+        weight_matrix = None
+    if weight_matrix is None:
+        weight_matrix = weight_matrices[skin_cluster] = SkinWeightMatrix(skin_cluster)
+    return weight_matrix
+
+
+def write_weight_edits(edits):
+    """edits: [(SkinWeightMatrix, 行, 列, 位置, 変更前の値, 変更後の値)] を 1 回の Undo で戻せるように書き込む"""
+    def do_it():
+        for weight_matrix, rows, columns, index, _, new_values in edits:
+            weight_matrix.matrix()
+            weight_matrix.write_columns(rows, columns, index, new_values)
+
+    def undo_it():
+        for weight_matrix, rows, columns, index, old_values, _ in reversed(edits):
+            weight_matrix.matrix()
+            weight_matrix.write_columns(rows, columns, index, old_values)
+
+    run_undoable(do_it, undo_it)
+
+
+def clear_weight_matrices(*args):
+    # コールバックを解除してキャッシュを破棄する
+    for weight_matrix in weight_matrices.values():
+        weight_matrix.remove_callbacks()
+    weight_matrices.clear()
+
+
+def register_scene_callbacks():
+    if scene_callback_ids:
+        return
+    for message in (om.MSceneMessage.kBeforeNew, om.MSceneMessage.kBeforeOpen):
+        scene_callback_ids.append(om.MSceneMessage.addCallback(message, clear_weight_matrices))
+
+
+def release_weight_matrices(*args):
+    # ウィンドウを閉じたらコールバックを解除してキャッシュを破棄する
+    for callback_id in scene_callback_ids:
+        om.MMessage.removeCallback(callback_id)
+    del scene_callback_ids[:]
+    clear_weight_matrices()
+
+
+def reload_weight_matrices():
+    for weight_matrix in weight_matrices.values():
+        weight_matrix.stale = True
+    print("ウェイトを次回の編集時に読み直します。")
+
+
+def skin_cluster_of(mesh):
+    return mel.eval(f'findRelatedSkinCluster "{mesh}"') or None
+
+
+def selected_skin_vertices():
+    """選択（オブジェクト・頂点・エッジ・フェース）を skinCluster ごとの頂点番号にまとめる"""
+    selection = cmds.ls(sl=True)
+    if not selection:
+        return []
+    vertices = cmds.polyListComponentConversion(selection, toVertex=True) or []
+    if not vertices:
+        return []
+
+    selection_list = om.MSelectionList()
+    for vertex in vertices:
+        selection_list.add(vertex)
+
+    rows_by_skin = {}
+    iterator = om.MItSelectionList(selection_list, om.MFn.kMeshVertComponent)
+    while not iterator.isDone():
+        shape_path, component = iterator.getComponent()
+        transform_path = om.MDagPath(shape_path)
+        if transform_path.node().hasFn(om.MFn.kMesh):
+            transform_path.pop()
+        skin_cluster = skin_cluster_of(transform_path.partialPathName())
+        if skin_cluster:
+            rows_by_skin.setdefault(skin_cluster, []).extend(om.MFnSingleIndexedComponent(component).getElements())
+        else:
+            cmds.warning(f"{transform_path.partialPathName()} に skinCluster がありません。")
+        iterator.next()
+
+    return [(get_weight_matrix(skin), np.unique(np.array(rows, dtype=np.int64))) for skin, rows in rows_by_skin.items()]
+
+
+# ---------------------------------------------------------------------------
+# 選択頂点への一括編集
+# operation(weights, weight_matrix) は選択行のウェイトを受け取り新しいウェイトを返す（対象外なら None）
+# ---------------------------------------------------------------------------
+def edit_selected_weights(label, operation):
+    targets = selected_skin_vertices()
+    if not targets:
+        cmds.warning("スキンの付いたメッシュ、または頂点を選択してください。")
+        return
+
+    start = time.perf_counter()
+    edits = []
+    vertex_count = 0
+    for weight_matrix, rows in targets:
+        current = weight_matrix.matrix()[rows]
+        new_weights = operation(current, weight_matrix)
+        if new_weights is None:
+            continue
+        edit = weight_matrix.diff(rows, new_weights)
+        if edit is not None:
+            edits.append((weight_matrix,) + edit)
+            vertex_count += len(edit[0])
+
+    if not edits:
+        print(f"{label}: 変更はありませんでした。")
+        return
+    write_weight_edits(edits)
+    print(f"{label}: {len(edits)} skinCluster / {vertex_count} 頂点を更新しました（{time.perf_counter() - start:.3f} 秒）")
+
+
+def influence_column(weight_matrix, influence):
+    if influence not in weight_matrix.influences:
+        cmds.warning(f"{weight_matrix.skin_cluster} にインフルエンス {influence} がありません。")
+        return None
+    return weight_matrix.influences.index(influence)
+
+
+def unlocked_influence_column(weight_matrix, influence):
+    """influence の列番号とロックされた列のマスク（インフルエンスが無いかロックされていれば列番号は None）"""
+    column = influence_column(weight_matrix, influence)
+    locked = weight_matrix.locked_columns()
+    if column is not None and locked[column]:
+        cmds.warning(f"{influence} はロックされているため変更しません。")
+        column = None
+    return column, locked
+
+
+def set_selected_weight(influence, value):
+    def operation(weights, weight_matrix):
+        column, locked = unlocked_influence_column(weight_matrix, influence)
+        return None if column is None else set_influence_weight(weights, column, value, locked)
+    edit_selected_weights(f"{influence} を {value} に設定", operation)
+
+
+def scale_selected_weight(influence, factor):
+    def operation(weights, weight_matrix):
+        column, locked = unlocked_influence_column(weight_matrix, influence)
+        return None if column is None else scale_influence_weight(weights, column, factor, locked)
+    edit_selected_weights(f"{influence} を {factor} 倍", operation)
+
+
+def normalize_selected_weights():
+    edit_selected_weights("正規化", lambda weights, weight_matrix: normalize_rows(weights, weight_matrix.locked_columns()))
+
+
+def prune_selected_weights(threshold):
+    edit_selected_weights(f"{threshold} 未満を削除",
+                          lambda weights, weight_matrix: prune_weights(weights, threshold, weight_matrix.locked_columns()))
+
+
+def limit_selected_influences(max_count):
+    edit_selected_weights(f"最大インフルエンス数 {max_count}",
+                          lambda weights, weight_matrix: limit_influences(weights, max_count, weight_matrix.locked_columns()))
+
+
+def paint_tool_influence():
+    """Paint Skin Weights Tool で選択中のインフルエンス（ツールが有効でなければ None）"""
+    context = cmds.currentCtx()
+    if cmds.contextInfo(context, c=True) != "artAttrSkin":
+        return None
+    return cmds.artAttrSkinPaintCtx(context, q=True, influence=True) or None
+
+
+def skin_weight_engine_set(value):
+    """SkinValueTool から呼ばれる。ペイントツールのインフルエンス（無ければ UI の選択）に value を設定する"""
+    influence = paint_tool_influence()
+    if not influence and cmds.textScrollList("skinWeightEngineInfluences", exists=True):
+        influence = (cmds.textScrollList("skinWeightEngineInfluences", q=True, selectItem=True) or [None])[0]
+    if not influence:
+        cmds.warning("インフルエンスが選択されていません。")
+        return
+    set_selected_weight(influence, value)
+
+
+# ---------------------------------------------------------------------------
+# ウェイトの書き出し・読み込み
+# ---------------------------------------------------------------------------
+def short_name(name):
+    return name.rsplit("|", 1)[-1].rsplit(":", 1)[-1]
+
+
+def influence_columns(file_influences, skin_influences):
+    """ファイルのインフルエンス番号 -> skinCluster の列番号（名前、次にネームスペースを除いた名前で対応付け。無ければ -1）"""
+    by_name = {name: column for column, name in enumerate(skin_influences)}
+    by_short = {short_name(name): column for column, name in enumerate(skin_influences)}
+    return np.array([by_name.get(name, by_short.get(short_name(name), -1)) for name in file_influences], dtype=np.int64)
+
+
+def shared_columns(file_influences, columns, skin_influences):
+    """同じ列に対応付けられたファイルのインフルエンス {skinCluster のインフルエンス: [ファイルのインフルエンス]}"""
+    shared = {}
+    for name, column in zip(file_influences, columns.tolist()):
+        if column >= 0:
+            shared.setdefault(skin_influences[column], []).append(name)
+    return {influence: names for influence, names in shared.items() if len(names) > 1}
+
+
+def export_path_for(path, weight_matrix, count):
+    """複数の skinCluster を書き出す場合は、ファイル名に skinCluster 名を付けて分ける"""
+    if count == 1:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}_{short_name(weight_matrix.skin_cluster)}{extension or '.skw'}"
+
+
+def export_skin_weights(path=None):
+    """選択メッシュの skinCluster の全頂点のウェイトを書き出す（複数ある場合は skinCluster ごとのファイルに分ける）"""
+    targets = selected_skin_vertices()
+    if not targets:
+        cmds.warning("スキンの付いたメッシュを選択してください。")
+        return
+    if path is None:
+        paths = cmds.fileDialog2(fileFilter=WEIGHT_FILE_FILTER, dialogStyle=2, fileMode=0)
+        if not paths:
+            return
+        path = paths[0]
+
+    for weight_matrix, _ in targets:
+        target_path = export_path_for(path, weight_matrix, len(targets))
+        start = time.perf_counter()
+        size = write_weight_file(target_path, weight_matrix.influences, weight_matrix.matrix())
+        print(f"{weight_matrix.skin_cluster} のウェイトを書き出しました: {target_path}"
+              f"（{len(weight_matrix.weights)} 頂点, {size / 1024 / 1024:.1f} MB, {time.perf_counter() - start:.2f} 秒）")
+
+
+def import_skin_weights(path=None, selected_only=True, allow_vertex_mismatch=False):
+    """ウェイトファイルを選択メッシュへ読み込む（selected_only なら選択頂点の行だけを読む）
+    頂点数がファイルと異なるメッシュがあれば読み込まない（allow_vertex_mismatch なら共通する頂点番号のみ読み込む）
+    ロックされたインフルエンスのウェイトは変えず、残りのインフルエンスで正規化する"""
+    if path is None:
+        paths = cmds.fileDialog2(fileFilter=WEIGHT_FILE_FILTER, dialogStyle=2, fileMode=1)
+        if not paths:
+            return
+        path = paths[0]
+
+    targets = selected_skin_vertices()
+    if not targets:
+        cmds.warning("スキンの付いたメッシュ、または頂点を選択してください。")
+        return
+
+    start = time.perf_counter()
+    try:
+        weight_file = WeightFile(path)
+    except ValueError as e:
+        cmds.warning(str(e))
+        return
+
+    # 頂点番号の対応が取れないため、頂点数が異なる場合は明示的に許可されたときだけ読み込む
+    mismatched = [weight_matrix for weight_matrix, _ in targets if len(weight_matrix.matrix()) != weight_file.vertex_count]
+    if mismatched and not allow_vertex_mismatch:
+        weight_file.close()
+        for weight_matrix in mismatched:
+            cmds.warning(f"{weight_matrix.skin_cluster} の頂点数 ({len(weight_matrix.weights)}) がファイル"
+                         f" ({weight_file.vertex_count}) と異なります。")
+        cmds.warning("頂点数が異なるため読み込みを中止しました。共通する頂点番号で読み込む場合はオプションを有効にしてください。")
+        return
+
+    edits = []
+    try:
+        for weight_matrix, rows in targets:
+            weights = weight_matrix.matrix()
+            if not selected_only:
+                rows = np.arange(len(weights))
+            if len(weights) != weight_file.vertex_count:
+                cmds.warning(f"{weight_matrix.skin_cluster} の頂点数 ({len(weights)}) がファイル"
+                             f" ({weight_file.vertex_count}) と異なります。共通する頂点番号のみ読み込みます。")
+                rows = rows[rows < weight_file.vertex_count]
+            locked = weight_matrix.locked_columns()
+
+            columns = influence_columns(weight_file.influences, weight_matrix.influences)
+            missing = [name for name, column in zip(weight_file.influences, columns) if column < 0]
+            if missing:
+                cmds.warning(f"{weight_matrix.skin_cluster} に無いインフルエンスは無視します: {', '.join(missing)}")
+            for influence, names in shared_columns(weight_file.influences, columns, weight_matrix.influences).items():
+                cmds.warning(f"{', '.join(names)} はいずれも {weight_matrix.skin_cluster} の {influence} に対応するため、ウェイトを合計します。")
+
+            for chunk_start in range(0, len(rows), IMPORT_CHUNK_ROWS):
+                chunk = rows[chunk_start:chunk_start + IMPORT_CHUNK_ROWS]
+                loaded = weight_file.rows(chunk, columns, len(weight_matrix.influences))
+                # 対応するインフルエンスが 1 つも無い頂点は現在のウェイトを残す
+                empty = loaded.sum(axis=1) <= WEIGHT_EPSILON
+                loaded[empty] = weights[chunk[empty]]
+                # ロックされたインフルエンスは現在のウェイトのまま、残りの列で 1 に合わせる
+                loaded[:, locked] = weights[chunk][:, locked]
+                edit = weight_matrix.diff(chunk, normalize_rows(loaded, locked))
+                if edit is not None:
+                    edits.append((weight_matrix,) + edit)
+    finally:
+        weight_file.close()
+
+    if edits:
+        write_weight_edits(edits)
+    print(f"ウェイトを読み込みました: {path}（{time.perf_counter() - start:.2f} 秒）")
+
+
+# ---------------------------------------------------------------------------
+# UI
+# ---------------------------------------------------------------------------
+def load_influences(influence_list):
+    targets = selected_skin_vertices()
+    if not targets:
+        cmds.warning("スキンの付いたメッシュを選択してください。")
+        return
+    weight_matrix = targets[0][0]
+    weight_matrix.matrix()
+    cmds.textScrollList(influence_list, e=True, removeAll=True)
+    cmds.textScrollList(influence_list, e=True, append=weight_matrix.influences)
+
+
+def selected_influence(influence_list):
+    influence = (cmds.textScrollList(influence_list, q=True, selectItem=True) or [None])[0]
+    if not influence:
+        cmds.warning("インフルエンスを選択してください。")
+    return influence
+
+
+def build_ui():
+    if cmds.window(WINDOW_NAME, exists=True):
+        cmds.deleteUI(WINDOW_NAME)
+
+    ui = {}
+
+    cmds.window(WINDOW_NAME, title="Skin Weight Engine", widthHeight=(260, 600))
+    cmds.columnLayout(adjustableColumn=True, rowSpacing=6)
+
+    # -------------------------------------------------
+    # インフルエンス
+    # -------------------------------------------------
+    ui["influence_list"] = cmds.textScrollList("skinWeightEngineInfluences", height=160, allowMultiSelection=False)
+    cmds.button(label="選択メッシュのインフルエンスを読み込む",
+                command=lambda *_: load_influences(ui["influence_list"]))
+
+    cmds.separator(style="in")
+
+    # -------------------------------------------------
+    # 設定・スケール
+    # -------------------------------------------------
+    ui["value_slider"] = cmds.floatSliderGrp(label="値", field=True, min=0.0, max=1.0, value=0.5,
+                                             columnWidth3=(40, 50, 150))
+
+    def on_set(*_):
+        influence = selected_influence(ui["influence_list"])
+        if influence:
+            set_selected_weight(influence, cmds.floatSliderGrp(ui["value_slider"], q=True, value=True))
+
+    cmds.button(label="選択頂点に設定", command=on_set)
+
+    cmds.rowLayout(numberOfColumns=2, adjustableColumn=2)
+    ui["scale_field"] = cmds.floatField(value=1.1, minValue=0.0, precision=3, width=60)
+
+    def on_scale(*_):
+        influence = selected_influence(ui["influence_list"])
+        if influence:
+            scale_selected_weight(influence, cmds.floatField(ui["scale_field"], q=True, value=True))
+
+    cmds.button(label="倍にスケール", command=on_scale)
+    cmds.setParent("..")
+
+    cmds.separator(style="in")
+
+    # -------------------------------------------------
+    # 正規化・削除・制限
+    # -------------------------------------------------
+    cmds.button(label="正規化", command=lambda *_: normalize_selected_weights())
+
+    cmds.rowLayout(numberOfColumns=2, adjustableColumn=2)
+    ui["prune_field"] = cmds.floatField(value=0.01, minValue=0.0, maxValue=1.0, precision=3, width=60)
+    cmds.button(label="未満のウェイトを削除",
+                command=lambda *_: prune_selected_weights(cmds.floatField(ui["prune_field"], q=True, value=True)))
+    cmds.setParent("..")
+
+    cmds.rowLayout(numberOfColumns=2, adjustableColumn=2)
+    ui["max_field"] = cmds.intField(value=4, minValue=1, width=60)
+    cmds.button(label="個までにインフルエンスを制限",
+                command=lambda *_: limit_selected_influences(cmds.intField(ui["max_field"], q=True, value=True)))
+    cmds.setParent("..")
+
+    cmds.separator(style="in")
+
+    # -------------------------------------------------
+    # 書き出し・読み込み
+    # -------------------------------------------------
+    cmds.button(label="ウェイトを書き出し", command=lambda *_: export_skin_weights())
+    ui["selected_only_cb"] = cmds.checkBox(label="選択頂点のみ読み込む", value=True)
+    ui["vertex_mismatch_cb"] = cmds.checkBox(label="頂点数が異なる場合も共通する頂点番号で読み込む", value=False)
+    cmds.button(label="ウェイトを読み込み",
+                command=lambda *_: import_skin_weights(
+                    selected_only=cmds.checkBox(ui["selected_only_cb"], q=True, value=True),
+                    allow_vertex_mismatch=cmds.checkBox(ui["vertex_mismatch_cb"], q=True, value=True)))
+
+    cmds.separator(style="in")
+
+    cmds.button(label="ウェイトを再読み込み", command=lambda *_: reload_weight_matrices())
+
+    # シーンを開き直したらキャッシュを破棄し、ウィンドウを閉じたらコールバックを解除する
+    register_scene_callbacks()
+    cmds.scriptJob(uiDeleted=[WINDOW_NAME, release_weight_matrices], runOnce=True)
+
+    cmds.showWindow(WINDOW_NAME)
+
+build_ui()
@@ -2,9 +2,14 @@
 # ScriptName: Vertex Snapper
 # Author: Naruse,GPT-5,GPT-4o
 # Contents: 複数の頂点を同時にスナップ移動できるスクリプト
+#           頂点の記録は選択の差分のみを処理し、座標はメッシュ単位でまとめて取得する
+#           ソースとターゲットの頂点セットを最近傍で自動的にペアにしてスナップすることも可能
+#           スナップはメッシュごとに座標をまとめて書き込み、マージもメッシュごとに 1 回で行う
+#           複数メッシュの境界頂点を一括で溶接することも可能
+#           軸を指定した対称スナップ（対応表はトポロジーごとにキャッシュ）にも対応
 # CreatedDate: 2024年12月23日
-# LastUpdate: 2025年11月24日
-# Version:0.2
+# LastUpdate: 2026年10月19日
+# Version:0.7
 #
 # 《License》
 # Copyright (c) 2025 Naruse
@@ -14,9 +19,114 @@
 
 import maya.cmds as cmds
 import maya.api.OpenMaya as om
+import hashlib
+import os
+import sys
+import time
+import numpy as np
+
+BULK_READ_THRESHOLD = 64  # 追加された頂点がこれを超えるメッシュは getPoints でまとめて読む
+DEFAULT_SEARCH_TOLERANCE = 0.01  # 許容範囲が無効なときに頂点の検索に使う距離
+
+
+# ---------------------------------------------------------------------------
+# Undo 対応の API 書き込み
+# MFnMesh.setPoints など API による変更は Maya の Undo キューに入らないため、
+# リポジトリの plugin/mayaUtilitiesApiUndo にある小さな MPxCommand プラグイン経由で実行する（Ctrl+Z / Ctrl+Y で戻せる）
+# ---------------------------------------------------------------------------
+API_UNDO_PLUGIN = "mayaUtilitiesApiUndo"
+API_UNDO_SHARED = "mayaUtilitiesApiUndoShared"  # プラグインが run_undoable / call_without_undo を公開するモジュール名
+
+
+# プラグインを読み込み、共有モジュールを返す
+# MAYA_PLUG_IN_PATH に無い場合は、このスクリプトと同じリポジトリの plugin フォルダから読み込む
+def api_undo():
+    if not cmds.pluginInfo(API_UNDO_PLUGIN, query=True, loaded=True):
+        try:
+            cmds.loadPlugin(API_UNDO_PLUGIN, quiet=True)
+        except RuntimeError:
+            if "__file__" not in globals():
+                raise
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            cmds.loadPlugin(os.path.join(root, "plugin", API_UNDO_PLUGIN, API_UNDO_PLUGIN + ".py"), quiet=True)
+    return sys.modules[API_UNDO_SHARED]
+
+
+# do_it を Undo 可能なコマンドとして実行する（Undo で undo_it、Redo で redo_it（省略時は do_it）を呼ぶ）
+def run_undoable(do_it, undo_it, redo_it=None):
+    api_undo().run_undoable(do_it, undo_it, redo_it)
+
+
+# ---------------------------------------------------------------------------
+# 頂点の記録
+# 記録順を保つ辞書（(メッシュ, 頂点番号) -> ワールド座標）を索引として使い、
+# 選択が変わるたびにメッシュごとの頂点番号の差分だけを処理する。
+# ---------------------------------------------------------------------------
+class VertexLog:
+    def __init__(self):
+        self.positions = {}        # (メッシュ, 頂点番号) -> ワールド座標 (x, y, z)（記録順）
+        self.previous = {}         # メッシュ -> 前回の選択に含まれていた頂点番号の集合
+        self.shape_paths = {}      # メッシュ -> シェイプの MDagPath
+
+    def __len__(self):
+        return len(self.positions)
+
+    def clear(self):
+        self.positions.clear()
+        self.previous.clear()
+        self.shape_paths.clear()
+
+    def items(self):
+        """(頂点名, ワールド座標) のリストを記録順に返す"""
+        return [(f"{mesh}.vtx[{index}]", position) for (mesh, index), position in self.positions.items()]
+
+    def selected_indices(self):
+        """現在の選択をメッシュごとの頂点番号の集合として取得する"""
+        selection = om.MGlobal.getActiveSelectionList()
+        iterator = om.MItSelectionList(selection, om.MFn.kMeshVertComponent)
+        current = {}
+        while not iterator.isDone():
+            shape_path, component = iterator.getComponent()
+            if not shape_path.node().hasFn(om.MFn.kMesh):
+                shape_path.extendToShape()
+            transform_path = om.MDagPath(shape_path)
+            transform_path.pop()
+            mesh = transform_path.partialPathName()
+            self.shape_paths[mesh] = shape_path
+            current.setdefault(mesh, set()).update(om.MFnSingleIndexedComponent(component).getElements())
+            iterator.next()
+        return current
+
+    def update(self):
+        """選択の差分から新しい頂点を記録し、追加した数を返す（選択が無ければ None）"""
+        current = self.selected_indices()
+        if not current and om.MGlobal.getActiveSelectionList().isEmpty():
+            return None
+
+        added = 0
+        for mesh, indices in current.items():
+            new_indices = indices - self.previous.get(mesh, set())
+            new_indices = sorted(i for i in new_indices if (mesh, i) not in self.positions)
+            if not new_indices:
+                continue
+
+            fn = om.MFnMesh(self.shape_paths[mesh])
+            if len(new_indices) > BULK_READ_THRESHOLD:
+                points = fn.getPoints(om.MSpace.kWorld)  # メッシュ全体を 1 回で読む
+                for i in new_indices:
+                    point = points[i]
+                    self.positions[(mesh, i)] = (point.x, point.y, point.z)
+            else:
+                for i in new_indices:
+                    point = fn.getPoint(i, om.MSpace.kWorld)
+                    self.positions[(mesh, i)] = (point.x, point.y, point.z)
+            added += len(new_indices)
+        self.previous = current
+        return added
+
 
 # 頂点データを保持するデータ
-vertex_log = []
+vertex_log = VertexLog()
 record_enabled = True  # デフォルトで記録は有効
 
 def log_selected_vertices():
@@ -25,16 +135,9 @@ def log_selected_vertices():
     if not record_enabled:
         return  # 記録が無効なら処理しない
 
-    selection = cmds.ls(selection=True, flatten=True)
-    if not selection:
+    if vertex_log.update() is None:
         print("何も選択されていません。")
         clear_vertex_log()
-        return
-
-    for obj in selection:
-        if ".vtx[" in obj and obj not in [v[0] for v in vertex_log]:  # 頂点であり、未記録の場合のみ処理
-            position = cmds.pointPosition(obj, world=True)
-            vertex_log.append((obj, position))
 
 def snap_and_merge_vertices(tolerance=None, merge_same_object=False):
     """記録された頂点をペアリングしてスナップし、必要に応じてマージする"""
@@ -47,35 +150,59 @@ def snap_and_merge_vertices(tolerance=None, merge_same_object=False):
         cmds.error("偶数個の頂点を選択してください。")
         return
 
-    snap_processed = False
-    merge_processed = False
-
-    for i in range(0, len(vertex_log) - 1, 2):
-        source_vertex, source_position = vertex_log[i]
-        target_vertex, target_position = vertex_log[i + 1]
-
-        source_object = source_vertex.split(".")[0]
-        target_object = target_vertex.split(".")[0]
-
-        if tolerance is not None:
-            source_pos = om.MVector(*source_position)
-            target_pos = om.MVector(*target_position)
-            distance = (source_pos - target_pos).length()
-            if distance > tolerance:
-                print("距離が許容範囲外であるためスナップとマージ処理はスキップされました")
-                continue
-
-        cmds.xform(source_vertex, worldSpace=True, translation=target_position)
-        snap_processed = True
-
-        if merge_same_object and source_object == target_object:
-            cmds.polyMergeVertex([source_vertex, target_vertex], distance=0.001)
-            merge_processed = True
-
-    if snap_processed and merge_processed:
+    timings = []
+    start = time.perf_counter()
+
+    # 記録順に (ソース, ターゲット) のペアにする
+    keys = list(vertex_log.positions)
+    positions = np.array(list(vertex_log.positions.values()), dtype=np.float64)
+    source_keys, target_keys = keys[0::2], keys[1::2]
+    source_positions, target_positions = positions[0::2], positions[1::2]
+
+    pairs = np.arange(len(source_keys))
+    if tolerance is not None:
+        distance = np.linalg.norm(source_positions - target_positions, axis=1)
+        pairs = pairs[distance <= tolerance]
+        skipped = len(source_keys) - len(pairs)
+        if skipped:
+            print(f"距離が許容範囲外であるため {skipped} 組のスナップとマージ処理はスキップされました")
+
+    # ソースのメッシュごとに書き込む座標と、同オブジェクトのペアのマージ対象をまとめる
+    updates = {}
+    merges = {}
+    for pair in pairs.tolist():
+        source_mesh, source_index = source_keys[pair]
+        target_mesh, target_index = target_keys[pair]
+        indices, snapped = updates.setdefault(source_mesh, ([], []))
+        indices.append(source_index)
+        snapped.append(target_positions[pair])
+        if merge_same_object and source_mesh == target_mesh:
+            merges.setdefault(source_mesh, set()).update((source_index, target_index))
+    updates = {mesh: (np.array(indices), np.array(snapped)) for mesh, (indices, snapped) in updates.items()}
+    timings.append(("ペアの集計", time.perf_counter() - start))
+
+    cmds.undoInfo(openChunk=True, chunkName="vertexSnapperSnap")
+    try:
+        # スナップ（メッシュごとに setPoints を 1 回）
+        phase_start = time.perf_counter()
+        write_world_positions(updates)
+        timings.append(("座標の書き込み", time.perf_counter() - phase_start))
+
+        # マージ（メッシュごとに全頂点をまとめて polyMergeVertex を 1 回）
+        phase_start = time.perf_counter()
+        for mesh, indices in merges.items():
+            cmds.polyMergeVertex([f"{mesh}.vtx[{i}]" for i in sorted(indices)], distance=0.001)
+        timings.append(("マージ", time.perf_counter() - phase_start))
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    if updates and merges:
         print("スナップとマージ処理が完了しました。")
-    elif snap_processed:
+    elif updates:
         print("スナップ処理が完了しました。")
+    print(f"{len(pairs)} 組 / {len(updates)} メッシュ / マージ {len(merges)} メッシュ | "
+          + " | ".join(f"{name} {seconds:.3f} 秒" for name, seconds in timings)
+          + f" | 合計 {time.perf_counter() - start:.3f} 秒")
 
     vertex_unlock()
     clear_vertex_log()
@@ -93,7 +220,7 @@ def vertex_unlock():
 # 頂点データ削除
 def clear_vertex_log():
     global vertex_log
-    vertex_log = []
+    vertex_log.clear()
     print("頂点データをクリアしました")
 
 # 頂点データ表示
@@ -103,9 +230,427 @@ def show_vertex_log():
         print("記録された頂点がありません")
         return
     print("頂点データ:")
-    for i, (vertex, position) in enumerate(vertex_log):
+    for i, (vertex, position) in enumerate(vertex_log.items()):
         print(f"{i + 1}: {vertex} - {position}")
 
+# ---------------------------------------------------------------------------
+# 空間ハッシュ（一様グリッド）による最近傍探索
+# ターゲットの点を許容範囲の大きさのセルに分け、セルのキーでソートしておく。
+# ソースの点ごとに周囲 27 セルを searchsorted で引き、セル内の点を NumPy でまとめて比較する。
+# キーはハッシュのため衝突しても候補が増えるだけで、距離は必ず実際の値で比較する。
+# ---------------------------------------------------------------------------
+HASH_PRIMES = np.array([73856093, 19349663, 83492791], dtype=np.int64)
+NEIGHBOR_OFFSETS = np.array([(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)], dtype=np.int64)
+
+
+def cell_keys(cells):
+    return np.bitwise_xor.reduce(cells * HASH_PRIMES, axis=1)
+
+
+class SpatialGrid:
+    def __init__(self, points, cell_size):
+        self.points = np.asarray(points, dtype=np.float64)
+        self.cell_size = max(float(cell_size), 1e-9)
+        keys = cell_keys(np.floor(self.points / self.cell_size).astype(np.int64))
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+
+    def nearest(self, queries, max_distance):
+        """各点に最も近い点の番号と距離を返す（max_distance を超える場合は -1）"""
+        queries = np.asarray(queries, dtype=np.float64)
+        best_distance = np.full(len(queries), np.inf)
+        best_index = np.full(len(queries), -1, dtype=np.int64)
+        query_cells = np.floor(queries / self.cell_size).astype(np.int64)
+
+        for offset in NEIGHBOR_OFFSETS:
+            keys = cell_keys(query_cells + offset)
+            start = np.searchsorted(self.keys, keys, side="left")
+            end = np.searchsorted(self.keys, keys, side="right")
+            # セル内の k 番目の点を、まだ候補が残っているクエリについてまとめて比較する
+            active = np.flatnonzero(start < end)
+            k = 0
+            while active.size:
+                candidates = self.order[start[active] + k]
+                distance = np.sum((self.points[candidates] - queries[active]) ** 2, axis=1)
+                better = distance < best_distance[active]
+                best_distance[active[better]] = distance[better]
+                best_index[active[better]] = candidates[better]
+                k += 1
+                active = active[start[active] + k < end[active]]
+
+        best_distance = np.sqrt(best_distance)
+        best_index[best_distance > max_distance] = -1
+        return best_index, best_distance
+
+    def pairs_within(self, radius):
+        """格納した点同士で距離が radius 以内のペア (i < j) を配列で返す"""
+        cells = np.floor(self.points / self.cell_size).astype(np.int64)
+        first, second = [], []
+        for offset in NEIGHBOR_OFFSETS:
+            keys = cell_keys(cells + offset)
+            start = np.searchsorted(self.keys, keys, side="left")
+            end = np.searchsorted(self.keys, keys, side="right")
+            active = np.flatnonzero(start < end)
+            k = 0
+            while active.size:
+                candidates = self.order[start[active] + k]
+                distance = np.sum((self.points[candidates] - self.points[active]) ** 2, axis=1)
+                hit = (candidates > active) & (distance <= radius * radius)
+                first.append(active[hit])
+                second.append(candidates[hit])
+                k += 1
+                active = active[start[active] + k < end[active]]
+        if not first:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        # ハッシュの衝突で同じセルを複数回たどった場合の重複を除く
+        pairs = np.unique(np.stack([np.concatenate(first), np.concatenate(second)], axis=1), axis=0)
+        return pairs[:, 0], pairs[:, 1]
+
+
+# ---------------------------------------------------------------------------
+# 頂点セット（自動ペア用）
+# メッシュごとに getPoints で座標を 1 回だけ読み、全頂点を 1 つの配列にまとめる
+# ---------------------------------------------------------------------------
+class VertexSet:
+    def __init__(self, meshes, indices, points):
+        self.meshes = meshes      # メッシュ名のリスト
+        self.owners = indices[0]  # 各行のメッシュ番号
+        self.indices = indices[1] # 各行の頂点番号
+        self.points = points      # N×3 ワールド座標
+
+    def __len__(self):
+        return len(self.points)
+
+    def names(self, rows):
+        return [f"{self.meshes[self.owners[row]]}.vtx[{self.indices[row]}]" for row in rows]
+
+
+def shape_path_of(mesh):
+    selection = om.MSelectionList()
+    selection.add(mesh)
+    path = selection.getDagPath(0)
+    if not path.node().hasFn(om.MFn.kMesh):
+        path.extendToShape()
+    return path
+
+
+def mesh_points(mesh):
+    """メッシュ全体のワールド座標を N×3 の配列で返す"""
+    return np.array(om.MFnMesh(shape_path_of(mesh)).getPoints(om.MSpace.kWorld), dtype=np.float64)[:, :3]
+
+
+def collect_vertex_set():
+    """選択中の頂点（オブジェクトが選択されている場合は全頂点）を VertexSet にまとめる"""
+    selection = om.MGlobal.getActiveSelectionList()
+    per_mesh = {}
+    for i in range(selection.length()):
+        try:
+            path, component = selection.getComponent(i)
+        except RuntimeError:
+            continue
+        if not path.node().hasFn(om.MFn.kMesh):
+            try:
+                path.extendToShape()
+            except RuntimeError:
+                continue
+            if not path.node().hasFn(om.MFn.kMesh):
+                continue
+        transform = om.MDagPath(path)
+        transform.pop()
+        mesh = transform.partialPathName()
+        if component.isNull():
+            per_mesh[mesh] = None  # メッシュ全体
+        elif component.hasFn(om.MFn.kMeshVertComponent) and per_mesh.get(mesh, ()) is not None:
+            per_mesh.setdefault(mesh, set()).update(om.MFnSingleIndexedComponent(component).getElements())
+
+    meshes, owners, indices, points = [], [], [], []
+    for mesh, selected in per_mesh.items():
+        all_points = mesh_points(mesh)
+        rows = np.arange(len(all_points)) if selected is None else np.array(sorted(selected), dtype=np.int64)
+        owners.append(np.full(len(rows), len(meshes), dtype=np.int64))
+        indices.append(rows)
+        points.append(all_points[rows])
+        meshes.append(mesh)
+    if not meshes:
+        return None
+    return VertexSet(meshes, (np.concatenate(owners), np.concatenate(indices)), np.concatenate(points))
+
+
+# ---------------------------------------------------------------------------
+# 座標の一括書き込み
+# メッシュごとに getPoints → 変更 → setPoints を 1 回ずつ行う。
+# 変更前と変更後の座標を保持し、Undo 可能なコマンドとして書き込む（マージと同じ Undo チャンクに入る）。
+# ---------------------------------------------------------------------------
+def write_world_positions(updates, space=om.MSpace.kWorld):
+    """updates: {メッシュ名: (頂点番号の配列, N×3 の座標)}（座標は space の空間、既定はワールド）"""
+    writes = []  # [(シェイプの MDagPath, 変更前の MPointArray, 変更後の MPointArray)]
+    for mesh, (indices, positions) in updates.items():
+        path = shape_path_of(mesh)
+        points = om.MFnMesh(path).getPoints(space)
+        previous = om.MPointArray(points)
+        for index, (x, y, z) in zip(indices.tolist(), positions.tolist()):
+            points[index] = om.MPoint(x, y, z)
+        writes.append((path, previous, points))
+
+    def do_it():
+        for path, _, points in writes:
+            om.MFnMesh(path).setPoints(points, space)
+
+    def undo_it():
+        for path, previous, _ in writes:
+            om.MFnMesh(path).setPoints(previous, space)
+
+    if writes:
+        run_undoable(do_it, undo_it)
+
+
+# ---------------------------------------------------------------------------
+# 自動ペアスナップ
+# ソースの各頂点を、許容範囲内で最も近いターゲットの頂点へスナップする
+# ---------------------------------------------------------------------------
+auto_pair_sources = None
+auto_pair_targets = None
+
+
+def set_auto_pair_set(role):
+    global auto_pair_sources, auto_pair_targets
+    vertex_set = collect_vertex_set()
+    if vertex_set is None:
+        cmds.warning("メッシュまたは頂点を選択してください。")
+        return
+    if role == "source":
+        auto_pair_sources = vertex_set
+    else:
+        auto_pair_targets = vertex_set
+    print(f"{'ソース' if role == 'source' else 'ターゲット'}: {len(vertex_set)} 頂点（{len(vertex_set.meshes)} メッシュ）")
+
+
+def auto_pair_snap(tolerance):
+    if auto_pair_sources is None or auto_pair_targets is None:
+        cmds.warning("ソースとターゲットを設定してください。")
+        return
+
+    start = time.perf_counter()
+    grid = SpatialGrid(auto_pair_targets.points, tolerance)
+    nearest, _ = grid.nearest(auto_pair_sources.points, tolerance)
+    matched = np.flatnonzero(nearest >= 0)
+    unmatched = np.flatnonzero(nearest < 0)
+    match_time = time.perf_counter() - start
+
+    # ソースのメッシュごとに書き込む
+    updates = {}
+    owners = auto_pair_sources.owners[matched]
+    for owner in np.unique(owners):
+        rows = matched[owners == owner]
+        updates[auto_pair_sources.meshes[owner]] = (auto_pair_sources.indices[rows], auto_pair_targets.points[nearest[rows]])
+    write_world_positions(updates)
+
+    print(f"自動ペア: {len(matched)} / {len(auto_pair_sources)} 頂点をスナップしました"
+          f"（検索 {match_time:.2f} 秒, 合計 {time.perf_counter() - start:.2f} 秒）")
+    if unmatched.size:
+        names = auto_pair_sources.names(unmatched)
+        print(f"許容範囲内に対応する頂点が無い頂点: {len(names)} 個（選択状態にしました）")
+        for name in names[:200]:
+            print(f"  {name}")
+        if len(names) > 200:
+            print(f"  ... 他 {len(names) - 200} 個")
+        cmds.select(names, replace=True)
+
+
+# ---------------------------------------------------------------------------
+# 複数メッシュの継ぎ目の溶接
+# 選択した全メッシュの境界頂点をまとめて集め、許容範囲のセルで空間ハッシュに分ける。
+# 別メッシュの境界頂点同士で許容範囲内にあるものを同じクラスターにまとめ、
+# 各クラスターを重心へ一括でスナップする（必要に応じて結合・マージする）。
+# ---------------------------------------------------------------------------
+def border_vertices(mesh):
+    """境界エッジ（1 つの面にしか属さないエッジ）上の頂点番号の配列"""
+    counts, vertices = om.MFnMesh(shape_path_of(mesh)).getVertices()
+    counts = np.array(counts, dtype=np.int64)
+    vertices = np.array(vertices, dtype=np.int64)
+    if not len(vertices):
+        return vertices
+
+    # 各面の頂点列から、次の頂点（面の最後は先頭）への辺を作る
+    face_start = np.repeat(np.cumsum(counts) - counts, counts)
+    position = np.arange(len(vertices)) - face_start
+    following = np.where(position + 1 == np.repeat(counts, counts), face_start, np.arange(len(vertices)) + 1)
+    edges = np.sort(np.stack([vertices, vertices[following]], axis=1), axis=1)
+    unique, occurrences = np.unique(edges, axis=0, return_counts=True)
+    return np.unique(unique[occurrences == 1])
+
+
+def cluster_labels(owners, first, second, distances):
+    """ペア (first[i], second[i]) を距離の近い順につなぎ、つながった点を同じラベルにする（ラベルはクラスターの代表の番号）
+    同じメッシュの頂点を含むクラスター同士はつながない（別メッシュの頂点を経由して同じメッシュの頂点が溶接されないように）"""
+    parent = list(range(len(owners)))
+    members = [{owner} for owner in owners.tolist()]  # 代表の番号 -> クラスターに含まれるメッシュ
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # 経路を短縮
+            i = parent[i]
+        return i
+
+    first, second = first.tolist(), second.tolist()
+    for pair in np.argsort(distances, kind="stable").tolist():
+        a, b = find(first[pair]), find(second[pair])
+        if a == b or not members[a].isdisjoint(members[b]):
+            continue
+        if len(members[a]) < len(members[b]):
+            a, b = b, a
+        parent[b] = a
+        members[a] |= members[b]
+        members[b] = None
+    return np.array([find(i) for i in range(len(parent))], dtype=np.int64)
+
+
+def weld_mesh_borders(tolerance, combine=False):
+    meshes = cmds.ls(selection=True, type="transform") or []
+    meshes = [mesh for mesh in meshes if cmds.listRelatives(mesh, shapes=True, type="mesh", noIntermediate=True)]
+    if len(meshes) < 2:
+        cmds.warning("2 つ以上のメッシュを選択してください。")
+        return
+
+    timings = []
+    start = time.perf_counter()
+
+    # 境界頂点と座標をメッシュごとに 1 回で取得
+    owners, indices, points = [], [], []
+    for owner, mesh in enumerate(meshes):
+        border = border_vertices(mesh)
+        owners.append(np.full(len(border), owner, dtype=np.int64))
+        indices.append(border)
+        points.append(mesh_points(mesh)[border])
+    owners, indices, points = np.concatenate(owners), np.concatenate(indices), np.concatenate(points)
+    timings.append(("境界頂点の取得", time.perf_counter() - start))
+
+    # 許容範囲内のペア（同じメッシュ内のペアはエッジを潰さないよう除外）
+    phase_start = time.perf_counter()
+    first, second = SpatialGrid(points, tolerance).pairs_within(tolerance)
+    across = owners[first] != owners[second]
+    first, second = first[across], second[across]
+    labels = cluster_labels(owners, first, second, np.linalg.norm(points[first] - points[second], axis=1))
+    clustered = np.flatnonzero(np.bincount(labels, minlength=len(points))[labels] > 1)
+    timings.append(("クラスター化", time.perf_counter() - phase_start))
+    if not clustered.size:
+        print("許容範囲内に溶接できる境界頂点はありません。")
+        return
+
+    # 各クラスターの重心へスナップ
+    phase_start = time.perf_counter()
+    cluster = labels[clustered]
+    sizes = np.bincount(cluster, minlength=len(points)).astype(np.float64)
+    centroid = np.stack([np.bincount(cluster, weights=points[clustered, axis], minlength=len(points)) for axis in range(3)], axis=1)
+    snapped = centroid[cluster] / sizes[cluster][:, None]
+
+    updates = {}
+    for owner in np.unique(owners[clustered]):
+        rows = owners[clustered] == owner
+        updates[meshes[owner]] = (indices[clustered][rows], snapped[rows])
+
+    cmds.undoInfo(openChunk=True, chunkName="vertexSnapperWeld")
+    try:
+        write_world_positions(updates)
+        timings.append(("重心へのスナップ", time.perf_counter() - phase_start))
+
+        if combine:
+            # 結合後の頂点番号は、結合順にそれまでの頂点数だけずれる
+            phase_start = time.perf_counter()
+            offsets = np.cumsum([0] + [cmds.polyEvaluate(mesh, vertex=True) for mesh in meshes[:-1]])
+            combined = cmds.polyUnite(meshes, name="weldedMesh", mergeUVSets=True)[0]
+            merge_indices = np.unique(indices[clustered] + offsets[owners[clustered]])
+            cmds.polyMergeVertex([f"{combined}.vtx[{i}]" for i in merge_indices.tolist()], distance=tolerance * 1e-3)
+            cmds.select(combined, replace=True)
+            timings.append(("結合とマージ", time.perf_counter() - phase_start))
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    print(f"溶接: {len(meshes)} メッシュ / 境界頂点 {len(points)} 個のうち {clustered.size} 個を"
+          f" {len(np.unique(cluster))} 箇所にまとめました | "
+          + " | ".join(f"{name} {seconds:.3f} 秒" for name, seconds in timings)
+          + f" | 合計 {time.perf_counter() - start:.3f} 秒")
+
+
+# ---------------------------------------------------------------------------
+# 対称スナップ
+# 指定した軸の平面（オブジェクト空間）で頂点を反転し、反転位置に最も近い頂点を空間ハッシュで探して
+# 対称の相手を決める。基準側の座標を反転して反対側へ一括で書き込む。
+# 対応表はメッシュのトポロジーごとにキャッシュし、2 回目以降は検索を省略する。
+# ---------------------------------------------------------------------------
+symmetry_maps = {}  # (メッシュ, トポロジーのハッシュ, 軸, 平面位置, 許容範囲) -> (相手の頂点番号の配列, 中心の頂点のマスク)
+SYMMETRY_MAP_CACHE_SIZE = 16  # 保持する対応表の数（古く使われていないものから捨てる）
+SYMMETRY_CENTER_EPSILON = 1e-4  # 平面からこの距離以内の頂点だけを中心の頂点として扱う
+
+
+def topology_key(mesh):
+    counts, vertices = om.MFnMesh(shape_path_of(mesh)).getVertices()
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.array(counts, dtype=np.int32).tobytes())
+    digest.update(np.array(vertices, dtype=np.int32).tobytes())
+    return digest.hexdigest()
+
+
+def symmetry_map(mesh, points, axis, plane, tolerance):
+    key = (mesh, topology_key(mesh), axis, plane, tolerance)
+    cached = symmetry_maps.pop(key, None)
+    if cached is not None:
+        symmetry_maps[key] = cached  # 最近使ったものとして末尾に移す
+        return cached, True
+
+    mirrored = points.copy()
+    mirrored[:, axis] = 2.0 * plane - mirrored[:, axis]
+    partner, _ = SpatialGrid(points, tolerance).nearest(mirrored, tolerance)
+    # 反転しても自分自身が最も近く、かつ平面上にある頂点だけを中心とする
+    # （平面から離れているのに自分自身が最も近い頂点は、対称の相手が無い頂点として扱う）
+    own = partner == np.arange(len(points))
+    center = own & (np.abs(points[:, axis] - plane) <= SYMMETRY_CENTER_EPSILON)
+    partner[own & ~center] = -1
+
+    symmetry_maps[key] = (partner, center)
+    while len(symmetry_maps) > SYMMETRY_MAP_CACHE_SIZE:
+        del symmetry_maps[next(iter(symmetry_maps))]
+    return (partner, center), False
+
+
+def symmetry_snap(axis, positive_side, plane=0.0, tolerance=0.001):
+    """選択メッシュの基準側（positive_side=True なら +側）を反対側へ反転コピーする"""
+    meshes = cmds.ls(selection=True, type="transform", objectsOnly=True) or []
+    meshes = [mesh for mesh in meshes if cmds.listRelatives(mesh, shapes=True, type="mesh", noIntermediate=True)]
+    if not meshes:
+        cmds.warning("メッシュを選択してください。")
+        return
+
+    updates = {}
+    unmatched_names = []
+    for mesh in meshes:
+        start = time.perf_counter()
+        points = np.array(om.MFnMesh(shape_path_of(mesh)).getPoints(om.MSpace.kObject), dtype=np.float64)[:, :3]
+        (partner, center), cached = symmetry_map(mesh, points, axis, plane, tolerance)
+
+        side = points[:, axis] - plane
+        follower = ~center & ((side < 0) if positive_side else (side > 0))
+        matched = follower & (partner >= 0) & ~center[np.maximum(partner, 0)]
+        unmatched = np.flatnonzero(follower & ~matched)
+
+        snapped = points.copy()
+        rows = np.flatnonzero(matched)
+        snapped[rows] = points[partner[rows]]
+        snapped[rows, axis] = 2.0 * plane - snapped[rows, axis]
+        snapped[center, axis] = plane  # 中心の頂点は平面上に揃える
+        rows = np.flatnonzero(matched | center)
+        updates[mesh] = (rows, snapped[rows])
+
+        unmatched_names.extend(f"{mesh}.vtx[{i}]" for i in unmatched.tolist())
+        print(f"{mesh}: 反転 {np.count_nonzero(matched)} / 中心 {np.count_nonzero(center)} / 相手なし {len(unmatched)}"
+              f"（{'キャッシュ使用' if cached else '対応表を作成'}, {time.perf_counter() - start:.3f} 秒）")
+
+    write_world_positions(updates, om.MSpace.kObject)
+    if unmatched_names:
+        cmds.select(unmatched_names, replace=True)
+        print(f"対称の相手が見つからない頂点 {len(unmatched_names)} 個を選択しました。")
+
+
 # ---------------------------------------------------------------------------
 # ここからUI
 class VertexSnapperUI:
@@ -117,7 +662,7 @@ class VertexSnapperUI:
         if cmds.window("vertexSnapperWindow", exists=True):
             cmds.deleteUI("vertexSnapperWindow")
 
-        self.window = cmds.window("vertexSnapperWindow", title="Vertex Snapper", sizeable=False, widthHeight=(200, 270))
+        self.window = cmds.window("vertexSnapperWindow", title="Vertex Snapper", sizeable=False, widthHeight=(200, 620))
         cmds.columnLayout(adjustableColumn=True, rowSpacing=10)
 
         # 許容範囲設定
@@ -145,6 +690,36 @@ class VertexSnapperUI:
         cmds.button(label="頂点データの初期化", command=self.on_clear_button_clicked)
         cmds.button(label="頂点データの表示", command=self.on_show_log_button_clicked)
 
+        # 自動ペア（許容範囲が有効ならその値、無効なら DEFAULT_SEARCH_TOLERANCE を使用）
+        cmds.frameLayout(label="自動ペア", collapsable=True, collapse=False, marginWidth=5, marginHeight=5)
+        cmds.button(label="選択をソースに設定", command=lambda *args: set_auto_pair_set("source"))
+        cmds.button(label="選択をターゲットに設定", command=lambda *args: set_auto_pair_set("target"))
+        cmds.button(label="自動ペアでスナップ", command=self.on_auto_pair_button_clicked)
+        cmds.setParent('..')
+
+        # 継ぎ目の溶接（許容範囲が有効ならその値、無効なら DEFAULT_SEARCH_TOLERANCE を使用）
+        cmds.frameLayout(label="継ぎ目の溶接", collapsable=True, collapse=False, marginWidth=5, marginHeight=5)
+        self.combine_checkbox = cmds.checkBox(label="結合してマージする", value=False)
+        cmds.button(label="選択メッシュの境界を溶接", command=self.on_weld_button_clicked)
+        cmds.setParent('..')
+
+        # 対称スナップ（許容範囲が有効ならその値、無効なら DEFAULT_SEARCH_TOLERANCE を対称の相手を探す距離に使用）
+        cmds.frameLayout(label="対称スナップ", collapsable=True, collapse=False, marginWidth=5, marginHeight=5)
+        cmds.rowLayout(numberOfColumns=2)
+        self.symmetry_axis_menu = cmds.optionMenu(label="軸")
+        for axis in "XYZ":
+            cmds.menuItem(label=axis)
+        self.symmetry_side_menu = cmds.optionMenu(label="基準")
+        cmds.menuItem(label="+")
+        cmds.menuItem(label="-")
+        cmds.setParent('..')
+        cmds.rowLayout(numberOfColumns=2)
+        cmds.text(label="平面位置:")
+        self.symmetry_plane_field = cmds.floatField(value=0.0, precision=3, width=60)
+        cmds.setParent('..')
+        cmds.button(label="対称にスナップ", command=self.on_symmetry_button_clicked)
+        cmds.setParent('..')
+
         self.script_job = cmds.scriptJob(event=["SelectionChanged", log_selected_vertices], parent=self.window)
 
         cmds.showWindow(self.window)
@@ -206,6 +781,39 @@ class VertexSnapperUI:
         merge_same_object = cmds.checkBox(self.merge_checkbox, query=True, value=True)
         snap_and_merge_vertices(tolerance, merge_same_object)
 
+    def search_tolerance(self):
+        """
+        頂点の検索に使う距離を返す。
+        '許容範囲を有効にする'がオフの場合はフィールドの値ではなく DEFAULT_SEARCH_TOLERANCE を使う。
+        """
+        if cmds.checkBox(self.tolerance_checkbox, query=True, value=True):
+            return cmds.floatField(self.tolerance_field, query=True, value=True)
+        return DEFAULT_SEARCH_TOLERANCE
+
+    def on_auto_pair_button_clicked(self, *args):
+        """
+        '自動ペアでスナップ'ボタンがクリックされた際に呼び出される。
+        許容範囲を検索距離として、ソースの各頂点を最も近いターゲットへスナップする。
+        """
+        auto_pair_snap(self.search_tolerance())
+
+    def on_weld_button_clicked(self, *args):
+        """
+        '選択メッシュの境界を溶接'ボタンがクリックされた際に呼び出される。
+        許容範囲以内にある別メッシュの境界頂点を重心へまとめる。
+        """
+        weld_mesh_borders(self.search_tolerance(), cmds.checkBox(self.combine_checkbox, query=True, value=True))
+
+    def on_symmetry_button_clicked(self, *args):
+        """
+        '対称にスナップ'ボタンがクリックされた際に呼び出される。
+        選択メッシュの基準側の頂点を、指定した軸の平面で反転して反対側へ書き込む。
+        """
+        axis = "XYZ".index(cmds.optionMenu(self.symmetry_axis_menu, query=True, value=True))
+        positive_side = cmds.optionMenu(self.symmetry_side_menu, query=True, value=True) == "+"
+        plane = cmds.floatField(self.symmetry_plane_field, query=True, value=True)
+        symmetry_snap(axis, positive_side, plane, self.search_tolerance())
+
     def on_clear_button_clicked(self, *args):
         """
         'データをクリア'ボタンがクリックされた際に呼び出される。
@@ -1,10 +1,10 @@
 #--------------------------------------------------------------------------
 # ScriptName: tx auto reload
 # Author: Naruse,GPT-5
-# Contents   : 選択したテクスチャノードを数秒ごとに自動的にロードする
+# Contents   : 選択したテクスチャノードのファイル変更を監視し、変更があったものだけ自動的にリロードする
 # CreatedDate: 2025年10月13日
-# LastUpdate: 2025年10月13日
-# Version: 0.1
+# LastUpdate: 2026年10月19日
+# Version: 0.3
 #
 # 《License》
 # Copyright (c) 2025 Naruse
@@ -13,14 +13,39 @@
 #--------------------------------------------------------------------------
 
 import maya.cmds as cmds
+import maya.mel as mel
 import time
 import threading
+import os
+import re
+import sys
+import hashlib
+import select
+import struct
+import ctypes
+import ctypes.util
+from functools import partial
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# 画像ヘッダーの解析は NoGUI/imageHeader.py と共有する（同じリポジトリから実行する場合は自動で探す）
+if "__file__" in globals():
+    SHARED_MODULE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "NoGUI")
+    if SHARED_MODULE_DIR not in sys.path:
+        sys.path.append(SHARED_MODULE_DIR)
+from imageHeader import TextureNotReady, read_image_header
 
 # -----------------------------------------------------
 # グローバル変数
 # -----------------------------------------------------
 auto_reload_thread = None
-auto_reload_running = False
+auto_reload_stop = None  # 実行ごとの停止イベント（停止直後に再開しても古いスレッドは必ず終了する）
+
+# 変更検出後、この秒数だけ新しい変更が無ければまとめてリロードする（書き出し中の連続イベントを集約）
+COALESCE_DELAY = 0.5
+
+# テクスチャの検証・先読みを行うスレッド数
+PREPARE_WORKERS = 4
 
 
 # -----------------------------------------------------
@@ -31,15 +56,10 @@ def get_file_nodes():
 
 
 # -----------------------------------------------------
-# 選択されたファイルノードのテクスチャをリロード
+# ファイルノードのテクスチャをリロード
 # -----------------------------------------------------
-def reload_selected_file(*args):
-    sel = cmds.textScrollList("fileNodeList", q=True, si=True)
-    if not sel:
-        cmds.warning("ファイルノードが選択されていません。")
-        return
-
-    for node in sel:
+def reload_file_nodes(nodes):
+    for node in nodes:
         try:
             file_path = cmds.getAttr(f"{node}.fileTextureName")
             if not file_path:
@@ -48,11 +68,404 @@ def reload_selected_file(*args):
 
             # ファイルを再設定してリロード
             cmds.setAttr(f"{node}.fileTextureName", file_path, type="string")
+
+            # UDIM などのタイルノードはタイルプレビューも再生成する
+            if cmds.getAttr(f"{node}.uvTilingMode"):
+                try:
+                    mel.eval(f'generateUvTilePreview "{node}";')
+                except RuntimeError:
+                    pass
             print(f"[{time.strftime('%H:%M:%S')}] [リロード] {node}: {file_path}")
         except Exception as e:
             cmds.warning(f"{node} のリロードに失敗しました: {e}")
 
 
+# -----------------------------------------------------
+# 選択されたファイルノードのテクスチャをリロード
+# -----------------------------------------------------
+def reload_selected_file(*args):
+    sel = cmds.textScrollList("fileNodeList", q=True, si=True)
+    if not sel:
+        cmds.warning("ファイルノードが選択されていません。")
+        return
+
+    reload_file_nodes(sel)
+
+
+# -----------------------------------------------------
+# ファイルノードの監視パターンを取得
+# UDIM / UV タイル / 連番はトークンを正規表現に変換し、(ディレクトリ, 正規表現) を返す
+# -----------------------------------------------------
+TOKEN_PATTERNS = [
+    (re.compile(r"<udim>", re.IGNORECASE), r"\d{4}"),
+    (re.compile(r"<uvtile>", re.IGNORECASE), r"u\d+_v\d+"),
+    (re.compile(r"<[uv]>", re.IGNORECASE), r"\d+"),
+    (re.compile(r"<f>", re.IGNORECASE), r"-?\d+"),
+    (re.compile(r"#+"), r"-?\d+"),
+]
+TOKEN_SPLIT = re.compile(r"(<udim>|<uvtile>|<[uv]>|<f>|#+)", re.IGNORECASE)
+
+
+def expand_path(file_path):
+    # プロジェクト相対パスを絶対パスに展開
+    if not os.path.isabs(file_path):
+        file_path = cmds.workspace(expandName=file_path)
+    return os.path.normpath(file_path)
+
+
+def texture_pattern(node):
+    file_path = cmds.getAttr(f"{node}.fileTextureName")
+    if not file_path:
+        return None
+
+    tiled = cmds.getAttr(f"{node}.uvTilingMode") != 0
+    sequence = cmds.getAttr(f"{node}.useFrameExtension")
+    if tiled or sequence:
+        pattern = cmds.getAttr(f"{node}.computedFileTextureNamePattern") or file_path
+        directory, name = os.path.split(expand_path(pattern))
+
+        if not TOKEN_SPLIT.search(name) and sequence:
+            # トークンが無い連番は、ファイル名末尾の数字をフレーム番号として扱う
+            name = re.sub(r"(\d+)(?=\D*$)", "<f>", name, count=1)
+
+        if TOKEN_SPLIT.search(name):
+            parts = []
+            for part in TOKEN_SPLIT.split(name):
+                for token, regex in TOKEN_PATTERNS:
+                    if token.fullmatch(part):
+                        parts.append(regex)
+                        break
+                else:
+                    parts.append(re.escape(part))
+            flags = re.IGNORECASE if os.name == "nt" else 0
+            return directory, re.compile("".join(parts) + r"\Z", flags)
+
+    directory, name = os.path.split(expand_path(file_path))
+    return directory, re.compile(re.escape(name) + r"\Z")
+
+
+# -----------------------------------------------------
+# ファイル内容のハッシュ（同じ内容で上書きされた場合はリロードしない）
+# -----------------------------------------------------
+def file_hash(path, chunk_size=1024 * 1024):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# -----------------------------------------------------
+# テクスチャの準備（スレッドプールで実行）
+# サイズが安定するまで待ち、ヘッダーを検証し、ハッシュ計算を兼ねて
+# ファイル全体を読み込んで OS のページキャッシュに載せる
+# -----------------------------------------------------
+STABLE_CHECK_INTERVAL = 0.2  # サイズ安定判定の間隔（秒）
+STABLE_TIMEOUT = 60.0        # これ以上書き込みが続く場合は諦める（秒）
+
+
+def stat_signature(path):
+    # mtime / サイズ（ファイルが無ければ None）
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def prepare_texture(path, detected_at):
+    deadline = time.time() + STABLE_TIMEOUT
+    signature = None
+    try:
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        while True:
+            time.sleep(STABLE_CHECK_INTERVAL)
+            current = os.stat(path)
+            if (current.st_size, current.st_mtime_ns) == (st.st_size, st.st_mtime_ns):
+                break
+            if time.time() > deadline:
+                raise TextureNotReady("書き込みが終了しません")
+            st = current
+            signature = (st.st_mtime_ns, st.st_size)
+
+        info = read_image_header(path)
+
+        # ハッシュ計算と同時にページキャッシュへ読み込む
+        if hasattr(os, "posix_fadvise"):
+            with open(path, "rb") as f:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        digest = file_hash(path)
+        return {
+            "path": path, "ok": True, "info": info, "hash": digest,
+            "signature": (st.st_mtime_ns, st.st_size),
+            "written_at": st.st_mtime_ns / 1e9, "detected_at": detected_at, "ready_at": time.time(),
+        }
+    except (OSError, ValueError, TextureNotReady, struct.error) as e:
+        # 失敗時も確認した時点の mtime / サイズを返す（ポーリングで同じ内容を再検証しないため）
+        return {"path": path, "ok": False, "error": str(e), "signature": signature, "detected_at": detected_at}
+
+
+# -----------------------------------------------------
+# リロード計測（書き込み完了 → ビューポート反映までのレイテンシ）
+# -----------------------------------------------------
+reload_metrics = deque(maxlen=1000)
+
+
+def print_reload_metrics(*args):
+    if not reload_metrics:
+        print("計測データはまだありません。")
+        return
+
+    def summary(values):
+        values = sorted(values)
+        p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+        return f"平均 {sum(values) / len(values) * 1000:.0f}ms / 中央値 {values[len(values) // 2] * 1000:.0f}ms / p95 {p95 * 1000:.0f}ms / 最大 {values[-1] * 1000:.0f}ms"
+
+    print(f"----- リロード計測（直近 {len(reload_metrics)} 件） -----")
+    print(f"書き込み → ビューポート: {summary([m['viewport_at'] - m['written_at'] for m in reload_metrics])}")
+    print(f"書き込み → 検出      : {summary([m['detected_at'] - m['written_at'] for m in reload_metrics])}")
+    print(f"検出 → 準備完了      : {summary([m['ready_at'] - m['detected_at'] for m in reload_metrics])}")
+    print(f"準備完了 → ビューポート: {summary([m['viewport_at'] - m['ready_at'] for m in reload_metrics])}")
+    for m in list(reload_metrics)[-10:]:
+        info = m["info"]
+        print(f"  {os.path.basename(m['path'])} ({info['format']} {info['width']}x{info['height']}{' tiled' if info['tiled'] else ''}): "
+              f"{(m['viewport_at'] - m['written_at']) * 1000:.0f}ms")
+
+
+# -----------------------------------------------------
+# 準備済みテクスチャのリロード（メインスレッド）
+# -----------------------------------------------------
+def apply_ready_textures(nodes, records):
+    reload_file_nodes(nodes)
+    cmds.refresh(currentView=True)  # ビューポートへ反映させてから計測
+    viewport_at = time.time()
+    for record in records:
+        record["viewport_at"] = viewport_at
+        reload_metrics.append(record)
+
+
+# -----------------------------------------------------
+# タイルインデックス
+# 監視対象ディレクトリを 1 回ずつ走査し、パターンに一致するタイルごとに
+# mtime / サイズ / 内容ハッシュと参照ノードを記録する
+# -----------------------------------------------------
+class TileIndex:
+    def __init__(self):
+        self.patterns = {}   # ディレクトリ -> [(正規表現, ノードの集合)]
+        self.tiles = {}      # パス -> {"stat": (mtime_ns, size), "hash": ハッシュ, "nodes": ノードの集合}
+        self.dir_stats = {}  # ディレクトリ -> mtime_ns（ポーリング時の新規タイル検出用）
+
+    def add_node(self, node, directory, regex):
+        for pattern, nodes in self.patterns.setdefault(directory, []):
+            if pattern.pattern == regex.pattern:
+                nodes.add(node)
+                return
+        self.patterns[directory].append((regex, {node}))
+
+    def nodes_for_name(self, directory, name):
+        nodes = set()
+        for regex, pattern_nodes in self.patterns.get(directory, ()):
+            if regex.match(name):
+                nodes |= pattern_nodes
+        return nodes
+
+    def scan(self):
+        # ディレクトリごとに 1 回だけ走査してタイル一覧を作る（ハッシュは後で計算）
+        for directory in self.patterns:
+            self.scan_directory(directory)
+
+    def scan_directory(self, directory):
+        # 新しく見つかったタイルのパスを返す
+        added = set()
+        try:
+            self.dir_stats[directory] = os.stat(directory).st_mtime_ns
+            entries = list(os.scandir(directory))
+        except OSError:
+            return added
+
+        for entry in entries:
+            path = os.path.join(directory, entry.name)
+            if path in self.tiles:
+                continue
+            nodes = self.nodes_for_name(directory, entry.name)
+            if not nodes:
+                continue
+            self.tiles[path] = {"stat": None, "hash": None, "nodes": nodes}
+            added.add(path)
+        return added
+
+    def compute_hashes(self):
+        # 基準となる mtime / サイズ / ハッシュを記録（監視スレッドで実行し UI をブロックしない）
+        for path, tile in list(self.tiles.items()):
+            if tile["hash"] is None:
+                try:
+                    st = os.stat(path)
+                    tile["stat"] = (st.st_mtime_ns, st.st_size)
+                    tile["hash"] = file_hash(path)
+                except OSError:
+                    pass
+
+    def changed_directories(self):
+        changed = []
+        for directory, mtime in list(self.dir_stats.items()):
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    changed.append(directory)
+            except OSError:
+                pass
+        return changed
+
+    def candidate_nodes(self, path):
+        # 監視対象のタイル（または新規タイル）であれば参照ノードを返す
+        tile = self.tiles.get(path)
+        if tile is not None:
+            return tile["nodes"]
+        return self.nodes_for_name(*os.path.split(path))
+
+    def mark_checked(self, path, signature):
+        # 検証に失敗したファイルの mtime / サイズを記録し、変更されるまで再検証しない
+        tile = self.tiles.get(path)
+        if tile is not None and signature is not None:
+            tile["stat"] = signature
+
+    def commit(self, path, signature, digest):
+        # 検証済みのハッシュを記録し、内容が変わっていれば参照ノードを返す
+        tile = self.tiles.get(path)
+        if tile is None:
+            nodes = self.candidate_nodes(path)
+            if not nodes:
+                return set()
+            tile = self.tiles[path] = {"stat": None, "hash": None, "nodes": nodes}
+
+        tile["stat"] = signature
+        if digest == tile["hash"]:
+            return set()  # 同じ内容での上書き
+        tile["hash"] = digest
+        return set(tile["nodes"])
+
+
+def build_tile_index(nodes):
+    tile_index = TileIndex()
+    for node in nodes:
+        if not cmds.objExists(node):
+            continue
+        pattern = texture_pattern(node)
+        if not pattern:
+            cmds.warning(f"{node} にファイルパスが設定されていません。")
+            continue
+        tile_index.add_node(node, *pattern)
+    tile_index.scan()
+    return tile_index
+
+
+# -----------------------------------------------------
+# inotify による変更監視（Linux）
+# ctypes で libc の inotify_init1 / inotify_add_watch を直接呼び出す
+# -----------------------------------------------------
+class InotifyWatcher:
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+    def __init__(self, directories):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 に失敗しました")
+
+        # 保存時の「一時ファイル → リネーム」や新規タイルにも対応するため、ディレクトリを監視する
+        self.watch_dirs = {}
+        try:
+            for directory in sorted(set(directories)):
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), self.IN_CLOSE_WRITE | self.IN_MOVED_TO)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f"inotify_add_watch に失敗しました: {directory}")
+                self.watch_dirs[wd] = directory
+        except OSError:
+            self.close()
+            raise
+
+    def wait(self, timeout):
+        # timeout 秒までイベントを待ち、書き込みが完了したファイルパスの集合を返す
+        changed = set()
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return changed
+
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+
+            offset = 0
+            while offset + self.EVENT_HEADER.size <= len(data):
+                wd, mask, cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+
+                directory = self.watch_dirs.get(wd)
+                if directory and name:
+                    changed.add(os.path.join(directory, os.fsdecode(name)))
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)  # fd を閉じると全ての watch も解除される
+            self.fd = -1
+
+
+# -----------------------------------------------------
+# os.stat による変更監視（inotify が使えない環境用のフォールバック）
+# 全タイルの mtime / サイズを 1 回のパスでまとめて比較し、
+# ディレクトリの mtime が変わった場合のみ再走査して新規タイルを拾う
+# -----------------------------------------------------
+class PollingWatcher:
+    def __init__(self, tile_index, interval):
+        self.tile_index = tile_index
+        self.interval = interval
+
+    def wait(self, timeout):
+        time.sleep(max(timeout, self.interval))
+
+        changed = set()
+        for directory in self.tile_index.changed_directories():
+            changed |= self.tile_index.scan_directory(directory)
+
+        for path, tile in list(self.tile_index.tiles.items()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if (st.st_mtime_ns, st.st_size) != tile["stat"]:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        pass
+
+
+# -----------------------------------------------------
+# 環境に応じて監視方式を選択
+# -----------------------------------------------------
+def create_watcher(tile_index, interval):
+    if sys.platform.startswith("linux"):
+        try:
+            watcher = InotifyWatcher(tile_index.patterns)
+            print("監視方式: inotify")
+            return watcher
+        except (OSError, AttributeError) as e:
+            print(f"inotify を使用できないためポーリングに切り替えます: {e}")
+    print(f"監視方式: ポーリング（{interval} 秒ごと）")
+    return PollingWatcher(tile_index, interval)
+
+
 # -----------------------------------------------------
 # ファイルノードリスト更新
 # -----------------------------------------------------
@@ -69,37 +482,70 @@ def refresh_file_list(*args):
 
 # -----------------------------------------------------
 # 自動リロード処理スレッド
+# 変更候補のファイルをスレッドプールで検証・先読みし、内容が変わったノードだけを集めて
+# 変更が落ち着いたら 1 回のメインスレッド処理にまとめる
 # -----------------------------------------------------
-def auto_reload_loop(interval):
-    global auto_reload_running
-
-    while auto_reload_running:
-        # 実行
-        cmds.evalDeferred(reload_selected_file)
-
-        # 次回予定時間を表示
-        next_time = time.strftime("%H:%M:%S", time.localtime(time.time() + interval))
-        print(f"次のリロード予定時刻: {next_time}")
-
-        # 指定秒数待機＋カウントダウン表示
-        for i in range(interval):
-            if not auto_reload_running:
-                break
-
-            remaining = interval - i
-            # カウントダウン条件：間隔が5秒超かつ残り5秒以内
-            if interval > 5 and remaining <= 5:
-                print(f"リロードまで {remaining} 秒...")
-            time.sleep(1)
+def auto_reload_loop(watcher, tile_index, stop_event):
+    pending_nodes = set()
+    pending_records = []
+    in_flight = {}  # パス -> Future
+    dirty = set()   # 準備中に変更が通知されたパス（完了時に準備した内容から変わっていれば再投入する）
+    last_change = 0.0
+    pool = ThreadPoolExecutor(max_workers=PREPARE_WORKERS)
+    try:
+        tile_index.compute_hashes()
+        while not stop_event.is_set():
+            # 準備中・リロード待ちがある間は短い間隔で回収する
+            changed = watcher.wait(0.05 if in_flight or pending_nodes else COALESCE_DELAY)
+            detected_at = time.time()
+            for path in changed:
+                if not tile_index.candidate_nodes(path):
+                    continue
+                if path in in_flight:
+                    dirty.add(path)
+                else:
+                    in_flight[path] = pool.submit(prepare_texture, path, detected_at)
+                last_change = detected_at
+
+            # 準備が終わったものを回収
+            for path, future in list(in_flight.items()):
+                if not future.done():
+                    continue
+                del in_flight[path]
+                result = future.result()
+                if path in dirty:
+                    dirty.discard(path)
+                    # 準備した時点の mtime / サイズから変わっている場合だけ、古い結果は使わずに準備し直す
+                    # （ポーリングは commit までの間、同じ変更を毎回通知するため、通知だけでは判断しない）
+                    if stat_signature(path) != result["signature"]:
+                        in_flight[path] = pool.submit(prepare_texture, path, time.time())
+                        continue
+                if not result["ok"]:
+                    tile_index.mark_checked(path, result["signature"])
+                    print(f"[スキップ] {os.path.basename(path)}: {result['error']}")
+                    continue
+                nodes = tile_index.commit(path, result["signature"], result["hash"])
+                if nodes:
+                    pending_nodes |= nodes
+                    pending_records.append(result)
+
+            # 変更が落ち着き、準備中のファイルも無ければまとめてリロード
+            if pending_nodes and not in_flight and time.time() - last_change >= COALESCE_DELAY:
+                cmds.evalDeferred(partial(apply_ready_textures, sorted(pending_nodes), pending_records))
+                pending_nodes = set()
+                pending_records = []
+    finally:
+        pool.shutdown(wait=False)
+        watcher.close()
 
 
 # -----------------------------------------------------
 # 自動リロード開始
 # -----------------------------------------------------
 def start_auto_reload(*args):
-    global auto_reload_thread, auto_reload_running
+    global auto_reload_thread, auto_reload_stop
 
-    if auto_reload_running:
+    if auto_reload_stop is not None and not auto_reload_stop.is_set():
         cmds.warning("自動リロードはすでに実行中です。")
         return
 
@@ -108,13 +554,25 @@ def start_auto_reload(*args):
         cmds.warning("間隔は1以上の数値を入力してください。")
         return
 
-    auto_reload_running = True
+    sel = cmds.textScrollList("fileNodeList", q=True, si=True)
+    if not sel:
+        cmds.warning("ファイルノードが選択されていません。")
+        return
+
+    # タイルインデックスはメインスレッドで作成（スレッドからは cmds を呼ばない）
+    tile_index = build_tile_index(sel)
+    if not tile_index.patterns:
+        cmds.warning("監視できるファイルがありません。")
+        return
+    watcher = create_watcher(tile_index, interval)
+
+    auto_reload_stop = threading.Event()
     now = time.strftime("%H:%M:%S")
-    print(f"\n[{now}] 自動リロードを開始しました（{interval} 秒ごと）")
-    cmds.inViewMessage(amg=f"<hl>自動リロードを開始</hl>（{interval} 秒ごと）", pos="topCenter", fade=True)
+    print(f"\n[{now}] 自動リロードを開始しました（{len(tile_index.tiles)} ファイルを監視）")
+    cmds.inViewMessage(amg=f"<hl>自動リロードを開始</hl>（{len(tile_index.tiles)} ファイルを監視）", pos="topCenter", fade=True)
 
     # スレッドで実行（UIをブロックしない）
-    auto_reload_thread = threading.Thread(target=auto_reload_loop, args=(interval,), daemon=True)
+    auto_reload_thread = threading.Thread(target=auto_reload_loop, args=(watcher, tile_index, auto_reload_stop), daemon=True)
     auto_reload_thread.start()
 
 
@@ -122,12 +580,11 @@ def start_auto_reload(*args):
 # 自動リロード停止
 # -----------------------------------------------------
 def stop_auto_reload(*args):
-    global auto_reload_running
-    if not auto_reload_running:
+    if auto_reload_stop is None or auto_reload_stop.is_set():
         cmds.warning("自動リロードは実行されていません。")
         return
 
-    auto_reload_running = False
+    auto_reload_stop.set()
     now = time.strftime("%H:%M:%S")
     print(f"[{now}] 自動リロードを停止しました。")
     cmds.inViewMessage(amg="<hl>自動リロードを停止しました</hl>", pos="topCenter", fade=True)
@@ -152,8 +609,8 @@ def show_file_reload_ui():
     cmds.separator(height=10, style='in')
     cmds.text(label="自動リロード設定")
     cmds.rowLayout(numberOfColumns=2, columnWidth2=(150, 100))
-    cmds.text(label="リロード間隔（秒）:")
-    cmds.intField("reloadIntervalField", value=10, minValue=1)
+    cmds.text(label="ポーリング間隔（秒）:")
+    cmds.intField("reloadIntervalField", value=1, minValue=1)
     cmds.setParent("..")
 
     cmds.rowLayout(numberOfColumns=2, columnWidth2=(150, 100))
@@ -161,6 +618,8 @@ def show_file_reload_ui():
     cmds.button(label="■ 自動リロード停止", bgc=(0.8, 0.4, 0.4), command=stop_auto_reload)
     cmds.setParent("..")
 
+    cmds.button(label="リロード計測を表示", command=print_reload_metrics)
+
     refresh_file_list()
     cmds.showWindow(window)
 
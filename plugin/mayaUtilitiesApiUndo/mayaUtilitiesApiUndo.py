@@ -0,0 +1,82 @@
+#--------------------------------------------------------------------------
+# ScriptName: mayaUtilitiesApiUndo
+# Author: Naruse
+# Contents  :API による変更（MDGModifier・MFnMesh.setPoints・MAnimCurveChange・MFnSkinCluster.setWeights など）を
+#             Maya の Undo キューに載せるための小さな MPxCommand プラグイン。
+#             WithGUI の各ツールから読み込まれ、渡された関数を doIt / undoIt / redoIt で呼ぶ。
+#             関数の実行中は Undo の記録を止めるため、中で cmds を呼んでも二重に記録されない。
+# CreatedDate: 2026年10月19日
+# LastUpdate: 2026年10月19日
+# Version: 0.1
+#
+# 《使い方》
+# このフォルダを MAYA_PLUG_IN_PATH に追加する（WithGUI と同じリポジトリから実行する場合は自動で探す）。
+# ツール側は sys.modules["mayaUtilitiesApiUndoShared"] の run_undoable / call_without_undo を使う。
+#
+# 《License》
+# Copyright (c) 2025 Naruse
+# Released under the MIT license
+# https://opensource.org/licenses/mit-license.php
+#--------------------------------------------------------------------------
+
+import sys
+import types
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+COMMAND_NAME = "mayaUtilitiesApiUndo"
+SHARED_MODULE = "mayaUtilitiesApiUndoShared"  # ツールとプラグインで共有するモジュール名
+
+
+def maya_useNewAPI():
+    pass
+
+
+# function を Undo キューに記録せずに実行する
+def call_without_undo(function):
+    recording = cmds.undoInfo(query=True, state=True)
+    if recording:
+        cmds.undoInfo(stateWithoutFlush=False)
+    try:
+        return function()
+    finally:
+        if recording:
+            cmds.undoInfo(stateWithoutFlush=True)
+
+
+# do_it を Undo 可能なコマンドとして実行する（Undo で undo_it、Redo で redo_it（省略時は do_it）を呼ぶ）
+def run_undoable(do_it, undo_it, redo_it=None):
+    shared = sys.modules[SHARED_MODULE]
+    shared.pending.append((do_it, undo_it, redo_it or do_it))
+    getattr(cmds, COMMAND_NAME)()
+
+
+class ApiUndoCommand(om.MPxCommand):
+    def doIt(self, args):
+        pending = sys.modules[SHARED_MODULE].pending
+        if not pending:
+            raise RuntimeError(f"{COMMAND_NAME} は run_undoable から呼び出してください。")
+        self.do_it, self.undo_it, self.redo_it = pending.pop()
+        call_without_undo(self.do_it)
+
+    def redoIt(self):
+        call_without_undo(self.redo_it)
+
+    def undoIt(self):
+        call_without_undo(self.undo_it)
+
+    def isUndoable(self):
+        return True
+
+
+def initializePlugin(plugin):
+    shared = sys.modules.setdefault(SHARED_MODULE, types.ModuleType(SHARED_MODULE))
+    if not hasattr(shared, "pending"):
+        shared.pending = []
+    shared.run_undoable = run_undoable
+    shared.call_without_undo = call_without_undo
+    om.MFnPlugin(plugin, "Naruse", "0.1").registerCommand(COMMAND_NAME, ApiUndoCommand)
+
+
+def uninitializePlugin(plugin):
+    om.MFnPlugin(plugin).deregisterCommand(COMMAND_NAME)